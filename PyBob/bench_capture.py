@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def report(label: str, samples: list[float]):
+    samples = sorted(samples)
+    print(
+        f"{label:<6} p50 {statistics.median(samples) * 1000:7.2f} ms  "
+        f"max {samples[-1] * 1000:7.2f} ms  (n={len(samples)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 Qt 与 mss 截图后端从快捷键到拿到截图的延迟")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).resolve().parent
+    sys.path.insert(0, str(base_dir))
+    from PySide6.QtCore import QRect
+    from PySide6.QtWidgets import QApplication
+
+    from core.capture import ScreenCapture
+
+    app = QApplication(sys.argv)
+    temp_dir = Path(tempfile.mkdtemp(prefix="bob-bench-"))
+
+    # Qt：GUI 线程同步截图并转换为 CaptureFrame，这段时间 GUI 线程被占用
+    screen = ScreenCapture.screen_at_cursor()
+    qt_capture = ScreenCapture(temp_dir, pool_size=0, backend="qt")
+    qt_samples = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        qt_capture.capture_fullscreen_pixmap(screen)
+        qt_samples.append(time.perf_counter() - start)
+
+    # mss：提交请求到截屏线程，Future 完成即为拿到截图；GUI 线程只占用提交的时间
+    mss_capture = ScreenCapture(temp_dir, pool_size=0, backend="mss")
+    mss_capture.start()
+    mss_samples, submit_samples = [], []
+    try:
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            future = mss_capture.grab_async(screen)
+            submit_samples.append(time.perf_counter() - start)
+            frame = future.result()
+            mss_samples.append(time.perf_counter() - start)
+    finally:
+        mss_capture.stop()
+
+    print(f"[BENCH] 屏幕 {frame.image.width()}x{frame.image.height()}，重复 {args.rounds} 次")
+    report("qt", qt_samples)
+    report("mss", mss_samples)
+    print(f"[BENCH] mss 提交请求占用调用线程 p50 {statistics.median(submit_samples) * 1000:.3f} ms")
+
+    # 选区裁剪：mss 截图上是数组视图，不拷贝
+    rect = QRect(100, 100, 800, 300)
+    start = time.perf_counter()
+    for _ in range(1000):
+        frame.crop_array(rect)
+    print(f"[BENCH] crop_array {(time.perf_counter() - start) * 1000:.3f} us/次")
+
+    for path in temp_dir.iterdir():
+        path.unlink()
+    os.rmdir(temp_dir)
+    del app
+
+
+if __name__ == "__main__":
+    main()
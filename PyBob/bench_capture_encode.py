@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def build_image(width: int, height: int):
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QColor, QFont, QImage, QPainter
+
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor("white"))
+    painter = QPainter(image)
+    painter.setPen(QColor("black"))
+    painter.setFont(QFont("Sans", 14))
+    for y in range(24, height, 24):
+        painter.drawText(8, y, "第 %d 行 The quick brown fox jumps over the lazy dog 0123456789" % (y // 24))
+    painter.fillRect(width // 2, 0, width // 4, height // 4, Qt.GlobalColor.darkBlue)
+    painter.end()
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比不同截图编码方式的耗时和文件大小")
+    parser.add_argument("--image", default="", help="使用已有图片，不指定时生成一张文字图")
+    parser.add_argument("--size", default="3840x2160", help="生成图片的尺寸")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--temp-dir", default="", help="写入目录，默认与 capture.temp_dir=auto 相同的选择方式")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    base_dir = Path(__file__).resolve().parent
+    sys.path.insert(0, str(base_dir))
+    from PySide6.QtGui import QGuiApplication, QImage
+
+    from core.capture import ImageEncoder, default_temp_dirs, fastest_temp_dir
+
+    app = QGuiApplication(sys.argv)
+    if args.image:
+        image = QImage(args.image).convertToFormat(QImage.Format.Format_RGB32)
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        image = build_image(width, height)
+
+    temp_dir = Path(args.temp_dir) if args.temp_dir else fastest_temp_dir(default_temp_dirs(Path(tempfile.gettempdir())))
+    print(f"[BENCH] {image.width()}x{image.height()}，写入 {temp_dir}，重复 {args.rounds} 次")
+
+    encoders = [ImageEncoder("bmp")]
+    encoders += [ImageEncoder("png", png_level=level) for level in (0, 1, 3, 6, 9)]
+    encoders += [ImageEncoder("jpg", jpg_quality=quality) for quality in (80, 95)]
+    for encoder in encoders:
+        path = temp_dir / f"bench-encode{encoder.suffix}"
+        encoder.save(image, path)
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            if not encoder.save(image, path):
+                raise SystemExit(f"[BENCH] {encoder} 保存失败")
+        per_call = (time.perf_counter() - start) / args.rounds
+        label = encoder.format
+        if encoder.format == "png":
+            label += f" level={encoder.png_level}"
+        elif encoder.format == "jpg":
+            label += f" quality={encoder.jpg_quality}"
+        print(f"{label:<16} {per_call * 1000:8.2f} ms/次 {path.stat().st_size / 1024:10.1f} KB")
+        path.unlink()
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import ctypes
+import sys
+import time
+from pathlib import Path
+
+
+def build_response(lines: int) -> bytes:
+    from wechat_ocr import ocr_protobuf_pb2
+
+    response = ocr_protobuf_pb2.OcrResponse()
+    response.type = 1
+    response.task_id = 7
+    for i in range(lines):
+        item = response.ocr_result.single_result.add()
+        item.single_str_utf8 = f"第{i}行 The quick brown fox jumps over the lazy dog".encode("utf-8")
+        item.single_rate = 0.97
+        item.left = 12.5
+        item.top = 20.0 * i + 3.25
+        item.right = 640.75
+        item.bottom = 20.0 * i + 19.5
+        for x, y in ((12.5, 20.0 * i), (640.75, 20.0 * i), (640.75, 20.0 * i + 19.5), (12.5, 20.0 * i + 19.5)):
+            point = item.single_pos.pos.add()
+            point.x = x
+            point.y = y
+    return response.SerializeToString()
+
+
+def bench(label: str, func, rounds: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    per_call = (time.perf_counter() - start) / rounds
+    print(f"{label:<10} {per_call * 1000:8.3f} ms/次")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=300, help="每个 OcrResponse 中的文本行数")
+    parser.add_argument("--rounds", type=int, default=50, help="每种解码方式的重复次数")
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).resolve().parent
+    plugin_dir = (base_dir / "../WechatOCR_umi_plugin_full").resolve()
+    sys.path.insert(0, str(plugin_dir / "third_party_libs"))
+    from wechat_ocr import ocr_codec
+
+    payload = build_response(args.lines)
+    native = (ctypes.c_ubyte * len(payload)).from_buffer_copy(payload)
+    print(f"[BENCH] {args.lines} 行, {len(payload)} 字节, 重复 {args.rounds} 次")
+
+    def legacy():
+        return ocr_codec.decode_ocr_response_legacy(bytes(native))
+
+    def direct():
+        # 每次清空浮点格式化缓存, 避免重复解码同一份数据带来的偏差
+        ocr_codec._shortest_float.cache_clear()
+        task_id, lines = ocr_codec.decode_ocr_response(memoryview(native))
+        return ocr_codec.lines_to_results(task_id, lines)
+
+    if legacy() != direct():
+        raise SystemExit("[BENCH] 两种解码结果不一致")
+
+    legacy_time = bench("legacy", legacy, args.rounds)
+    direct_time = bench("direct", direct, args.rounds)
+    print(f"[BENCH] 加速 {legacy_time / direct_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+
+# 每次都在新的解释器里导入, 避免模块缓存影响结果
+IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import wechat_ocr.ocr_manager
+{extra}
+elapsed = time.perf_counter() - start
+print(elapsed, sum(1 for name in sys.modules if name.startswith("google")))
+"""
+
+# 原来 ocr_manager 导入时会加载的 protobuf 模块
+LEGACY_IMPORTS = """
+import wechat_ocr.ocr_protobuf_pb2
+import google.protobuf.json_format
+"""
+
+
+def measure(path: str, extra: str, rounds: int) -> tuple[float, int]:
+    samples = []
+    modules = 0
+    for _ in range(rounds):
+        output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT.format(path=path, extra=extra)], text=True)
+        elapsed, modules = output.split()
+        samples.append(float(elapsed))
+    return statistics.median(samples), int(modules)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 wechat_ocr.ocr_manager 在有无 protobuf 运行时时的导入耗时")
+    parser.add_argument("--rounds", type=int, default=10, help="每种方式重复导入的次数(取中位数)")
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).resolve().parent
+    third_party = str((base_dir / "../WechatOCR_umi_plugin_full/third_party_libs").resolve())
+
+    slim, slim_modules = measure(third_party, "", args.rounds)
+    legacy, legacy_modules = measure(third_party, LEGACY_IMPORTS, args.rounds)
+    print(f"[BENCH] 直接编解码   {slim * 1000:7.1f} ms, google.* 模块 {slim_modules} 个")
+    print(f"[BENCH] 加载protobuf {legacy * 1000:7.1f} ms, google.* 模块 {legacy_modules} 个")
+    print(f"[BENCH] 节省 {(legacy - slim) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="用模拟的 mmmojo 传输层压测 WechatOCRService, 不需要微信/WeChatOCR")
+    parser.add_argument("--requests", type=int, default=500, help="请求总数")
+    parser.add_argument("--delay", type=float, default=0.02, help="模拟的单次识别耗时(秒)")
+    parser.add_argument("--engines", type=int, default=1, help="引擎数量")
+    parser.add_argument("--many", action="store_true", help="用 recognize_many 批量识别, 而不是逐个 recognize_async")
+    parser.add_argument("--paths-per-task", type=int, default=1, help="每个 OcrRequest 打包的图片数")
+    parser.add_argument("--crash-at", type=int, default=0, help="提交到第几个请求时模拟 WeChatOCR 崩溃, 0 表示不崩溃")
+    args = parser.parse_args()
+
+    base_dir = Path(__file__).resolve().parent
+    plugin_dir = (base_dir / "../WechatOCR_umi_plugin_full").resolve()
+    sys.path.insert(0, str(plugin_dir / "third_party_libs"))
+    sys.path.insert(0, str(base_dir))
+    from wechat_ocr.fake_mmmojo import FakeMmmojoDll
+    from services.ocr_engine import WechatOCRPool
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        # SetExePath 会检查 WeChatOCR.exe 是否存在, 放一个空文件即可
+        (tmp_dir / "WeChatOCR.exe").touch()
+        image_path = tmp_dir / "bench.png"
+        image_path.write_bytes(b"")
+
+        transports = []
+
+        def make_transport():
+            transports.append(FakeMmmojoDll(delay=args.delay))
+            return transports[-1]
+
+        pool = WechatOCRPool(
+            plugin_dir,
+            wechat_ocr_dir=str(tmp_dir),
+            wechat_dir=str(tmp_dir),
+            size=args.engines,
+            warmup=False,
+            paths_per_task=args.paths_per_task,
+            transport_factory=make_transport,
+        )
+        pool.start()
+        if not pool.wait_ready(5.0):
+            raise SystemExit("[BENCH] 模拟引擎未能连接")
+
+        latencies = []
+        failed = 0
+        start = time.perf_counter()
+        if args.many:
+            # 结果按顺序产出, 延迟按提交开始到产出该结果计算
+            for i, result in enumerate(pool.recognize_many(image_path for _ in range(args.requests))):
+                if args.crash_at and i == args.crash_at:
+                    transports[-1].crash()
+                failed += "error" in result
+                latencies.append(time.perf_counter() - start)
+        else:
+            def track(submitted):
+                return lambda _: latencies.append(time.perf_counter() - submitted)
+
+            futures = []
+            for i in range(args.requests):
+                if args.crash_at and i == args.crash_at:
+                    transports[-1].crash()
+                future = pool.recognize_async(image_path)
+                future.add_done_callback(track(time.perf_counter()))
+                futures.append(future)
+            for future in futures:
+                try:
+                    future.result()
+                except RuntimeError:
+                    failed += 1
+        elapsed = time.perf_counter() - start
+        engine_stats = pool.stats()
+        pool.stop()
+
+    latencies.sort()
+    mode = f"recognize_many, 每个请求 {args.paths_per_task} 张图" if args.many else "recognize_async"
+    print(f"[BENCH] {args.requests} 个请求({mode}), {args.engines} 个引擎, 模拟耗时 {args.delay * 1000:.0f} ms")
+    print(f"[BENCH] 总耗时 {elapsed:.2f} s, 吞吐 {args.requests / elapsed:.1f} 次/秒, 失败 {failed}")
+    print(
+        f"[BENCH] 延迟 p50 {statistics.median(latencies) * 1000:.1f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms"
+    )
+    for i, stats in enumerate(engine_stats):
+        print(f"[BENCH] 引擎{i}: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,359 @@
 from __future__ import annotations
 
+import math
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
-from PySide6.QtCore import QRect, QSize
-from PySide6.QtGui import QGuiApplication, QPixmap
+from PySide6.QtCore import QPoint, QRect
+from PySide6.QtGui import QCursor, QGuiApplication, QImage, QPixmap, QScreen
+
+
+CAPTURE_BACKENDS = ("qt", "mss")
+
+
+def qimage_pixels(image: QImage, writable: bool = False):
+    """
+    RGB32 QImage 的 BGRA NumPy 视图 (height, width, 4)，不拷贝。
+    writable 为 True 时通过 bits() 取得可写视图，修改会直接作用到 image 上。
+    """
+    import numpy as np
+
+    stride = image.bytesPerLine()
+    bits = image.bits() if writable else image.constBits()
+    buffer = np.frombuffer(bits, dtype=np.uint8, count=stride * image.height())
+    return buffer.reshape(image.height(), stride)[:, : image.width() * 4].reshape(image.height(), image.width(), 4)
+
+
+@dataclass(frozen=True)
+class CaptureFrame:
+    """
+    一块屏幕的截图。image 在 GUI 线程转换好后不再修改，工作线程可以同时从中裁剪。
+    mss 后端的截图同时带有 array（BGRA 的 NumPy 数组），image 直接引用 array 的内存。
+    geometry 为该屏幕的逻辑坐标范围，device_pixel_ratio 用于把遮罩窗口上的选区换算为像素。
+    """
+
+    image: QImage
+    array: Any = None
+    geometry: QRect = field(default_factory=QRect)
+    device_pixel_ratio: float = 1.0
+
+    @classmethod
+    def from_array(cls, array, geometry: QRect, device_pixel_ratio: float) -> "CaptureFrame":
+        """包装 (height, width, 4) 的 BGRA 数组，不拷贝像素；array 需在 frame 存活期间保持不变。"""
+        height, width = array.shape[:2]
+        image = QImage(array.data, width, height, array.strides[0], QImage.Format.Format_RGB32)
+        # QImage 直接引用这块内存，之后只允许读
+        array.flags.writeable = False
+        return cls(image, array, geometry, device_pixel_ratio)
+
+    def pixels(self):
+        """BGRA 像素的 NumPy 视图 (height, width, 4)，不拷贝。"""
+        if self.array is not None:
+            return self.array
+        return qimage_pixels(self.image)
+
+    def map_rect(self, rect: QRect) -> QRect:
+        """把遮罩窗口（与该屏幕重合）坐标下的选区换算为截图像素坐标。"""
+        ratio = self.device_pixel_ratio
+        left = int(round(rect.left() * ratio))
+        top = int(round(rect.top() * ratio))
+        width = max(1, int(round(rect.width() * ratio)))
+        height = max(1, int(round(rect.height() * ratio)))
+        region = QRect(left, top, width, height).intersected(self.image.rect())
+        if region.isEmpty():
+            raise RuntimeError("选区不在截图范围内")
+        return region
+
+    def crop(self, rect: QRect) -> QImage:
+        return self.image.copy(self.map_rect(rect))
+
+    def crop_array(self, rect: QRect):
+        """选区对应的 NumPy 视图，编码前不会拷贝像素。"""
+        region = self.map_rect(rect)
+        top, left = region.top(), region.left()
+        return self.pixels()[top : top + region.height(), left : left + region.width()]
+
+
+IMAGE_FORMATS = ("png", "bmp", "jpg")
+
+
+@dataclass(frozen=True)
+class ImageEncoder:
+    """
+    交给 WeChatOCR 的图片编码方式：
+    bmp 不压缩，编码最快但文件最大；png 可调压缩级别（0-9，0 为不压缩）；jpg 有损，可调质量。
+    """
+
+    format: str = "png"
+    png_level: int = 1
+    jpg_quality: int = 90
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ImageEncoder":
+        image_format = str(config.get("format", "png")).lower()
+        if image_format == "jpeg":
+            image_format = "jpg"
+        if image_format not in IMAGE_FORMATS:
+            raise RuntimeError(f"不支持的截图编码格式：{image_format}")
+        return cls(
+            format=image_format,
+            png_level=min(9, max(0, int(config.get("png_level", 1)))),
+            jpg_quality=min(100, max(1, int(config.get("jpg_quality", 90)))),
+        )
+
+    @property
+    def suffix(self) -> str:
+        return f".{self.format}"
+
+    def quality(self) -> int:
+        if self.format == "png":
+            # Qt 的 PNG 写入按 (100 - quality) * 9 / 91 换算 zlib 压缩级别
+            return 100 - math.ceil(self.png_level * 91 / 9)
+        if self.format == "jpg":
+            return self.jpg_quality
+        return -1
+
+    def save(self, image: QImage, path: Path) -> bool:
+        return image.save(str(path), self.format.upper(), self.quality())
+
+
+def fastest_temp_dir(candidates: list[Path], probe_bytes: int = 1 << 20) -> Path:
+    """依次试写候选目录，返回写入最快的一个；都不可写时返回最后一个候选。"""
+    payload = os.urandom(probe_bytes)
+    best, best_time = candidates[-1], math.inf
+    for candidate in candidates:
+        probe = candidate / f".probe-{os.getpid()}"
+        try:
+            candidate.mkdir(parents=True, exist_ok=True)
+            start = time.perf_counter()
+            probe.write_bytes(payload)
+            elapsed = time.perf_counter() - start
+            probe.unlink()
+        except OSError:
+            continue
+        if elapsed < best_time:
+            best, best_time = candidate, elapsed
+    return best
+
+
+def default_temp_dirs(fallback: Path, app_name: str = "PyBob") -> list[Path]:
+    """临时图片目录候选：内存文件系统（如有）、系统临时目录、程序目录下的 .tmp。"""
+    candidates = []
+    if Path("/dev/shm").is_dir():
+        candidates.append(Path("/dev/shm") / app_name)
+    candidates.append(Path(tempfile.gettempdir()) / app_name)
+    candidates.append(fallback)
+    return candidates
+
+
+class TempImagePool:
+    """
+    为每个识别请求分配独立的临时图片路径，避免连续截图时后一次覆盖前一次仍在识别的图片。
+    文件预先创建好，归还后保留在池中等待下次覆盖写入，省去每次新建文件的开销；cleanup 时统一删除。
+    """
+
+    def __init__(self, temp_dir: Path, prefix: str = "capture", suffix: str = ".png", preallocate: int = 0):
+        self.temp_dir = temp_dir
+        self.prefix = prefix
+        self.suffix = suffix
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._free: list[Path] = []
+        self._in_use: set[Path] = set()
+        self._created = 0
+        self.cleanup()
+        for _ in range(preallocate):
+            path = self._new_path()
+            path.touch()
+            self._free.append(path)
+
+    def _new_path(self) -> Path:
+        self._created += 1
+        return self.temp_dir / f"{self.prefix}-{self._created}{self.suffix}"
+
+    def acquire(self) -> Path:
+        with self._lock:
+            path = self._free.pop() if self._free else self._new_path()
+            self._in_use.add(path)
+            return path
+
+    def release(self, path: Path):
+        with self._lock:
+            if path not in self._in_use:
+                return
+            self._in_use.discard(path)
+            self._free.append(path)
+
+    def in_use(self) -> int:
+        with self._lock:
+            return len(self._in_use)
+
+    def cleanup(self):
+        """删除本池产生的全部临时图片，包括上次运行遗留的文件。"""
+        with self._lock:
+            self._free.clear()
+            self._in_use.clear()
+        for path in self.temp_dir.glob(f"{self.prefix}-*"):
+            path.unlink(missing_ok=True)
+
+
+@dataclass
+class EncodeStats:
+    count: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    last_seconds: float = 0.0
+    last_bytes: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": self.seconds / self.count * 1000 if self.count else 0.0,
+            "avg_kb": self.bytes / self.count / 1024 if self.count else 0.0,
+            "last_ms": self.last_seconds * 1000,
+            "last_kb": self.last_bytes / 1024,
+        }
 
 
 class ScreenCapture:
-    def __init__(self, temp_dir: Path):
+    def __init__(self, temp_dir: Path, encoder: ImageEncoder | None = None, pool_size: int = 4, backend: str = "qt"):
+        if backend not in CAPTURE_BACKENDS:
+            raise RuntimeError(f"不支持的截图后端：{backend}")
+        self.backend = backend
+        self._grabber = None
+        if backend == "mss":
+            from core.mss_grabber import MssGrabber
+
+            self._grabber = MssGrabber()
         self.temp_dir = temp_dir
         self.temp_dir.mkdir(parents=True, exist_ok=True)
-        self._last_fullscreen = QPixmap()
+        self.encoder = encoder or ImageEncoder()
+        self.images = TempImagePool(self.temp_dir, suffix=self.encoder.suffix, preallocate=pool_size)
+        self._last_frame: CaptureFrame | None = None
+        self._stats = EncodeStats()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def last_frame(self) -> CaptureFrame | None:
+        return self._last_frame
+
+    @property
+    def grabs_in_background(self) -> bool:
+        return self._grabber is not None
 
-    def capture_fullscreen_pixmap(self) -> QPixmap:
-        screen = QGuiApplication.primaryScreen()
+    def start(self):
+        if self._grabber is not None:
+            self._grabber.start()
+
+    def stop(self):
+        if self._grabber is not None:
+            self._grabber.stop()
+
+    @staticmethod
+    def screen_at_cursor() -> QScreen:
+        """光标所在的屏幕，取不到时退回主屏。"""
+        screen = QGuiApplication.screenAt(QCursor.pos()) or QGuiApplication.primaryScreen()
         if screen is None:
-            raise RuntimeError("无法获取主屏幕")
-        self._last_fullscreen = screen.grabWindow(0)
-        return self._last_fullscreen
+            raise RuntimeError("无法获取屏幕")
+        return screen
+
+    def grab_async(self, screen: QScreen) -> Future:
+        """截取整块 screen，见 grab_rect_async；mss 后端在截屏线程完成，GUI 线程不等待。"""
+        return self.grab_rect_async(screen, QRect(QPoint(0, 0), screen.geometry().size()))
 
-    def save_region(self, rect: QRect, view_size: QSize, filename: str = "capture.png") -> Path:
-        if self._last_fullscreen.isNull():
-            self.capture_fullscreen_pixmap()
+    def grab_rect_async(self, screen: QScreen, rect: QRect) -> Future:
+        """
+        只截取 screen 上的 rect（相对该屏幕的逻辑坐标），返回结果为 CaptureFrame 的 Future，
+        frame.geometry 为 rect 的全局逻辑坐标。需在 GUI 线程调用；Qt 后端同步截取，返回的 Future 已完成。
+        """
+        geometry = screen.geometry()
+        ratio = screen.devicePixelRatio()
+        frame_geometry = rect.translated(geometry.topLeft())
+        frame_future: Future = Future()
+        if self._grabber is None:
+            try:
+                pixmap = screen.grabWindow(0, rect.x(), rect.y(), rect.width(), rect.height())
+                image = pixmap.toImage().convertToFormat(QImage.Format.Format_RGB32)
+                frame_future.set_result(CaptureFrame(image, geometry=frame_geometry, device_pixel_ratio=ratio))
+            except Exception as exc:
+                frame_future.set_exception(exc)
+            return frame_future
 
-        if view_size.width() <= 0 or view_size.height() <= 0:
-            raise RuntimeError("无效的预览尺寸")
+        # Qt 保持各屏幕左上角的物理坐标不变，只按 devicePixelRatio 缩放尺寸
+        region = {
+            "left": geometry.x() + int(round(rect.x() * ratio)),
+            "top": geometry.y() + int(round(rect.y() * ratio)),
+            "width": max(1, int(round(rect.width() * ratio))),
+            "height": max(1, int(round(rect.height() * ratio))),
+        }
 
-        sx = self._last_fullscreen.width() / view_size.width()
-        sy = self._last_fullscreen.height() / view_size.height()
+        def on_grabbed(f: Future):
+            try:
+                array, _, _ = f.result()
+                frame_future.set_result(CaptureFrame.from_array(array, frame_geometry, ratio))
+            except Exception as exc:
+                frame_future.set_exception(exc)
 
-        left = max(0, int(round(rect.left() * sx)))
-        top = max(0, int(round(rect.top() * sy)))
-        width = max(1, int(round(rect.width() * sx)))
-        height = max(1, int(round(rect.height() * sy)))
+        self._grabber.grab_async(region).add_done_callback(on_grabbed)
+        return frame_future
 
-        output = self.temp_dir / filename
-        region = QRect(left, top, width, height)
-        cropped = self._last_fullscreen.copy(region)
-        if not cropped.save(str(output), "PNG"):
+    def use_frame(self, frame: CaptureFrame) -> QPixmap:
+        """在 GUI 线程把后台截好的 frame 设为当前截图，返回遮罩窗口用的背景。"""
+        self._last_frame = frame
+        pixmap = QPixmap.fromImage(frame.image)
+        pixmap.setDevicePixelRatio(frame.device_pixel_ratio)
+        return pixmap
+
+    def capture_fullscreen_pixmap(self, screen: QScreen | None = None) -> QPixmap:
+        """在 GUI 线程截取 screen（默认为光标所在屏幕），同时转换出供工作线程裁剪的 CaptureFrame。"""
+        screen = screen or self.screen_at_cursor()
+        pixmap = screen.grabWindow(0)
+        ratio = screen.devicePixelRatio()
+        pixmap.setDevicePixelRatio(ratio)
+        self._last_frame = CaptureFrame(
+            pixmap.toImage().convertToFormat(QImage.Format.Format_RGB32),
+            geometry=screen.geometry(),
+            device_pixel_ratio=ratio,
+        )
+        return pixmap
+
+    def save_region(self, frame: CaptureFrame, rect: QRect) -> Path:
+        """裁剪并编码到独立的临时文件，可在工作线程调用；识别完成后需调用 release 归还路径。"""
+        return self.encode_image(frame.crop(rect))
+
+    def encode_image(self, cropped: QImage) -> Path:
+        """把已裁剪的图片编码到独立的临时文件，同样需要调用 release 归还路径。"""
+        output = self.images.acquire()
+        start = time.perf_counter()
+        if not self.encoder.save(cropped, output):
+            self.images.release(output)
             raise RuntimeError("截图保存失败")
+        elapsed = time.perf_counter() - start
+        size = output.stat().st_size
+        with self._stats_lock:
+            self._stats.count += 1
+            self._stats.seconds += elapsed
+            self._stats.bytes += size
+            self._stats.last_seconds = elapsed
+            self._stats.last_bytes = size
+        print(
+            f"[Capture] {self.encoder.format} {cropped.width()}x{cropped.height()} "
+            f"编码 {elapsed * 1000:.1f} ms，{size / 1024:.1f} KB"
+        )
         return output
+
+    def encode_stats(self) -> dict:
+        with self._stats_lock:
+            return self._stats.as_dict()
+
+    def release(self, path: Path):
+        self.images.release(path)
+
+    def cleanup(self):
+        self.images.cleanup()
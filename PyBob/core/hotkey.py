@@ -5,10 +5,19 @@ from pynput import keyboard as pynput_keyboard
 
 
 class HotkeyListener:
-    def __init__(self, hotkey: str, callback):
+    def __init__(self, hotkey: str, callback, extra_hotkeys: dict | None = None):
+        """hotkey 为主快捷键；extra_hotkeys 为其他 {快捷键: 回调}，与主快捷键一起注册。"""
         self.hotkey = hotkey
         self.callback = callback
-        self._hotkey_handler = None
+        self.bindings = {hotkey: callback}
+        for extra, extra_callback in (extra_hotkeys or {}).items():
+            if not extra:
+                continue
+            if extra in self.bindings:
+                print(f"[Hotkey] 快捷键重复，忽略：{extra}")
+                continue
+            self.bindings[extra] = extra_callback
+        self._hotkey_handlers = []
         self._pynput_listener = None
         self._backend = None
 
@@ -25,19 +34,21 @@ class HotkeyListener:
         if self._backend is not None:
             return
 
-        pynput_hotkey = self._to_pynput_hotkey(self.hotkey)
+        names = ", ".join(self.bindings)
         try:
-            self._pynput_listener = pynput_keyboard.GlobalHotKeys({pynput_hotkey: self.callback})
+            self._pynput_listener = pynput_keyboard.GlobalHotKeys(
+                {self._to_pynput_hotkey(hotkey): callback for hotkey, callback in self.bindings.items()}
+            )
             self._pynput_listener.start()
             self._backend = "pynput"
-            print(f"[Hotkey] 已注册 ({self._backend}): {self.hotkey}")
+            print(f"[Hotkey] 已注册 ({self._backend}): {names}")
             return
         except Exception as exc:
             print(f"[Hotkey] pynput 注册失败，回退 keyboard: {exc}")
 
-        self._hotkey_handler = keyboard.add_hotkey(self.hotkey, self.callback)
+        self._hotkey_handlers = [keyboard.add_hotkey(hotkey, callback) for hotkey, callback in self.bindings.items()]
         self._backend = "keyboard"
-        print(f"[Hotkey] 已注册 ({self._backend}): {self.hotkey}")
+        print(f"[Hotkey] 已注册 ({self._backend}): {names}")
 
     def stop(self):
         if self._backend == "pynput" and self._pynput_listener is not None:
@@ -46,7 +57,8 @@ class HotkeyListener:
             self._backend = None
             return
 
-        if self._backend == "keyboard" and self._hotkey_handler is not None:
-            keyboard.remove_hotkey(self._hotkey_handler)
-            self._hotkey_handler = None
+        if self._backend == "keyboard" and self._hotkey_handlers:
+            for handler in self._hotkey_handlers:
+                keyboard.remove_hotkey(handler)
+            self._hotkey_handlers = []
             self._backend = None
@@ -1,28 +1,65 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
 from copy import deepcopy
+from functools import partial
 from pathlib import Path
 from uuid import uuid4
 
 from PySide6.QtCore import QObject, QPoint, QRect, Signal
-from PySide6.QtGui import QGuiApplication
+from PySide6.QtGui import QGuiApplication, QImage
 
-from core.capture import ScreenCapture
+from core.capture import CaptureFrame, ImageEncoder, ScreenCapture, default_temp_dirs, fastest_temp_dir, qimage_pixels
 from core.config import load_or_create_user_config, save_config
 from core.hotkey import HotkeyListener
+from core.preprocess import Preprocessor, TextPrefilter, luminance
 from core.text_process import normalize_text
+from core.watch import LineTranslationCache, RegionWatcher
 from plugins.manager import TranslatorManager
-from services.ocr_engine import WechatOCRService
+from plugins.warmer import ProviderWarmer
+from services.line_index import LineIndex
+from services.ocr_cache import OCRCache
+from services.ocr_engine import TILE_HEIGHT, TILE_OVERLAP, WechatOCRPool, plan_tiles
 from ui.overlay import CaptureOverlay
 from ui.result_window import ResultWindow
 
 
+def _transfer(source: Future, target: Future):
+    """把已完成的 source 的结果转交给 target；target 已被取消时丢弃。"""
+    if source.cancelled():
+        target.cancel()
+        return
+    try:
+        exc = source.exception()
+        if exc is None:
+            target.set_result(source.result())
+        else:
+            target.set_exception(exc)
+    except InvalidStateError:
+        pass
+
+
+def _rects_close(a: QRect, b: QRect, tolerance: int = 2) -> bool:
+    """两个选区的各边相差都不超过 tolerance 像素。"""
+    return (
+        abs(a.left() - b.left()) <= tolerance
+        and abs(a.top() - b.top()) <= tolerance
+        and abs(a.right() - b.right()) <= tolerance
+        and abs(a.bottom() - b.bottom()) <= tolerance
+    )
+
+
 class Kernel(QObject):
     _request_start_signal = Signal(object)
     _translation_update_signal = Signal(object)
     _copy_ocr_signal = Signal(str)
     _hotkey_signal = Signal()
+    _frame_ready_signal = Signal(object)
+    _ocr_update_signal = Signal(object)
+    _watch_hotkey_signal = Signal()
+    _region_hotkey_signal = Signal(str, float)
 
     def __init__(self, base_dir: Path):
         super().__init__()
@@ -30,27 +67,120 @@ class Kernel(QObject):
         default_config_path = self.base_dir / "config.default.yaml"
         self.config, self.config_path = load_or_create_user_config(default_config_path)
 
-        self.capture = ScreenCapture(self.base_dir / ".tmp")
+        capture_config = self.config.get("capture", {})
+        self.capture = ScreenCapture(
+            self._resolve_temp_dir(capture_config.get("temp_dir", "auto")),
+            encoder=ImageEncoder.from_config(capture_config),
+            pool_size=int(capture_config.get("pool_size", 4)),
+            backend=capture_config.get("backend", "qt"),
+        )
         self.overlay = CaptureOverlay()
         self.result = ResultWindow()
 
         plugin_dir = self._resolve_plugin_dir(self.config.get("ocr", {}).get("plugin_dir", "../WechatOCR_umi_plugin_full"))
-        self.ocr_service = WechatOCRService(
+        self.ocr_service = WechatOCRPool(
             plugin_dir=plugin_dir,
             wechat_ocr_dir=self.config["ocr"].get("wechat_ocr_dir", ""),
             wechat_dir=self.config["ocr"].get("wechat_dir", ""),
+            size=int(self.config["ocr"].get("engines", 1)),
+            task_id_wait=float(self.config["ocr"].get("task_id_wait", 2.0)),
+            task_lease=float(self.config["ocr"].get("task_lease", 30.0)),
+            connect_timeout=float(self.config["ocr"].get("connect_timeout", 15.0)),
+            warmup=bool(self.config["ocr"].get("warmup", True)),
+            watchdog=bool(self.config["ocr"].get("watchdog", True)),
+            paths_per_task=int(self.config["ocr"].get("paths_per_task", 1)),
         )
 
+        self.tiling = bool(self.config["ocr"].get("tiling", True))
+        self.tile_height = int(self.config["ocr"].get("tile_height", TILE_HEIGHT))
+        self.tile_overlap = int(self.config["ocr"].get("tile_overlap", TILE_OVERLAP))
+        self.prefilter = TextPrefilter.from_config(self.config.get("prefilter", {}))
+        self.preprocessor = Preprocessor.from_config(self.config.get("preprocess", {}))
+        self.ocr_cache = self._create_ocr_cache(self.config.get("ocr_cache", {}))
+
         self.translators = TranslatorManager(self.config["translation"]).build_all()
+        self.warmer = ProviderWarmer(
+            self.translators,
+            keep_warm_seconds=float(self.config["translation"].get("keep_warm_seconds", 300)),
+            enabled=bool(self.config["translation"].get("preconnect", True)),
+        )
         self.ocr_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="bob-ocr")
         self.translation_executor = ThreadPoolExecutor(max_workers=12, thread_name_prefix="bob-trans")
-        self.hotkey = HotkeyListener(self.config["app"].get("hotkey", "alt+d"), self._on_hotkey)
+        # _create_hotkey 会为每个预设区域注册快捷键，需先加载
+        self.region_presets = self._load_region_presets(self.config.get("regions", []))
+        self.hotkey = self._create_hotkey()
+
+        watch_config = self.config.get("watch", {})
+        self.watcher = RegionWatcher(
+            self.capture,
+            self._on_watch_change,
+            interval_ms=int(watch_config.get("interval_ms", 500)),
+            pixel_threshold=int(watch_config.get("pixel_threshold", 24)),
+            min_change=float(watch_config.get("min_change", 0.002)),
+        )
+        self.line_translations = LineTranslationCache()
+
+        speculative_config = self.config.get("speculative", {})
+        self.speculative_full_screen = bool(speculative_config.get("full_screen", True))
+        self.speculative_min_coverage = float(speculative_config.get("min_coverage", 0.9))
+        # 遮罩打开时对整屏截图的预识别：(截图, 结果为 LineIndex 的 Future)
+        self._speculative: tuple[CaptureFrame, Future] | None = None
+        # 拖动停顿时提前开始的选区识别：(截图, 选区, 结果为 OCR 文本的 Future)
+        self._stable_job: tuple[CaptureFrame, QRect, Future] | None = None
+        self.overlay.set_stable_delay(int(speculative_config.get("selection_pause_ms", 250)))
+        # 最近一次框选：(屏幕的全局逻辑坐标, 相对该屏幕的选区, 结果窗口锚点)
+        self._last_selection: tuple[QRect, QRect, QPoint] | None = None
+        # 最近一次按下框选快捷键的 perf_counter 时间，用于统计从快捷键到结果绘制的耗时
+        self._hotkey_at: float | None = None
+        # stop() 会在 aboutToQuit 和 main() 的 finally 中各调用一次，只执行第一次
+        self._stopped = False
+        self._watch_request_id = ""
+        self._watch_text: str | None = None
+        self._watch_seq = 0
+        # on_text 在 OCR 回调线程、译文在翻译线程完成，_watch_text/_watch_seq 的读写都需持有该锁
+        self._watch_lock = threading.Lock()
 
         self.overlay.selectionFinished.connect(self._on_selection_finished)
+        self.overlay.canceled.connect(self._cancel_speculative)
+        self.overlay.selectionStable.connect(self._on_selection_stable)
         self._request_start_signal.connect(self.result.start_request)
         self._translation_update_signal.connect(self.result.update_translation)
         self._copy_ocr_signal.connect(self._copy_ocr_to_clipboard)
         self._hotkey_signal.connect(self._open_overlay)
+        self._frame_ready_signal.connect(self._show_overlay)
+        self._ocr_update_signal.connect(self.result.update_ocr)
+        self._watch_hotkey_signal.connect(self._toggle_watch)
+        self._region_hotkey_signal.connect(self._capture_region)
+        self.result.closed.connect(self.watcher.stop)
+
+    def _create_hotkey(self) -> HotkeyListener:
+        app_config = self.config.get("app", {})
+        extra = {
+            app_config.get("watch_hotkey", "alt+w"): self._on_watch_hotkey,
+            # 空名称表示最近一次框选的区域
+            app_config.get("repeat_hotkey", "alt+r"): partial(self._on_region_hotkey, ""),
+        }
+        for name, (_, hotkey) in self.region_presets.items():
+            if hotkey:
+                extra[hotkey] = partial(self._on_region_hotkey, name)
+        return HotkeyListener(app_config.get("hotkey", "alt+d"), self._on_hotkey, extra)
+
+    @staticmethod
+    def _load_region_presets(entries: list) -> dict[str, tuple[QRect, str]]:
+        """regions 配置：每项为 {name, hotkey, rect: [x, y, width, height]}，rect 为全局逻辑坐标。"""
+        presets = {}
+        for entry in entries or []:
+            try:
+                name = str(entry["name"])
+                x, y, width, height = (int(value) for value in entry["rect"])
+            except (KeyError, TypeError, ValueError):
+                print(f"[Region] 忽略无效的区域配置：{entry}")
+                continue
+            if width < 8 or height < 8:
+                print(f"[Region] 区域过小，忽略：{name}")
+                continue
+            presets[name] = (QRect(x, y, width, height), str(entry.get("hotkey", "") or ""))
+        return presets
 
     def _copy_ocr_to_clipboard(self, text: str):
         clipboard = QGuiApplication.clipboard()
@@ -71,50 +201,291 @@ class Kernel(QObject):
 
         raise RuntimeError("未找到 WechatOCR_umi_plugin_full 目录，请检查配置")
 
+    def _resolve_temp_dir(self, configured_path: str) -> Path:
+        fallback = self.base_dir / ".tmp"
+        if configured_path and configured_path != "auto":
+            return Path(configured_path)
+        temp_dir = fastest_temp_dir(default_temp_dirs(fallback))
+        print(f"[Capture] 临时图片目录：{temp_dir}")
+        return temp_dir
+
+    def _create_ocr_cache(self, cache_config: dict) -> OCRCache | None:
+        if not cache_config.get("enabled", True):
+            return None
+        disk_dir = self.config_path.parent / "ocr_cache" if cache_config.get("disk", False) else None
+        return OCRCache(
+            max_entries=int(cache_config.get("max_entries", 256)),
+            max_bytes=int(float(cache_config.get("max_mb", 8)) * 1024 * 1024),
+            disk_dir=disk_dir,
+            disk_max_entries=int(cache_config.get("disk_max_entries", 4096)),
+            # 预处理和分块设置都会改变识别结果
+            namespace=f"{self.preprocessor!r}|tiling={self.tiling},{self.tile_height},{self.tile_overlap}",
+        )
+
     def start(self):
         self.ocr_service.start()
+        self.capture.start()
+        self.warmer.start()
         self.hotkey.start()
 
     def stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
         self.hotkey.stop()
+        self.watcher.stop()
+        self._cancel_speculative()
+        self.warmer.stop()
+        for provider in self.translators:
+            print(f"[Translate] {provider.name} 连接统计：{provider.connection_stats()}")
+            provider.close()
         self.ocr_executor.shutdown(wait=False)
         self.translation_executor.shutdown(wait=False)
         self.ocr_service.stop()
+        self.capture.stop()
+        self.capture.cleanup()
+        if self.ocr_cache is not None:
+            print(f"[OCR] 缓存统计：{self.ocr_cache.stats()}")
+        if self.prefilter.enabled:
+            print(f"[Prefilter] 统计：{self.prefilter.stats()}")
 
     def _on_hotkey(self):
+        # 在快捷键线程直接通知，预连接与截图、拖动选区同时进行
+        self._hotkey_at = time.perf_counter()
+        self.warmer.touch()
         self._hotkey_signal.emit()
 
     def _open_overlay(self):
+        self.watcher.stop()
         self.result.hide()
-        background = self.capture.capture_fullscreen_pixmap()
-        self.overlay.start(background)
+        # 只截取光标所在的屏幕，遮罩也只覆盖这块屏幕
+        screen = self.capture.screen_at_cursor()
+        if self.capture.grabs_in_background:
+            # mss 在截屏线程完成，GUI 线程不等待，截好后再打开遮罩
+            self.capture.grab_async(screen).add_done_callback(self._frame_ready_signal.emit)
+            return
+        background = self.capture.capture_fullscreen_pixmap(screen)
+        self.overlay.start(background, screen)
+        self._start_speculative(self.capture.last_frame)
+
+    def _show_overlay(self, future: Future):
+        try:
+            frame = future.result()
+        except Exception as exc:
+            print(f"[Capture] 截屏失败：{exc}")
+            return
+        screen = QGuiApplication.screenAt(frame.geometry.center())
+        self.overlay.start(self.capture.use_frame(frame), screen)
+        self._start_speculative(frame)
+
+    def _start_speculative(self, frame: CaptureFrame):
+        """用户拖动选区期间，在后台识别整张截图并建立文字行索引。"""
+        self._cancel_speculative()
+        if not self.speculative_full_screen or frame is None:
+            return
+        start = time.perf_counter()
+        raw = self._run_ocr_stage(self._recognize_image, frame.image)
+        indexed: Future = Future()
+        indexed.add_done_callback(lambda f: raw.cancel() if f.cancelled() else None)
+
+        def on_raw(f: Future):
+            if f.cancelled() or f.exception() is not None:
+                _transfer(f, indexed)
+                return
+            index = LineIndex.from_result(f.result())
+            try:
+                indexed.set_result(index)
+            except InvalidStateError:
+                return
+            print(f"[Speculative] 全屏预识别完成：{len(index)} 行，用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        raw.add_done_callback(on_raw)
+        self._speculative = (frame, indexed)
+
+    def _cancel_speculative(self):
+        """取消全屏预识别和拖动停顿时提前开始的识别。"""
+        if self._speculative is not None:
+            self._speculative[1].cancel()
+            self._speculative = None
+        if self._stable_job is not None:
+            self._stable_job[2].cancel()
+            self._stable_job = None
+
+    def _speculative_lines(self, frame: CaptureFrame, rect: QRect) -> tuple[list[dict] | None, float]:
+        """全屏预识别已完成时返回 (选区内的文字行, 覆盖率)，未完成或不是同一张截图时返回 (None, 0)。"""
+        if self._speculative is None:
+            return None, 0.0
+        speculative_frame, indexed = self._speculative
+        if speculative_frame is not frame or not indexed.done() or indexed.cancelled() or indexed.exception():
+            return None, 0.0
+        try:
+            region = frame.map_rect(rect)
+        except RuntimeError:
+            return None, 0.0
+        return indexed.result().query(
+            region.left(), region.top(), region.left() + region.width(), region.top() + region.height()
+        )
+
+    def _take_speculative(self, frame: CaptureFrame, rect: QRect) -> Future | None:
+        """
+        预识别已完成且选区内的文字行完整（覆盖率达到 min_coverage）时，返回已完成的 OCR 文本 Future；
+        否则取消预识别并返回 None，由调用方重新识别选区。
+        """
+        lines, coverage = self._speculative_lines(frame, rect)
+        speculative, self._speculative = self._speculative, None
+        if speculative is None:
+            return None
+        if lines is None:
+            speculative[1].cancel()
+            print("[Speculative] 全屏预识别尚未完成，改为识别选区")
+            return None
+        if coverage < self.speculative_min_coverage:
+            print(f"[Speculative] 选区内文字行覆盖率 {coverage:.2f}，改为识别选区")
+            return None
+        print(f"[Speculative] 使用全屏预识别结果：{len(lines)} 行，覆盖率 {coverage:.2f}")
+        text_future: Future = Future()
+        text_future.set_result(normalize_text("\n".join((line.get("text") or "").strip() for line in lines)))
+        return text_future
+
+    def _on_selection_stable(self, rect: QRect):
+        """拖动停顿时提前识别当前选区；选区改变后的下一次停顿会取消并替换这次识别。"""
+        frame = self.capture.last_frame
+        if frame is None:
+            return
+        lines, coverage = self._speculative_lines(frame, rect)
+        if lines is not None and coverage >= self.speculative_min_coverage:
+            # 全屏预识别已经能回答这个选区
+            return
+        if self._stable_job is not None:
+            self._stable_job[2].cancel()
+        self._stable_job = (frame, QRect(rect), self._submit_ocr(frame, rect))
+        print(f"[Speculative] 选区停顿，提前识别 {rect.width()}x{rect.height()}")
+
+    def _take_stable_job(self, frame: CaptureFrame, rect: QRect) -> Future | None:
+        """最终选区与停顿时的选区基本一致时，返回那次识别的 Future（可能仍在进行），否则取消它。"""
+        job, self._stable_job = self._stable_job, None
+        if job is None:
+            return None
+        job_frame, job_rect, future = job
+        if job_frame is frame and _rects_close(job_rect, rect) and not future.cancelled():
+            print(f"[Speculative] 使用拖动停顿时开始的识别{'（已完成）' if future.done() else ''}")
+            return future
+        future.cancel()
+        return None
+
+    def _on_watch_hotkey(self):
+        self.warmer.touch()
+        self._watch_hotkey_signal.emit()
+
+    def _on_region_hotkey(self, name: str):
+        self.warmer.touch()
+        self._region_hotkey_signal.emit(name, time.perf_counter())
+
+    def _capture_region(self, name: str, pressed_at: float):
+        """
+        直接截取最近一次框选的区域（name 为空）或预设区域并识别，不打开遮罩、不等待拖动。
+        只截取该区域的像素，mss 后端在截屏线程完成。
+        """
+        if name:
+            if name not in self.region_presets:
+                return
+            global_rect = self.region_presets[name][0]
+            anchor = global_rect.bottomRight()
+        elif self._last_selection is not None:
+            screen_geometry, rect, anchor = self._last_selection
+            global_rect = rect.translated(screen_geometry.topLeft())
+        else:
+            print("[Region] 还没有框选过区域，请先用截图快捷键框选一次")
+            return
+
+        screen = QGuiApplication.screenAt(global_rect.center())
+        if screen is None:
+            print(f"[Region] 区域不在任何屏幕上：{name or '上次选区'}")
+            return
+        local_rect = global_rect.translated(-screen.geometry().topLeft()).intersected(
+            QRect(QPoint(0, 0), screen.geometry().size())
+        )
+        self.watcher.stop()
+        self.result.hide()
+        self._last_selection = (screen.geometry(), local_rect, QPoint(anchor))
+        label = name or "上次选区"
+
+        def on_grabbed(f: Future):
+            try:
+                frame = f.result()
+            except Exception as exc:
+                print(f"[Region] 截屏失败：{exc}")
+                return
+            grabbed_at = time.perf_counter()
+            future = self._start_request(
+                frame, QRect(QPoint(0, 0), frame.geometry.size()), anchor, started_at=pressed_at, hotkey_at=pressed_at
+            )
+            future.add_done_callback(
+                lambda _: print(
+                    f"[Region] {label}：快捷键到截屏完成 {(grabbed_at - pressed_at) * 1000:.1f} ms，"
+                    f"到识别结束 {(time.perf_counter() - pressed_at) * 1000:.1f} ms"
+                )
+            )
+
+        self.capture.grab_rect_async(screen, local_rect).add_done_callback(on_grabbed)
 
     def _on_selection_finished(self, rect: QRect, anchor: QPoint):
+        released_at = time.perf_counter()
+        frame = self.capture.last_frame
+        if frame is None:
+            return
+        self._last_selection = (frame.geometry, QRect(rect), QPoint(anchor))
+        text_future = self._take_speculative(frame, rect)
+        stable_future = self._take_stable_job(frame, rect)
+        if text_future is None:
+            text_future = stable_future
+        elif stable_future is not None:
+            stable_future.cancel()
+        self._start_request(frame, rect, anchor, text_future, started_at=released_at, hotkey_at=self._hotkey_at)
+
+    def _start_request(
+        self,
+        frame: CaptureFrame,
+        rect: QRect,
+        anchor: QPoint,
+        text_future: Future | None = None,
+        started_at: float | None = None,
+        hotkey_at: float | None = None,
+    ) -> Future:
+        """
+        识别 frame 中的 rect（已有 OCR 文本时传入 text_future），可在任意线程调用。
+        结果窗口立即在 anchor 处打开并显示占位内容，OCR 文本和各翻译到达后原地填入；
+        started_at 为用户操作（松开鼠标或按下快捷键）的 perf_counter 时间，用于统计首次绘制和全部完成的耗时；
+        hotkey_at 为按下快捷键的时间，框选时早于 started_at，两段耗时都会打印。
+        返回结果为 OCR 文本的 Future。
+        """
         request_id = uuid4().hex
-        future = self.ocr_executor.submit(self._ocr_stage, rect)
+        future = text_future or self._submit_ocr(frame, rect)
+        providers = [provider.name for provider in self.translators]
+        self._request_start_signal.emit(
+            {
+                "request_id": request_id,
+                "anchor": anchor,
+                "ocr_text": "",
+                "ocr_pending": True,
+                "providers": providers,
+                "started_at": started_at if started_at is not None else time.perf_counter(),
+                "hotkey_at": hotkey_at,
+                "refine": bool(self.config["translation"].get("refine", False)),
+            }
+        )
 
         def done_callback(f):
             try:
                 ocr_text = f.result()
             except Exception as exc:
-                self._request_start_signal.emit(
-                    {
-                        "request_id": request_id,
-                        "anchor": anchor,
-                        "ocr_text": f"OCR失败：{exc}",
-                        "providers": [],
-                    }
+                self._ocr_update_signal.emit(
+                    {"request_id": request_id, "ocr_text": f"OCR失败：{exc}", "error": True, "skip_translation": True}
                 )
                 return
 
-            providers = [provider.name for provider in self.translators]
-            self._request_start_signal.emit(
-                {
-                    "request_id": request_id,
-                    "anchor": anchor,
-                    "ocr_text": ocr_text or "未识别到文本",
-                    "providers": providers,
-                }
+            self._ocr_update_signal.emit(
+                {"request_id": request_id, "ocr_text": ocr_text, "skip_translation": not ocr_text}
             )
             self._copy_ocr_signal.emit(ocr_text or "")
 
@@ -134,80 +505,231 @@ class Kernel(QObject):
                 )
 
         future.add_done_callback(done_callback)
+        return future
+
+    def _toggle_watch(self):
+        """开始或停止监视最近一次框选的区域。"""
+        if self.watcher.watching:
+            self.watcher.stop()
+            return
+        if self._last_selection is None:
+            print("[Watch] 还没有框选过区域，请先用截图快捷键框选一次")
+            return
+        screen_geometry, rect, anchor = self._last_selection
+        screen = QGuiApplication.screenAt(screen_geometry.center())
+        if screen is None or screen.geometry() != screen_geometry:
+            print("[Watch] 框选时的屏幕已变化，请重新框选")
+            return
+        with self._watch_lock:
+            self._watch_request_id = uuid4().hex
+            self._watch_text = None
+        self._request_start_signal.emit(
+            {
+                "request_id": self._watch_request_id,
+                "anchor": anchor,
+                "ocr_text": "监视中…",
+                "providers": [provider.name for provider in self.translators],
+                "pinned": True,
+            }
+        )
+        print(f"[Watch] 开始监视 {rect.width()}x{rect.height()}，间隔 {self.watcher.interval_ms} ms")
+        self.watcher.start(screen, rect)
 
-    def _ocr_stage(self, rect: QRect) -> str:
-        image_path = self.capture.save_region(rect, self.overlay.size())
-        ocr_text = self.ocr_service.recognize(image_path)
-        clean_text = normalize_text(ocr_text)
-        return clean_text
+    def _on_watch_change(self, frame: CaptureFrame) -> Future:
+        """画面有变化时重新识别；文字没变（光标闪烁、动画等）时不更新窗口，也不重新翻译。"""
+        request_id = self._watch_request_id
+        text_future = self._submit_ocr(frame, QRect(QPoint(0, 0), frame.geometry.size()))
 
-    def _translate_stage(self, request_id: str, provider, text: str, source_lang: str, target_lang: str):
-        provider_name = provider.name
+        def on_text(f: Future):
+            try:
+                ocr_text = f.result()
+            except Exception as exc:
+                print(f"[Watch] OCR 失败：{exc}")
+                return
+            with self._watch_lock:
+                if request_id != self._watch_request_id or ocr_text == self._watch_text:
+                    return
+                self._watch_text = ocr_text
+                self._watch_seq += 1
+                # 翻译线程只和提交时的序号比较，不再读取之后可能已被改写的 _watch_seq
+                seq = self._watch_seq
+                self._ocr_update_signal.emit({"request_id": request_id, "ocr_text": ocr_text})
+            if not ocr_text:
+                return
+            source_lang = self.config["translation"].get("source_lang", "auto")
+            target_lang = self.config["translation"].get("target_lang", "zh-CN")
+            for provider in self.translators:
+                self.translation_executor.submit(
+                    self._watch_translate_stage,
+                    request_id,
+                    seq,
+                    provider,
+                    ocr_text,
+                    source_lang,
+                    target_lang,
+                )
 
+        text_future.add_done_callback(on_text)
+        return text_future
+
+    def _watch_translate_stage(self, request_id: str, seq: int, provider, text: str, source_lang: str, target_lang: str):
         try:
-            if provider.supports_stream():
-                def on_delta(delta: str):
-                    self._translation_update_signal.emit(
-                        {
-                            "request_id": request_id,
-                            "provider": provider_name,
-                            "mode": "append",
-                            "text": delta,
-                            "done": False,
-                        }
-                    )
+            with provider.in_use():
+                translated, count = self.line_translations.translate(provider, text, source_lang, target_lang)
+            payload = {"text": translated}
+            print(f"[Watch] {provider.name} 翻译 {count} 行，其余沿用已有译文")
+        except Exception as exc:
+            payload = {"text": f"翻译失败：{exc}", "error": True}
+        # 较早的文字翻译得慢时，不覆盖更新的结果；比较和发出都在锁内，新文字不会插在两者之间
+        with self._watch_lock:
+            if seq != self._watch_seq:
+                return
+            self._translation_update_signal.emit(
+                {"request_id": request_id, "provider": provider.name, "mode": "replace", "done": True, **payload}
+            )
 
-                final_text = provider.translate_stream(text, source_lang, target_lang, on_delta)
-                if final_text:
-                    self._translation_update_signal.emit(
-                        {
-                            "request_id": request_id,
-                            "provider": provider_name,
-                            "mode": "replace",
-                            "text": final_text,
-                            "done": True,
-                        }
-                    )
-                else:
-                    self._translation_update_signal.emit(
-                        {
-                            "request_id": request_id,
-                            "provider": provider_name,
-                            "mode": "replace",
-                            "text": "",
-                            "done": True,
-                        }
-                    )
+    def _submit_ocr(self, frame: CaptureFrame, rect: QRect) -> Future:
+        """
+        裁剪、查缓存和编码在 bob-ocr 线程完成，识别结果由 OCR 回调直接完成 Future，不占用线程等待。
+        frame 需在 GUI 线程取得，之后的截图不会影响本次请求。
+        """
+        return self._run_ocr_stage(self._ocr_stage, frame, rect)
+
+    def _run_ocr_stage(self, stage, *args) -> Future:
+        """
+        stage 在 bob-ocr 线程执行并返回 Future，本函数返回与之同时完成的 Future；
+        取消返回的 Future 会一并取消 stage 提交的识别请求，尚未开始的 stage 则直接跳过。
+        """
+        outer: Future = Future()
+
+        def run():
+            if outer.cancelled():
+                return None
+            return stage(*args)
+
+        def on_stage_done(f: Future):
+            if f.exception() is not None:
+                _transfer(f, outer)
+                return
+            inner = f.result()
+            if inner is None:
+                return
+            outer.add_done_callback(lambda o: inner.cancel() if o.cancelled() else None)
+            inner.add_done_callback(lambda i: _transfer(i, outer))
+
+        self.ocr_executor.submit(run).add_done_callback(on_stage_done)
+        return outer
+
+    def _ocr_stage(self, frame: CaptureFrame, rect: QRect) -> Future:
+        """返回结果为规范化 OCR 文本的 Future；命中缓存时 Future 已经完成。"""
+        cropped = frame.crop(rect)
+        cache_key = None
+        if self.ocr_cache is not None:
+            start = time.perf_counter()
+            cache_key = self.ocr_cache.make_key(cropped.constBits(), cropped.width(), cropped.height())
+            cached = self.ocr_cache.get(cache_key)
+            if cached is not None:
+                print(f"[OCR] 命中缓存，用时 {(time.perf_counter() - start) * 1000:.2f} ms")
+                hit: Future = Future()
+                hit.set_result(cached)
+                return hit
+
+        gray = None
+        if self.prefilter.enabled:
+            gray = luminance(qimage_pixels(cropped))
+            presence = self.prefilter.check(gray)
+            if not presence.has_text:
+                print(
+                    f"[Prefilter] 选区无文字，跳过 OCR（对比度 {presence.contrast}，边缘密度 {presence.edge_density:.4f}，"
+                    f"用时 {presence.seconds * 1000:.1f} ms，已跳过 {self.prefilter.skipped} 次）"
+                )
+                empty: Future = Future()
+                empty.set_result("")
+                return empty
+
+        if self.preprocessor.enabled:
+            cropped, plan = self.preprocessor.apply(cropped, gray)
+            print(f"[Preprocess] {plan.describe()}")
+        future = self._recognize_image(cropped)
+        text_future: Future = Future()
+        text_future.add_done_callback(lambda f: future.cancel() if f.cancelled() else None)
+
+        def on_ocr_done(f: Future):
+            if f.cancelled() or f.exception() is not None:
+                _transfer(f, text_future)
                 return
+            ocr_text = normalize_text(self.ocr_service.result_to_text(f.result()))
+            try:
+                text_future.set_result(ocr_text)
+            except InvalidStateError:
+                return
+            # 先交出结果再写缓存，磁盘缓存不拖慢翻译开始；空结果可能是偶发失败，不缓存
+            if cache_key is not None and ocr_text:
+                self.ocr_cache.put(cache_key, ocr_text)
+
+        future.add_done_callback(on_ocr_done)
+        return text_future
+
+    def _recognize_image(self, image: QImage) -> Future:
+        """编码并提交识别；很高的选区切成重叠的横带，各占一个 task_id 并行识别后合并。"""
+        tiles = plan_tiles(image.width(), image.height(), self.tile_height, self.tile_overlap) if self.tiling else []
+        if len(tiles) > 1:
+            print(f"[OCR] 选区 {image.width()}x{image.height()} 分为 {len(tiles)} 块并行识别")
+        image_paths = []
+        try:
+            if len(tiles) > 1:
+                for tile in tiles:
+                    image_paths.append(
+                        self.capture.encode_image(image.copy(QRect(tile.left, tile.top, tile.width, tile.height)))
+                    )
+                future = self.ocr_service.recognize_tiles_async(tiles, image_paths)
+            else:
+                image_paths.append(self.capture.encode_image(image))
+                future = self.ocr_service.recognize_async(image_paths[0])
+        except Exception:
+            for image_path in image_paths:
+                self.capture.release(image_path)
+            raise
+        # 识别结束（成功、失败或超时）后归还临时图片
+        future.add_done_callback(lambda _: [self.capture.release(image_path) for image_path in image_paths])
+        return future
 
-            translated = provider.translate(text=text, source_lang=source_lang, target_lang=target_lang)
+    def _translate_stage(self, request_id: str, provider, text: str, source_lang: str, target_lang: str):
+        provider_name = provider.name
+
+        def emit(**payload):
+            # priority 供精修模式决定是否用这一结果替换主译文
             self._translation_update_signal.emit(
-                {
-                    "request_id": request_id,
-                    "provider": provider_name,
-                    "mode": "replace",
-                    "text": translated,
-                    "done": True,
-                }
+                {"request_id": request_id, "provider": provider_name, "priority": provider.priority, **payload}
             )
+
+        try:
+            with provider.in_use():
+                if provider.supports_stream():
+                    def on_delta(delta: str):
+                        emit(mode="append", text=delta, done=False)
+
+                    final_text = provider.translate_stream(text, source_lang, target_lang, on_delta)
+                    emit(mode="replace", text=final_text or "", done=True)
+                    return
+
+                translated = provider.translate(text=text, source_lang=source_lang, target_lang=target_lang)
+            emit(mode="replace", text=translated, done=True)
         except Exception as exc:
-            self._translation_update_signal.emit(
-                {
-                    "request_id": request_id,
-                    "provider": provider_name,
-                    "mode": "replace",
-                    "text": f"翻译失败：{exc}",
-                    "done": True,
-                    "error": True,
-                }
-            )
+            emit(mode="replace", text=f"翻译失败：{exc}", done=True, error=True)
 
     def apply_settings(self, new_config: dict):
         self.config = deepcopy(new_config)
         save_config(self.config_path, self.config)
 
         self.hotkey.stop()
-        self.hotkey = HotkeyListener(self.config.get("app", {}).get("hotkey", "alt+d"), self._on_hotkey)
+        self.region_presets = self._load_region_presets(self.config.get("regions", []))
+        self.hotkey = self._create_hotkey()
         self.hotkey.start()
 
+        # 旧的服务可能仍有翻译在进行，retire 后由最后一个请求结束时关闭连接池
+        retired = self.translators
         self.translators = TranslatorManager(self.config.get("translation", {})).build_all()
+        self.warmer.set_providers(self.translators)
+        for provider in retired:
+            provider.retire()
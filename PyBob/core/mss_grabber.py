@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Union
+
+import mss
+import numpy as np
+
+
+class MssGrabber:
+    """
+    在独立线程上用 mss 截屏。mss 的句柄与创建它的线程绑定，所以所有截屏都在 bob-grab 线程完成，
+    GUI 线程和快捷键线程只提交请求。结果为 BGRA 的 NumPy 数组 (height, width, 4)，直接包装 mss 返回的数据，不再拷贝。
+    """
+
+    def __init__(self):
+        self._requests: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.last_grab_seconds = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="bob-grab", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._requests.put(None)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def grab_async(self, monitor: Union[int, dict] = 1) -> Future:
+        """
+        monitor 为 mss 的屏幕编号（1 为主屏）或 {"left", "top", "width", "height"} 区域（物理像素），
+        返回结果为 (array, left, top) 的 Future。
+        """
+        if self._thread is None:
+            raise RuntimeError("截屏线程未启动")
+        future: Future = Future()
+        self._requests.put((future, monitor))
+        return future
+
+    def _run(self):
+        with mss.mss() as sct:
+            while True:
+                request = self._requests.get()
+                if request is None:
+                    return
+                future, monitor = request
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    start = time.perf_counter()
+                    shot = sct.grab(sct.monitors[monitor] if isinstance(monitor, int) else monitor)
+                    array = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+                    self.last_grab_seconds = time.perf_counter() - start
+                except Exception as exc:
+                    future.set_exception(exc)
+                    continue
+                future.set_result((array, shot.left, shot.top))
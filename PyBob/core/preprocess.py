@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from PySide6.QtCore import QRect, Qt
+from PySide6.QtGui import QImage
+
+from core.capture import qimage_pixels
+
+
+def luminance(pixels: np.ndarray) -> np.ndarray:
+    """BGRA 像素的灰度 (height, width)，uint8；按 BT.601 的整数权重计算。"""
+    b = pixels[..., 0].astype(np.uint16)
+    g = pixels[..., 1].astype(np.uint16)
+    r = pixels[..., 2].astype(np.uint16)
+    return ((b * 29 + g * 150 + r * 77) >> 8).astype(np.uint8)
+
+
+def border_background(gray: np.ndarray) -> int:
+    """取四条边像素的中位数作为背景亮度。"""
+    border = np.concatenate((gray[0], gray[-1], gray[:, 0], gray[:, -1]))
+    return int(np.median(border))
+
+
+def luminance_spread(gray: np.ndarray, tail_pixels: int = 8) -> int:
+    """
+    最亮与最暗像素的亮度差，两端各忽略 tail_pixels 个像素以排除孤立噪点。
+    用固定像素数而不是百分位，大片空白里只有一个小单词时也不会被当成无对比度；用 bincount 代替排序。
+    """
+    counts = np.cumsum(np.bincount(gray.ravel(), minlength=256))
+    total = int(counts[-1])
+    tail = min(tail_pixels, max(0, total // 2 - 1))
+    return int(np.searchsorted(counts, total - tail) - np.searchsorted(counts, tail, side="right"))
+
+
+def _window_sums(mask: np.ndarray, window: int) -> np.ndarray:
+    """mask 在 window x window 窗口中的计数，窗口步长为半个窗口；先按半窗口分块求和，再把相邻 2x2 块相加。"""
+    cell = max(1, window // 2)
+    height, width = mask.shape
+    rows, cols = -(-height // cell), -(-width // cell)
+    padded = np.zeros((rows * cell, cols * cell), dtype=np.uint8)
+    padded[:height, :width] = mask
+    cells = padded.reshape(rows, cell, cols, cell).sum(axis=(1, 3), dtype=np.int32)
+    if rows > 1:
+        cells = cells[:-1] + cells[1:]
+    if cols > 1:
+        cells = cells[:, :-1] + cells[:, 1:]
+    return cells
+
+
+def content_edge_density(gray: np.ndarray, threshold: int, window: int = 32) -> float:
+    """
+    按 window x window 的窗口统计相邻像素亮度差超过 threshold 的边缘，每个窗口取水平、垂直两个方向中较少的一个
+    除以窗口面积，返回所有窗口中的最大值。没有边缘时为 0。
+    窗口大小固定，大片空白里只有一个短单词时密度反映的是单词本身；文字笔画在两个方向上都有边缘，
+    单独一条水平或垂直的分隔线只在一个方向上有边缘，密度接近 0。
+    """
+    if gray.shape[0] < 2 or gray.shape[1] < 2:
+        return 0.0
+    signed = gray.astype(np.int16)
+    # 水平方向的亮度差对应竖直的边缘（如竖笔画），垂直方向的亮度差对应水平的边缘
+    horizontal = (np.abs(np.diff(signed, axis=1)) > threshold)[:-1]
+    vertical = (np.abs(np.diff(signed, axis=0)) > threshold)[:, :-1]
+    if not horizontal.any() or not vertical.any():
+        return 0.0
+    counts = np.minimum(_window_sums(horizontal, window), _window_sums(vertical, window))
+    return float(counts.max()) / (window * window)
+
+
+def change_ratio(previous: np.ndarray, current: np.ndarray, threshold: int) -> float:
+    """两帧灰度中亮度变化超过 threshold 的像素比例；尺寸不同时视为全部变化。"""
+    if previous.shape != current.shape:
+        return 1.0
+    diff = np.abs(previous.astype(np.int16) - current.astype(np.int16))
+    return np.count_nonzero(diff > threshold) / max(1, diff.size)
+
+
+def content_box(mask: np.ndarray, padding: int) -> tuple[int, int, int, int] | None:
+    """mask 中前景的外接矩形 (left, top, width, height)，四周留出 padding；没有前景时返回 None。"""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    height, width = mask.shape
+    top = max(0, int(rows[0]) - padding)
+    bottom = min(height, int(rows[-1]) + 1 + padding)
+    left = max(0, int(cols[0]) - padding)
+    right = min(width, int(cols[-1]) + 1 + padding)
+    return left, top, right - left, bottom - top
+
+
+def estimate_text_height(mask: np.ndarray, min_run: int = 3, strip_width: int = 64, line_fill: float = 0.9) -> int:
+    """
+    按列分条做行投影估计文字高度：每个 strip_width 像素宽的竖条内，连续含前景的行视为一行文字，
+    返回所有竖条中各行高度的中位数。前景占该列 line_fill 以上的列（分隔线、表格边框、滚动条）先去掉，
+    分条则使左右错开的文字块各自成行，不会连成一整段。少于 min_run 行的片段（下划线、噪点）不计入；估计不出时返回 0。
+    """
+    height, width = mask.shape
+    if height == 0 or width == 0:
+        return 0
+    mask = mask[:, np.count_nonzero(mask, axis=0) < line_fill * height]
+    width = mask.shape[1]
+    if width == 0:
+        return 0
+    strips = -(-width // strip_width)
+    padded = np.zeros((height, strips * strip_width), dtype=bool)
+    padded[:, :width] = mask
+    rows = padded.reshape(height, strips, strip_width).any(axis=2)
+    # 每个竖条上下各补一行空白后按列差分；转置后各竖条的起止点在展平顺序中一一对应
+    edges = np.diff(np.pad(rows.astype(np.int8), ((1, 1), (0, 0))), axis=0).T
+    runs = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+    runs = runs[runs >= min_run]
+    if runs.size == 0:
+        return 0
+    return int(np.median(runs))
+
+
+@dataclass
+class PreprocessPlan:
+    """一次预处理的决定和各步骤耗时（毫秒）。"""
+
+    background: int = 255
+    trim: tuple[int, int, int, int] | None = None
+    text_height: int = 0
+    scale: float = 1.0
+    invert: bool = False
+    timings: dict = field(default_factory=dict)
+
+    def describe(self) -> str:
+        parts = []
+        if self.trim is not None:
+            parts.append(f"裁边至 {self.trim[2]}x{self.trim[3]}")
+        if self.text_height:
+            parts.append(f"文字高度 {self.text_height} px")
+        if self.scale != 1.0:
+            parts.append(f"缩放 {self.scale:.2f}")
+        if self.invert:
+            parts.append("反色")
+        timing = "，".join(f"{name} {ms:.1f} ms" for name, ms in self.timings.items())
+        return f"{'，'.join(parts) or '无需处理'}（{timing}）"
+
+
+@dataclass(frozen=True)
+class Preprocessor:
+    """
+    送入 WeChatOCR 前的图片预处理，分析部分全部用 NumPy 向量化完成：
+    去掉四周的纯色边框；按估计的文字高度缩放到 [min_text_height, max_text_height]；深色背景时反色为白底黑字。
+    缩小不低于 min_scale，放大后的像素数不超过 max_pixels，字高估计有误时也不会把选区缩得无法识别或放得过大。
+    """
+
+    enabled: bool = True
+    trim: bool = True
+    trim_tolerance: int = 12
+    trim_padding: int = 6
+    rescale: bool = True
+    min_text_height: int = 20
+    max_text_height: int = 48
+    max_scale: float = 3.0
+    min_scale: float = 0.5
+    max_pixels: int = 4_000_000
+    invert_dark: bool = True
+    dark_threshold: int = 96
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Preprocessor":
+        min_height = max(4, int(config.get("min_text_height", 20)))
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            trim=bool(config.get("trim", True)),
+            trim_tolerance=min(255, max(0, int(config.get("trim_tolerance", 12)))),
+            trim_padding=max(0, int(config.get("trim_padding", 6))),
+            rescale=bool(config.get("rescale", True)),
+            min_text_height=min_height,
+            max_text_height=max(min_height, int(config.get("max_text_height", 48))),
+            max_scale=max(1.0, float(config.get("max_scale", 3.0))),
+            min_scale=min(1.0, max(0.05, float(config.get("min_scale", 0.5)))),
+            max_pixels=max(1, int(config.get("max_pixels", 4_000_000))),
+            invert_dark=bool(config.get("invert_dark", True)),
+            dark_threshold=min(255, max(0, int(config.get("dark_threshold", 96)))),
+        )
+
+    def plan(self, pixels: np.ndarray, gray: np.ndarray | None = None) -> PreprocessPlan:
+        """只做分析，不修改像素；pixels 为 BGRA 数组 (height, width, 4)，gray 为已算好的灰度（可选）。"""
+        plan = PreprocessPlan()
+        start = time.perf_counter()
+        if gray is None:
+            gray = luminance(pixels)
+        plan.background = border_background(gray)
+        mask = np.abs(gray.astype(np.int16) - plan.background) > self.trim_tolerance
+        plan.timings["分析"] = (time.perf_counter() - start) * 1000
+
+        if self.trim:
+            start = time.perf_counter()
+            box = content_box(mask, self.trim_padding)
+            if box is not None and (box[2], box[3]) != (gray.shape[1], gray.shape[0]):
+                plan.trim = box
+                left, top, width, height = box
+                mask = mask[top : top + height, left : left + width]
+            plan.timings["裁边"] = (time.perf_counter() - start) * 1000
+
+        if self.rescale:
+            start = time.perf_counter()
+            plan.text_height = estimate_text_height(mask)
+            if plan.text_height:
+                if plan.text_height < self.min_text_height:
+                    # 放大后的像素数受 max_pixels 限制，已经很大的选区不再放大
+                    budget = (self.max_pixels / max(1, mask.size)) ** 0.5
+                    plan.scale = min(self.max_scale, self.min_text_height / plan.text_height, budget)
+                    if plan.scale <= 1.0:
+                        plan.scale = 1.0
+                elif plan.text_height > self.max_text_height:
+                    plan.scale = max(self.min_scale, self.max_text_height / plan.text_height)
+            plan.timings["估计字高"] = (time.perf_counter() - start) * 1000
+
+        plan.invert = self.invert_dark and plan.background < self.dark_threshold
+        return plan
+
+    def apply(self, image: QImage, gray: np.ndarray | None = None) -> tuple[QImage, PreprocessPlan]:
+        """
+        image 为 RGB32 的裁剪结果。返回处理后的图片（未做任何处理时就是 image 本身）和本次的 PreprocessPlan。
+        反色直接改写图片像素，调用方不应再使用传入的 image。
+        """
+        plan = self.plan(qimage_pixels(image), gray)
+        if plan.trim is not None:
+            image = image.copy(QRect(*plan.trim))
+
+        if plan.scale != 1.0:
+            start = time.perf_counter()
+            image = image.scaled(
+                max(1, round(image.width() * plan.scale)),
+                max(1, round(image.height() * plan.scale)),
+                Qt.AspectRatioMode.IgnoreAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+            plan.timings["缩放"] = (time.perf_counter() - start) * 1000
+
+        if plan.invert:
+            start = time.perf_counter()
+            pixels = qimage_pixels(image, writable=True)
+            np.bitwise_not(pixels[..., :3], out=pixels[..., :3])
+            plan.timings["反色"] = (time.perf_counter() - start) * 1000
+        return image, plan
+
+
+@dataclass(frozen=True)
+class TextPresence:
+    has_text: bool
+    contrast: int
+    edge_density: float
+    seconds: float
+
+
+class TextPrefilter:
+    """
+    判断选区里是否可能有文字：对比度不足或几乎没有锐利边缘（空白、渐变、纯色）时直接跳过 OCR。
+    边缘密度按固定大小的窗口计算，大片空白中的一个短单词不会被判为无文字，单独的分隔线会被判为无文字。
+    只用于排除明显没有文字的区域，照片等有大量边缘的区域仍会交给 WeChatOCR。
+    """
+
+    def __init__(self, enabled: bool = True, min_contrast: int = 32, edge_threshold: int = 48, min_edge_density: float = 0.0035):
+        self.enabled = enabled
+        self.min_contrast = min_contrast
+        self.edge_threshold = edge_threshold
+        self.min_edge_density = min_edge_density
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TextPrefilter":
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            min_contrast=min(255, max(0, int(config.get("min_contrast", 32)))),
+            edge_threshold=min(255, max(0, int(config.get("edge_threshold", 48)))),
+            min_edge_density=max(0.0, float(config.get("min_edge_density", 0.0035))),
+        )
+
+    def check(self, gray: np.ndarray) -> TextPresence:
+        start = time.perf_counter()
+        contrast = luminance_spread(gray)
+        # 对比度不足时不必再算边缘
+        density = content_edge_density(gray, self.edge_threshold) if contrast >= self.min_contrast else 0.0
+        has_text = bool(contrast >= self.min_contrast and density >= self.min_edge_density)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.checked += 1
+            self.seconds += elapsed
+            if not has_text:
+                self.skipped += 1
+        return TextPresence(has_text, contrast, float(density), elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "skipped": self.skipped,
+                "avg_ms": self.seconds / self.checked * 1000 if self.checked else 0.0,
+            }
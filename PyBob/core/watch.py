@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable
+
+from PySide6.QtCore import QObject, QRect, Qt, QTimer
+from PySide6.QtGui import QScreen
+
+from core.capture import CaptureFrame, ScreenCapture
+from core.preprocess import change_ratio, luminance
+
+
+class RegionWatcher(QObject):
+    """
+    按固定间隔重新截取一块区域，与上一次识别时的画面比较（隔行隔列取灰度，NumPy 向量化），
+    变化像素比例达到 min_change 才调用 on_change(frame)。on_change 返回的 Future 完成前不再截屏，
+    识别跟不上刷新时自动降频；画面不变时每次只有一次小区域截屏和一次差分。
+    """
+
+    def __init__(
+        self,
+        capture: ScreenCapture,
+        on_change: Callable[[CaptureFrame], Future],
+        interval_ms: int = 500,
+        pixel_threshold: int = 24,
+        min_change: float = 0.002,
+    ):
+        super().__init__()
+        self.capture = capture
+        self.on_change = on_change
+        self.pixel_threshold = pixel_threshold
+        self.min_change = min_change
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(50, interval_ms))
+        self._timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._timer.timeout.connect(self._tick)
+        self._screen: QScreen | None = None
+        self._rect = QRect()
+        self._baseline = None
+        self._busy = False
+        # 每次 start 递增，丢弃上一轮监视遗留的回调
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.grabs = 0
+        self.changes = 0
+
+    @property
+    def interval_ms(self) -> int:
+        return self._timer.interval()
+
+    @property
+    def watching(self) -> bool:
+        return self._timer.isActive()
+
+    def start(self, screen: QScreen, rect: QRect):
+        """rect 为相对 screen 的逻辑坐标；需在 GUI 线程调用。第一帧总会触发 on_change。"""
+        self.stop()
+        with self._lock:
+            self._generation += 1
+            self._baseline = None
+            self._busy = False
+        self._screen = screen
+        self._rect = QRect(rect)
+        self.grabs = 0
+        self.changes = 0
+        self._timer.start()
+        self._tick()
+
+    def stop(self):
+        if not self._timer.isActive():
+            return
+        self._timer.stop()
+        with self._lock:
+            self._generation += 1
+        print(f"[Watch] 停止监视：截屏 {self.grabs} 次，重新识别 {self.changes} 次")
+
+    def _tick(self):
+        with self._lock:
+            if self._busy:
+                return
+            self._busy = True
+            generation = self._generation
+        self.grabs += 1
+        try:
+            future = self.capture.grab_rect_async(self._screen, self._rect)
+        except Exception as exc:
+            print(f"[Watch] 截屏失败：{exc}")
+            self._idle(generation)
+            return
+        future.add_done_callback(lambda f: self._on_frame(f, generation))
+
+    def _idle(self, generation: int):
+        with self._lock:
+            if generation == self._generation:
+                self._busy = False
+
+    def _on_frame(self, future: Future, generation: int):
+        """在截屏线程（mss）或 GUI 线程（Qt）执行。"""
+        try:
+            frame = future.result()
+            # 隔行隔列取样，差分计算量降为四分之一，对文字变化仍足够敏感
+            sample = luminance(frame.pixels()[::2, ::2])
+        except Exception as exc:
+            print(f"[Watch] 截屏失败：{exc}")
+            self._idle(generation)
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            changed = self._baseline is None or (
+                change_ratio(self._baseline, sample, self.pixel_threshold) >= self.min_change
+            )
+            if changed:
+                self._baseline = sample
+        if not changed:
+            self._idle(generation)
+            return
+        self.changes += 1
+        try:
+            self.on_change(frame).add_done_callback(lambda _: self._idle(generation))
+        except Exception as exc:
+            print(f"[Watch] 识别失败：{exc}")
+            self._idle(generation)
+
+
+class LineTranslationCache:
+    """
+    监视模式下按行缓存译文：画面变化后只翻译新出现的行，未变的行直接复用之前的译文。
+    缺少的行合并为一次请求；返回行数与请求不一致时退回逐行翻译。
+    """
+
+    def __init__(self, max_lines: int = 1024):
+        self.max_lines = max_lines
+        self._lines: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
+
+    def translate(self, provider, text: str, source_lang: str, target_lang: str) -> tuple[str, int]:
+        """返回 (整段译文, 本次实际翻译的行数)。"""
+        lines = text.split("\n")
+
+        def key(line: str) -> tuple:
+            return provider.name, source_lang, target_lang, line
+
+        with self._lock:
+            missing = []
+            for line in lines:
+                if line.strip() and key(line) not in self._lines and line not in missing:
+                    missing.append(line)
+
+        if missing:
+            translated = provider.translate(text="\n".join(missing), source_lang=source_lang, target_lang=target_lang)
+            parts = translated.split("\n")
+            if len(parts) != len(missing):
+                parts = [
+                    provider.translate(text=line, source_lang=source_lang, target_lang=target_lang) for line in missing
+                ]
+            with self._lock:
+                for line, part in zip(missing, parts):
+                    self._lines[key(line)] = part
+                while len(self._lines) > self.max_lines:
+                    self._lines.popitem(last=False)
+
+        with self._lock:
+            result = []
+            for line in lines:
+                if line.strip() and key(line) in self._lines:
+                    self._lines.move_to_end(key(line))
+                    result.append(self._lines[key(line)])
+                else:
+                    result.append("")
+        return "\n".join(result), len(missing)
@@ -1,9 +1,34 @@
 from __future__ import annotations
 
+import threading
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import httpx
 
 
 class TranslationProvider(ABC):
+    # 客户端在连接空闲这么久后主动丢弃，应短于服务端的空闲超时；预热线程在此之前重新连接
+    idle_timeout_seconds = 55.0
+    timeout_seconds = 20.0
+    # 精修模式下的优先级，数值越大越优先：主译文先显示最快的结果，之后被优先级更高的结果替换
+    priority = 0
+
+    def __init__(self):
+        self._client: httpx.Client | None = None
+        self._client_lock = threading.Lock()
+        self._last_active = 0.0
+        # 建立新连接（DNS、TCP、TLS）的耗时，由第一次 warm_up 测得
+        self._connect_seconds: float | None = None
+        self.warm_ups = 0
+        self.warm_requests = 0
+        self.cold_requests = 0
+        self.saved_seconds = 0.0
+        # 正在使用该服务的翻译/预连接数；retire 之后最后一个使用者结束时关闭连接池
+        self._users = 0
+        self._retired = False
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -21,3 +46,95 @@ class TranslationProvider(ABC):
         if result:
             on_delta(result)
         return result
+
+    def warm_url(self) -> str:
+        """预连接时请求的地址，与 translate 使用同一主机即可。"""
+        return ""
+
+    def _http(self) -> httpx.Client:
+        """各次翻译共用的 httpx.Client，连接保持在连接池中复用。"""
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    timeout=self.timeout_seconds,
+                    limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=self.idle_timeout_seconds),
+                )
+            return self._client
+
+    def _is_warm(self) -> bool:
+        return self._last_active > 0 and time.monotonic() - self._last_active < self.idle_timeout_seconds
+
+    def _begin_request(self):
+        """记录本次请求能否复用已有连接；复用时按预连接测得的建连耗时计入节省的时间。"""
+        warm = self._is_warm()
+        if warm:
+            self.warm_requests += 1
+            self.saved_seconds += self._connect_seconds or 0.0
+        else:
+            self.cold_requests += 1
+        self._last_active = time.monotonic()
+
+    @contextmanager
+    def in_use(self):
+        """包住一次翻译或预连接；服务被 retire 后，等所有使用者退出才关闭连接池。"""
+        with self._client_lock:
+            self._users += 1
+        try:
+            yield self
+        finally:
+            with self._client_lock:
+                self._users -= 1
+                idle = self._retired and self._users == 0
+            if idle:
+                self.close()
+
+    def retire(self):
+        """不再使用该服务（例如设置变更后已重建）：没有进行中的请求时立即关闭，否则在最后一个请求结束后关闭。"""
+        with self._client_lock:
+            self._retired = True
+            idle = self._users == 0
+        if idle:
+            self.close()
+
+    def needs_warm_up(self, margin: float = 0.8) -> bool:
+        """连接已空闲超过 idle_timeout 的 margin 倍（或从未连接）时需要重新预连接。"""
+        if self._retired or not self.warm_url():
+            return False
+        return time.monotonic() - self._last_active >= self.idle_timeout_seconds * margin
+
+    def warm_up(self) -> float:
+        """
+        向 warm_url 发一个 HEAD 请求，提前完成 DNS、TCP 和 TLS 握手并把连接留在连接池；返回耗时（秒）。
+        第一次预连接会再发一次请求，两次耗时之差作为建立新连接的耗时估计。
+        """
+        url = self.warm_url()
+        if not url or self._retired:
+            return 0.0
+        with self.in_use():
+            client = self._http()
+            start = time.perf_counter()
+            client.head(url)
+            elapsed = time.perf_counter() - start
+            if self._connect_seconds is None:
+                again = time.perf_counter()
+                client.head(url)
+                self._connect_seconds = max(0.0, elapsed - (time.perf_counter() - again))
+        self._last_active = time.monotonic()
+        self.warm_ups += 1
+        return elapsed
+
+    def connection_stats(self) -> dict:
+        return {
+            "warm_ups": self.warm_ups,
+            "warm_requests": self.warm_requests,
+            "cold_requests": self.cold_requests,
+            "connect_ms": (self._connect_seconds or 0.0) * 1000,
+            "saved_ms": self.saved_seconds * 1000,
+            "saved_ms_per_request": self.saved_seconds * 1000 / self.warm_requests if self.warm_requests else 0.0,
+        }
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import httpx
-
 from plugins.base import TranslationProvider
 
 
+UNOFFICIAL_URL = "https://translate.googleapis.com/translate_a/single"
+
+
 class GoogleTranslator(TranslationProvider):
     def __init__(self, api_key: str, endpoint: str = "https://translation.googleapis.com/language/translate/v2", timeout_seconds: float = 20.0):
+        super().__init__()
         self.api_key = api_key
         self.endpoint = endpoint.rstrip("/")
         self.timeout_seconds = timeout_seconds
@@ -15,6 +17,9 @@ class GoogleTranslator(TranslationProvider):
     def name(self) -> str:
         return "google"
 
+    def warm_url(self) -> str:
+        return self.endpoint if self.api_key else UNOFFICIAL_URL
+
     def translate(self, text: str, source_lang: str, target_lang: str) -> str:
         if not self.api_key:
             return self._translate_unofficial(text, source_lang, target_lang)
@@ -28,10 +33,10 @@ class GoogleTranslator(TranslationProvider):
         if source_lang and source_lang != "auto":
             params["source"] = source_lang
 
-        with httpx.Client(timeout=self.timeout_seconds) as client:
-            response = client.post(self.endpoint, params=params)
-            response.raise_for_status()
-            data = response.json()
+        self._begin_request()
+        response = self._http().post(self.endpoint, params=params)
+        response.raise_for_status()
+        data = response.json()
 
         translations = data.get("data", {}).get("translations", [])
         if not translations:
@@ -46,12 +51,10 @@ class GoogleTranslator(TranslationProvider):
             "dt": "t",
             "q": text,
         }
-        url = "https://translate.googleapis.com/translate_a/single"
-
-        with httpx.Client(timeout=self.timeout_seconds) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        self._begin_request()
+        response = self._http().get(UNOFFICIAL_URL, params=params)
+        response.raise_for_status()
+        data = response.json()
 
         if not isinstance(data, list) or not data or not isinstance(data[0], list):
             raise RuntimeError("Google 非官方翻译返回结构异常")
@@ -46,13 +46,22 @@ class TranslatorManager:
         if not providers:
             providers = [self.config.get("provider", "google")]
 
+        # 每项可以是服务名，也可以是 {name, priority}
         unique = []
-        seen = set()
+        priorities: dict[str, int] = {}
         for item in providers:
-            name = (item or "").strip().lower()
-            if not name or name in seen:
+            if isinstance(item, dict):
+                name = str(item.get("name") or "").strip().lower()
+                priority = item.get("priority", 0)
+            else:
+                name = (item or "").strip().lower()
+                priority = 0
+            if not name or name in priorities:
                 continue
-            seen.add(name)
+            try:
+                priorities[name] = int(priority)
+            except (TypeError, ValueError):
+                priorities[name] = 0
             unique.append(name)
 
         if not unique:
@@ -63,7 +72,9 @@ class TranslatorManager:
 
         for name in unique:
             if name != "openai":
-                built.append(self._build_one(name))
+                provider = self._build_one(name)
+                provider.priority = priorities.get(name, 0)
+                built.append(provider)
                 continue
 
             profiles = openai_cfg.get("profiles", [])
@@ -75,16 +86,21 @@ class TranslatorManager:
                         continue
 
                     profile_name = (p.get("name") or f"openai-{idx}").strip()
-                    built.append(
-                        OpenAITranslator(
-                            api_key=p.get("api_key", openai_cfg.get("api_key", "")),
-                            base_url=p.get("base_url", openai_cfg.get("base_url", "https://api.openai.com/v1")),
-                            model=p.get("model", openai_cfg.get("model", "gpt-4o-mini")),
-                            system_prompt=p.get("system_prompt", openai_cfg.get("system_prompt", DEFAULT_OPENAI_SYSTEM_PROMPT)),
-                            provider_name=f"openai:{profile_name}",
-                        )
+                    provider = OpenAITranslator(
+                        api_key=p.get("api_key", openai_cfg.get("api_key", "")),
+                        base_url=p.get("base_url", openai_cfg.get("base_url", "https://api.openai.com/v1")),
+                        model=p.get("model", openai_cfg.get("model", "gpt-4o-mini")),
+                        system_prompt=p.get("system_prompt", openai_cfg.get("system_prompt", DEFAULT_OPENAI_SYSTEM_PROMPT)),
+                        provider_name=f"openai:{profile_name}",
                     )
+                    try:
+                        provider.priority = int(p.get("priority", priorities.get(name, 0)))
+                    except (TypeError, ValueError):
+                        provider.priority = priorities.get(name, 0)
+                    built.append(provider)
             else:
-                built.append(self._build_one("openai"))
+                provider = self._build_one("openai")
+                provider.priority = priorities.get(name, 0)
+                built.append(provider)
 
         return built
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import httpx
-
 from plugins.base import TranslationProvider
 
 
@@ -13,6 +11,7 @@ class MicrosoftTranslator(TranslationProvider):
         endpoint: str = "https://api.cognitive.microsofttranslator.com",
         timeout_seconds: float = 20.0,
     ):
+        super().__init__()
         self.subscription_key = subscription_key
         self.region = region
         self.endpoint = endpoint.rstrip("/")
@@ -22,6 +21,9 @@ class MicrosoftTranslator(TranslationProvider):
     def name(self) -> str:
         return "microsoft"
 
+    def warm_url(self) -> str:
+        return self.endpoint
+
     def translate(self, text: str, source_lang: str, target_lang: str) -> str:
         if not self.subscription_key:
             raise ValueError("Microsoft Translator key 未配置")
@@ -41,9 +43,9 @@ class MicrosoftTranslator(TranslationProvider):
         body = [{"text": text}]
         url = f"{self.endpoint}/translate"
 
-        with httpx.Client(timeout=self.timeout_seconds) as client:
-            response = client.post(url, params=params, headers=headers, json=body)
-            response.raise_for_status()
-            data = response.json()
+        self._begin_request()
+        response = self._http().post(url, params=params, headers=headers, json=body)
+        response.raise_for_status()
+        data = response.json()
 
         return data[0]["translations"][0]["text"].strip()
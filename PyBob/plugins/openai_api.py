@@ -17,6 +17,7 @@ class OpenAITranslator(TranslationProvider):
         provider_name: str = "openai",
         timeout_seconds: float = 20.0,
     ):
+        super().__init__()
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.model = model
@@ -28,6 +29,9 @@ class OpenAITranslator(TranslationProvider):
     def name(self) -> str:
         return self.provider_name
 
+    def warm_url(self) -> str:
+        return self.base_url
+
     def translate(self, text: str, source_lang: str, target_lang: str) -> str:
         if not self.api_key:
             raise ValueError("OpenAI API key 未配置")
@@ -51,10 +55,10 @@ class OpenAITranslator(TranslationProvider):
         }
         url = f"{self.base_url}/chat/completions"
 
-        with httpx.Client(timeout=self.timeout_seconds) as client:
-            response = client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        self._begin_request()
+        response = self._http().post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        data = response.json()
 
         return data["choices"][0]["message"]["content"].strip()
 
@@ -84,30 +88,30 @@ class OpenAITranslator(TranslationProvider):
 
         chunks = []
         timeout = httpx.Timeout(connect=10.0, read=60.0, write=20.0, pool=10.0)
-        with httpx.Client(timeout=timeout) as client:
-            with client.stream("POST", url, json=payload, headers=headers) as response:
-                response.raise_for_status()
-                for line in response.iter_lines():
-                    if not line:
-                        continue
-                    if not line.startswith("data:"):
-                        continue
-
-                    data_text = line[5:].strip()
-                    if data_text == "[DONE]":
-                        break
-
-                    try:
-                        data = json.loads(data_text)
-                    except json.JSONDecodeError:
-                        continue
-
-                    choices = data.get("choices") or []
-                    if not choices:
-                        continue
-                    delta = (choices[0].get("delta") or {}).get("content")
-                    if delta:
-                        chunks.append(delta)
-                        on_delta(delta)
+        self._begin_request()
+        with self._http().stream("POST", url, json=payload, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                if not line.startswith("data:"):
+                    continue
+
+                data_text = line[5:].strip()
+                if data_text == "[DONE]":
+                    break
+
+                try:
+                    data = json.loads(data_text)
+                except json.JSONDecodeError:
+                    continue
+
+                choices = data.get("choices") or []
+                if not choices:
+                    continue
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    chunks.append(delta)
+                    on_delta(delta)
 
         return "".join(chunks).strip()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from plugins.base import TranslationProvider
+
+
+class ProviderWarmer:
+    """
+    按下快捷键时在后台预连接所有翻译服务，握手与用户拖动选区同时进行；
+    最后一次按键后的 keep_warm_seconds 内，在连接空闲到超时之前重新预连接，使翻译请求总能复用已有连接。
+    """
+
+    def __init__(self, providers: list[TranslationProvider], keep_warm_seconds: float = 300.0, enabled: bool = True):
+        self.providers = list(providers)
+        self.keep_warm_seconds = keep_warm_seconds
+        self.enabled = enabled
+        self._last_touch = 0.0
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bob-warm")
+        self._warming: set[int] = set()
+        # 预连接失败的服务在该时间之前不再重试
+        self._retry_after: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="bob-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self._executor.shutdown(wait=False)
+
+    def set_providers(self, providers: list[TranslationProvider]):
+        with self._lock:
+            self.providers = list(providers)
+        self._wake.set()
+
+    def touch(self):
+        """用户有操作（按下快捷键）时调用，可在任意线程调用。"""
+        if not self.enabled:
+            return
+        self._last_touch = time.monotonic()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(timeout=5.0)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                return
+            if time.monotonic() - self._last_touch > self.keep_warm_seconds:
+                continue
+            with self._lock:
+                providers = list(self.providers)
+            for provider in providers:
+                if provider.needs_warm_up():
+                    self._warm(provider)
+
+    def _warm(self, provider: TranslationProvider):
+        key = id(provider)
+        with self._lock:
+            if key in self._warming or time.monotonic() < self._retry_after.get(key, 0.0):
+                return
+            self._warming.add(key)
+
+        def run():
+            try:
+                elapsed = provider.warm_up()
+                print(f"[Translate] 已预连接 {provider.name}，用时 {elapsed * 1000:.0f} ms")
+            except Exception as exc:
+                print(f"[Translate] 预连接 {provider.name} 失败：{exc}")
+                with self._lock:
+                    self._retry_after[key] = time.monotonic() + provider.idle_timeout_seconds
+            finally:
+                with self._lock:
+                    self._warming.discard(key)
+
+        self._executor.submit(run)
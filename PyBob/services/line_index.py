@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Optional
+
+
+class LineIndex:
+    """
+    OCR 文字行的空间索引：按 bucket 像素高的横条分桶，查询只检查与选区相交的横条中的行。
+    坐标与 OCR 结果的 location 相同（截图像素）；查询结果保持引擎返回的阅读顺序。
+    """
+
+    def __init__(self, lines: list[dict], bucket: int = 64):
+        self.bucket = max(1, bucket)
+        self.lines: list[dict] = []
+        self._boxes: list[tuple[float, float, float, float]] = []
+        self._rows: dict[int, list[int]] = defaultdict(list)
+        for line in lines:
+            box = self._box(line)
+            if box is None or not (line.get("text") or "").strip():
+                continue
+            index = len(self.lines)
+            self.lines.append(line)
+            self._boxes.append(box)
+            for row in range(int(box[1] // self.bucket), int(box[3] // self.bucket) + 1):
+                self._rows[row].append(index)
+
+    @classmethod
+    def from_result(cls, result: dict, bucket: int = 64) -> "LineIndex":
+        return cls(result.get("ocrResult", []), bucket)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    @staticmethod
+    def _box(line: dict) -> Optional[tuple[float, float, float, float]]:
+        location = line.get("location")
+        if not location:
+            return None
+        # proto3 不传输 0，贴着截图左边或上边的行缺失的坐标就是 0
+        box = tuple(location.get(key) or 0.0 for key in ("left", "top", "right", "bottom"))
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return None
+        return box
+
+    def query(self, left: float, top: float, right: float, bottom: float, edge: float = 0.15) -> tuple[list[dict], float]:
+        """
+        返回 (选区内的行, 覆盖率)。只有一小部分（不到 edge）落在选区内的行视为擦边，不计入；
+        覆盖率为计入的各行落在选区内面积比例的最小值，选区把某一行截成两半时覆盖率就会偏低。
+        没有任何行时覆盖率为 0。
+        """
+        candidates = set()
+        for row in range(int(top // self.bucket), int(bottom // self.bucket) + 1):
+            candidates.update(self._rows.get(row, ()))
+
+        selected = []
+        coverage = 1.0
+        for index in sorted(candidates):
+            line_left, line_top, line_right, line_bottom = self._boxes[index]
+            width = min(right, line_right) - max(left, line_left)
+            height = min(bottom, line_bottom) - max(top, line_top)
+            if width <= 0 or height <= 0:
+                continue
+            inside = width * height / ((line_right - line_left) * (line_bottom - line_top))
+            if inside < edge:
+                continue
+            selected.append(self.lines[index])
+            coverage = min(coverage, inside)
+        return selected, coverage if selected else 0.0
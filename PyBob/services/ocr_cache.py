@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+# 缓存文本的格式（规范化规则等）变化时递增，旧的磁盘缓存随之失效
+CACHE_VERSION = 2
+
+
+class OCRCache:
+    """
+    OCR 文本的 LRU 缓存，键为裁剪后像素与尺寸的哈希，同一块区域重复框选时不再调用 WeChatOCR。
+    内存层按条目数和字节数限制；指定 disk_dir 时再加一层磁盘缓存，重启后仍可命中。
+    namespace 描述影响识别结果的设置（如预处理参数），一并计入键，设置改变后不会命中旧结果；
+    空文本不缓存，偶发的识别失败或超时不会被固定下来。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 8 * 1024 * 1024,
+        disk_dir: Optional[Path] = None,
+        disk_max_entries: int = 4096,
+        namespace: str = "",
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        self.namespace = f"v{CACHE_VERSION}:{namespace}".encode()
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._disk_count = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_count = sum(1 for _ in self.disk_dir.glob("*.txt"))
+
+    def make_key(self, pixels, width: int, height: int) -> str:
+        """pixels 为支持缓冲区协议的像素数据（bytes、memoryview、连续的 NumPy 数组）。"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.namespace)
+        digest.update(f"|{width}x{height}:".encode())
+        digest.update(pixels)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _cost(key: str, text: str) -> int:
+        return len(key) + len(text.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+        text = self._read_disk(key)
+        with self._lock:
+            if not text:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, text)
+        return text
+
+    def put(self, key: str, text: str):
+        if not text:
+            return
+        with self._lock:
+            self._store(key, text)
+        self._write_disk(key, text)
+
+    def _store(self, key: str, text: str):
+        # 调用方需持有 self._lock
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= self._cost(key, old)
+        cost = self._cost(key, text)
+        if cost > self.max_bytes:
+            return
+        self._entries[key] = text
+        self._bytes += cost
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            old_key, old_text = self._entries.popitem(last=False)
+            self._bytes -= self._cost(old_key, old_text)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if self.disk_dir is None:
+            return None
+        try:
+            return (self.disk_dir / f"{key}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, text: str):
+        if self.disk_dir is None:
+            return
+        path = self.disk_dir / f"{key}.txt"
+        temp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            existed = path.exists()
+            temp.write_text(text, encoding="utf-8")
+            os.replace(temp, path)
+        except OSError as exc:
+            print(f"[OCR] 写入磁盘缓存失败：{exc}")
+            return
+        with self._lock:
+            if not existed:
+                self._disk_count += 1
+            prune = self._disk_count > self.disk_max_entries
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """删除最早写入的文件，把磁盘缓存降到上限的 90%。"""
+        files = sorted(self.disk_dir.glob("*.txt"), key=lambda p: p.stat().st_mtime)
+        keep = int(self.disk_max_entries * 0.9)
+        for path in files[: max(0, len(files) - keep)]:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_count = min(len(files), keep)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._disk_count = 0
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*.txt"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "disk_entries": self._disk_count,
+            }
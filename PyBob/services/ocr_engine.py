@@ -1,24 +1,154 @@
 from __future__ import annotations
 
+import os
 import sys
+import time
+import zlib
+import struct
+import tempfile
+import math
+import itertools
 import threading
 import importlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+OCR_TIMEOUT_SECONDS = 12.0
+TASK_ID_WAIT_SECONDS = 2.0
+TASK_LEASE_SECONDS = 30.0
+CONNECT_TIMEOUT_SECONDS = 15.0
+# WeChatOCR 最多同时处理 32 个 task_id
+MAX_IN_FLIGHT = 32
+MAX_LATE_TASKS = MAX_IN_FLIGHT * 2
+# 分块识别的默认带高和相邻带的重叠（像素），重叠需大于一行文字的两倍高度
+TILE_HEIGHT = 720
+TILE_OVERLAP = 96
+
+
+def _write_warmup_image(path: Path):
+    """生成一张很小的灰度 PNG（白底黑块），只用来让引擎提前加载模型、跑一次推理。"""
+    width, height = 96, 32
+    rows = bytearray()
+    for y in range(height):
+        rows.append(0)
+        for x in range(width):
+            ink = 10 <= y < 22 and 8 <= x < 88 and (x - 8) % 10 < 6
+            rows.append(0 if ink else 255)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    png = b"\x89PNG\r\n\x1a\n"
+    png += chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+    png += chunk(b"IDAT", zlib.compress(bytes(rows)))
+    png += chunk(b"IEND", b"")
+    path.write_bytes(png)
+
+
+@dataclass
+class _PendingOCR:
+    future: Future
+    img_path: str
+    timeout: float
+    # 从提交时开始计时，排队、等待 task_id 和引擎重启的时间都计算在内
+    deadline: float = 0.0
+    attempts: int = 0
 
 
 class WechatOCRService:
-    def __init__(self, plugin_dir: Path, wechat_ocr_dir: str = "", wechat_dir: str = ""):
+    def __init__(
+        self,
+        plugin_dir: Path,
+        wechat_ocr_dir: str = "",
+        wechat_dir: str = "",
+        task_id_wait: float = TASK_ID_WAIT_SECONDS,
+        task_lease: float = TASK_LEASE_SECONDS,
+        connect_timeout: float = CONNECT_TIMEOUT_SECONDS,
+        warmup: bool = True,
+        watchdog: bool = True,
+        paths_per_task: int = 1,
+        transport_factory: Optional[Callable[[], object]] = None,
+    ):
         self.plugin_dir = plugin_dir
         self.wechat_ocr_dir = wechat_ocr_dir
         self.wechat_dir = wechat_dir
+        self.task_id_wait = task_id_wait
+        self.task_lease = task_lease
+        self.connect_timeout = connect_timeout
+        self.warmup = warmup
+        self.watchdog = watchdog
+        # 每个 OcrRequest 打包的图片数，只有确认 WeChatOCR 会逐张返回结果时才大于 1
+        self.paths_per_task = max(1, int(paths_per_task))
+        # 每次(重新)启动引擎时调用, 返回代替 mmmojo.dll 的传输层, 例如 wechat_ocr.fake_mmmojo.FakeMmmojoDll
+        self.transport_factory = transport_factory
         self._ocr_manager = None
-        self._results: Dict[str, dict] = {}
-        self._events: Dict[str, threading.Event] = {}
+        # task_id -> 该 task 中尚未返回结果的请求（打包时一个 task 对应多张图片）
+        self._pending: Dict[int, List[_PendingOCR]] = {}
+        # 已超时/取消的 task_id，用来识别并丢弃迟到的结果，容量有上限
+        self._expired: OrderedDict[int, str] = OrderedDict()
+        # 引擎重启、断开或尚未连接时提交的请求，连接后统一发送
+        self._waiting: list[_PendingOCR] = []
+        # 请求都在该线程发送：等待连接和空闲 task_id 不阻塞调用方，也不占用连接回调所在的 IPC 线程
+        self._submit_executor: Optional[ThreadPoolExecutor] = None
+        self._restarting = False
+        self._disconnected = False
+        self._launched_at = 0.0
+        self._consecutive_timeouts = 0
+        self._late_results = 0
         self._lock = threading.Lock()
         self._started = False
+        self._stop_event = threading.Event()
+        self._supervisor: Optional[OCRSupervisor] = None
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_seconds: Optional[float] = None
+        self._warmed_up = threading.Event()
 
-    def start(self):
+    def ready(self) -> bool:
+        """引擎已连接（启用预热时还要求预热完成），可以立即处理请求。"""
+        manager = self._ocr_manager
+        if not self._started or manager is None or self._restarting:
+            return False
+        if not manager.IsConnected():
+            return False
+        return not self.warmup or self._warmed_up.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        manager = self._ocr_manager
+        if not self._started or manager is None:
+            return False
+        if not manager.WaitConnected(timeout):
+            return False
+        if not self.warmup:
+            return True
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        return self._warmed_up.wait(remaining)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(map(len, self._pending.values())) + len(self._waiting)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "in_flight": sum(map(len, self._pending.values())) + len(self._waiting),
+                "late_results": self._late_results,
+            }
+        stats["warmup_seconds"] = self._warmup_seconds
+        manager = self._ocr_manager
+        if manager is not None:
+            stats["connect_seconds"] = manager.GetConnectElapsed()
+            stats["task_ids"] = manager.GetTaskIdStats()
+        if self._supervisor is not None:
+            stats["supervisor"] = self._supervisor.stats()
+        return stats
+
+    def _create_manager(self):
         plugin_path = str(self.plugin_dir)
         if plugin_path not in sys.path:
             sys.path.insert(0, plugin_path)
@@ -36,55 +166,705 @@ class WechatOCRService:
         exe_path = self.wechat_ocr_dir or str(default_wechat_ocr)
         usr_dir = self.wechat_dir or str(default_wechat_dir)
 
-        self._ocr_manager = OcrManager(usr_dir)
-        self._ocr_manager.SetExePath(exe_path)
-        self._ocr_manager.SetUsrLibDir(usr_dir)
-        self._ocr_manager.SetOcrResultCallback(self._ocr_callback)
+        transport = self.transport_factory() if self.transport_factory else None
+        manager = OcrManager(usr_dir, transport=transport)
+        manager.SetExePath(exe_path)
+        manager.SetUsrLibDir(usr_dir)
+        manager.SetOcrResultCallback(self._ocr_callback)
+        manager.SetConnectStateCallback(lambda connected: self._on_connect_state(manager, connected))
+        manager.SetTaskIdWait(self.task_id_wait)
+        manager.SetTaskLeaseTimeout(self.task_lease)
+        manager.SetConnectWait(self.connect_timeout)
+        manager.SetMaxPathsPerTask(self.paths_per_task)
+        return manager
+
+    def start(self):
+        self._warmed_up.clear()
+        self._warmup_seconds = None
+        self._submit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-submit")
+        self._ocr_manager = self._create_manager()
+        self._launched_at = time.monotonic()
         self._ocr_manager.StartWeChatOCR()
         self._started = True
 
+        self._stop_event.clear()
+        self._supervisor = OCRSupervisor(self, restart=self.watchdog)
+        self._supervisor.start()
+        self._warmup_thread = threading.Thread(target=self._warmup_run, name="ocr-warmup", daemon=True)
+        self._warmup_thread.start()
+
+    def _warmup_run(self):
+        manager = self._ocr_manager
+        if manager is None or not manager.WaitConnected(self.connect_timeout):
+            print(f"[OCR] 引擎在 {self.connect_timeout:.0f}s 内未连接")
+            self._warmed_up.set()
+            return
+        connect_seconds = manager.GetConnectElapsed() or 0.0
+        print(f"[OCR] 引擎已连接，用时 {connect_seconds * 1000:.0f} ms")
+        if not self.warmup:
+            return
+
+        image_path = Path(tempfile.gettempdir()) / f"pybob-ocr-warmup-{os.getpid()}-{id(self)}.png"
+        start = time.perf_counter()
+        try:
+            _write_warmup_image(image_path)
+            self.recognize_async(image_path).result(timeout=OCR_TIMEOUT_SECONDS + 1)
+        except Exception as exc:
+            print(f"[OCR] 预热失败：{exc}")
+        else:
+            self._warmup_seconds = time.perf_counter() - start
+            print(f"[OCR] 预热完成，用时 {self._warmup_seconds * 1000:.0f} ms")
+        finally:
+            image_path.unlink(missing_ok=True)
+            # 预热失败也不应阻塞后续请求
+            self._warmed_up.set()
+
+    def _on_connect_state(self, manager, connected: bool):
+        # 只关心当前引擎的状态变化，自己关闭/替换引擎时不算
+        if manager is not self._ocr_manager or self._stop_event.is_set():
+            return
+        if connected:
+            self._flush_waiting()
+            return
+        with self._lock:
+            if self._restarting:
+                return
+            self._disconnected = True
+        print("[OCR] WeChatOCR 连接已断开")
+
     def _ocr_callback(self, img_path: str, results: dict):
-        event = None
+        task_id = results.get("taskId")
         with self._lock:
-            self._results[img_path] = results
-            event = self._events.get(img_path)
-        if event is not None:
-            event.set()
+            pending = self._take(task_id, img_path)
+            if pending is None:
+                self._late_results += 1
+                expired_path = self._expired.pop(task_id, None)
+            else:
+                self._consecutive_timeouts = 0
+        if pending is None:
+            print(f"[OCR] 丢弃迟到的结果 task_id={task_id} path={expired_path or img_path}")
+            return
+        if not pending.future.done():
+            pending.future.set_result(results)
 
     def stop(self):
+        self._stop_event.set()
+        self._warmed_up.set()
+        if self._supervisor is not None:
+            self._supervisor.stop()
+            self._supervisor = None
         if self._ocr_manager is not None:
             self._ocr_manager.KillWeChatOCR()
             self._ocr_manager = None
         self._started = False
+        if self._submit_executor is not None:
+            self._submit_executor.shutdown(wait=False, cancel_futures=True)
+            self._submit_executor = None
 
-    def recognize(self, image_path: Path) -> str:
-        if not self._started or self._ocr_manager is None:
-            raise RuntimeError("OCR 服务未启动")
+        with self._lock:
+            pending = [item for items in self._pending.values() for item in items] + self._waiting
+            self._pending.clear()
+            self._waiting = []
+        for item in pending:
+            if not item.future.done():
+                item.future.set_exception(RuntimeError("OCR 服务已停止"))
 
-        img_path = str(image_path.resolve())
-        event = threading.Event()
+    def _take(self, task_id: int, img_path: str) -> Optional[_PendingOCR]:
+        # 调用方需持有 self._lock；同一 task 的结果按图片路径对应到请求
+        items = self._pending.get(task_id)
+        if not items:
+            return None
+        for item in items:
+            if item.img_path == img_path:
+                items.remove(item)
+                break
+        else:
+            return None
+        if not items:
+            del self._pending[task_id]
+        return item
 
+    def _forget(self, task_id: int, item: _PendingOCR):
+        # 调用方需持有 self._lock
+        items = self._pending.get(task_id, [])
+        items[:] = [other for other in items if other is not item]
+        if items:
+            return
+        self._pending.pop(task_id, None)
+        self._expired[task_id] = item.img_path
+        while len(self._expired) > MAX_LATE_TASKS:
+            self._expired.popitem(last=False)
+
+    def _discard(self, future: Future):
         with self._lock:
-            self._events[img_path] = event
-            self._results.pop(img_path, None)
+            self._waiting = [item for item in self._waiting if item.future is not future]
+            for task_id, items in list(self._pending.items()):
+                for item in list(items):
+                    if item.future is future:
+                        self._forget(task_id, item)
 
-        try:
-            self._ocr_manager.DoOCRTask(img_path)
-            if not event.wait(timeout=12):
-                raise RuntimeError("OCR 失败: 识别超时")
+    def _reap_expired(self):
+        now = time.monotonic()
+        expired = []
+        stale = []
+        with self._lock:
+            for task_id, items in list(self._pending.items()):
+                for item in list(items):
+                    if item.deadline <= now:
+                        self._forget(task_id, item)
+                        expired.append(item)
+            self._consecutive_timeouts += len(expired)
+            # 排队等引擎就绪的请求同样按提交时的截止时间失败，不计入连续超时
+            stale = [item for item in self._waiting if item.deadline <= now]
+            if stale:
+                self._waiting = [item for item in self._waiting if item.deadline > now]
+        for item in expired:
+            if not item.future.done():
+                item.future.set_exception(RuntimeError("OCR 失败: 识别超时"))
+        for item in stale:
+            if not item.future.done():
+                item.future.set_exception(RuntimeError("OCR 失败: 等待 WeChatOCR 就绪超时"))
 
+    def _health_problem(self, stuck_after: int) -> Optional[str]:
+        """返回需要重启引擎的原因，健康时返回 None。"""
+        with self._lock:
+            if self._restarting or not self._started:
+                return None
+            if self._disconnected:
+                return "连接断开"
+            if self._consecutive_timeouts >= stuck_after:
+                return f"连续 {self._consecutive_timeouts} 个任务超时"
+            manager = self._ocr_manager
+        if manager is not None and not manager.IsConnected():
+            if time.monotonic() - self._launched_at > self.connect_timeout:
+                return "启动后未能连接"
+        return None
+
+    def _begin_restart(self) -> list[_PendingOCR]:
+        """摘下当前引擎，返回仍在途的请求，之后新的请求先排队。"""
+        with self._lock:
+            self._restarting = True
+            self._disconnected = False
+            self._consecutive_timeouts = 0
+            in_flight = [item for items in self._pending.values() for item in items]
+            self._pending.clear()
+            manager = self._ocr_manager
+        if manager is not None:
+            try:
+                manager.KillWeChatOCR()
+            except Exception as exc:
+                print(f"[OCR] 关闭旧引擎失败：{exc}")
+        return in_flight
+
+    def _launch(self) -> bool:
+        manager = self._create_manager()
+        self._ocr_manager = manager
+        self._launched_at = time.monotonic()
+        manager.StartWeChatOCR()
+        if manager.WaitConnected(self.connect_timeout):
+            return True
+        manager.KillWeChatOCR()
+        return False
+
+    def _finish_restart(self, in_flight: list[_PendingOCR]):
+        with self._lock:
+            self._restarting = False
+            queued = in_flight + self._waiting
+            self._waiting = []
+        retry = []
+        for item in queued:
+            if item.future.done():
+                continue
+            if item.attempts >= 2:
+                # 同一张图已经随引擎一起失败过一次，不再重发，避免坏图反复拖垮引擎
+                item.future.set_exception(RuntimeError("OCR 失败: 引擎重启后仍未完成"))
+                continue
+            retry.append(item)
+        with self._lock:
+            self._waiting.extend(retry)
+        self._flush_waiting()
+
+    def _sendable_manager(self):
+        """可以立即发送请求的引擎；重启中、已断开或尚未连接时返回 None。调用方需持有 self._lock。"""
+        manager = self._ocr_manager
+        if self._restarting or self._disconnected or manager is None or not manager.IsConnected():
+            return None
+        return manager
+
+    def _flush_waiting(self):
+        """引擎可用时在 ocr-submit 线程发送排队的请求，可在任意线程调用。"""
+        with self._lock:
+            if not self._waiting or self._sendable_manager() is None or self._submit_executor is None:
+                return
+            items, self._waiting = self._waiting, []
+            try:
+                self._submit_executor.submit(self._submit, items)
+            except RuntimeError:
+                # 服务正在停止，由 stop 统一让这些请求失败
+                self._waiting = items + self._waiting
+
+    def _submit(self, items: list[_PendingOCR]):
+        """在 ocr-submit 线程执行。"""
+        now = time.monotonic()
+        for item in items:
+            # 在队列里等到超时的请求不再占用 task_id
+            if item.deadline <= now and not item.future.done():
+                item.future.set_exception(RuntimeError("OCR 失败: 识别超时"))
+        items = [item for item in items if not item.future.done()]
+        if not items:
+            return
+        with self._lock:
+            manager = self._sendable_manager()
+            if manager is None:
+                # 不向已断开的引擎发送：CheckPicPaths 会在旧引擎上等待连接直到超时
+                self._waiting.extend(items)
+                return
+
+        unsent = iter(items)
+        registered = set()
+
+        def register(task_id: int, paths: list[str]):
+            group = list(itertools.islice(unsent, len(paths)))
             with self._lock:
-                result = self._results.pop(img_path, None)
+                self._expired.pop(task_id, None)
+                for item in group:
+                    item.attempts += 1
+                    registered.add(id(item))
+                self._pending[task_id] = group
 
-            if result is None:
-                raise RuntimeError("OCR 失败: 未返回结果")
-        finally:
+        # 等待空闲 task_id 不超过这批请求中最早的截止时间
+        wait = max(0.0, min(self.task_id_wait, min(item.deadline for item in items) - time.monotonic()))
+        try:
+            manager.DoOCRBatch([item.img_path for item in items], on_task_id=register, task_id_wait=wait)
+        except Exception as exc:
+            unsent = [item for item in items if id(item) not in registered and not item.future.done()]
             with self._lock:
-                self._events.pop(img_path, None)
+                # 发送途中引擎断开或被替换：重新排队，等当前引擎连接后再发
+                requeue = manager is not self._ocr_manager or self._sendable_manager() is None
+                if requeue:
+                    self._waiting.extend(unsent)
+            if requeue:
+                self._flush_waiting()
+                return
+            for item in unsent:
+                item.future.set_exception(RuntimeError(f"OCR 失败: {exc}"))
+
+    def _new_pending(self, image_path: Path, timeout: float) -> _PendingOCR:
+        future: Future = Future()
+        future.add_done_callback(lambda f: self._discard(f) if f.cancelled() else None)
+        # 与 OcrManager 一样用 abspath，回调里按路径对应请求
+        return _PendingOCR(future, os.path.abspath(image_path), timeout, deadline=time.monotonic() + timeout)
+
+    def _enqueue(self, items: list[_PendingOCR]):
+        """交给 ocr-submit 线程发送，立即返回。"""
+        with self._lock:
+            executor = self._submit_executor
+            if executor is None:
+                raise RuntimeError("OCR 服务未启动")
+            try:
+                executor.submit(self._submit, items)
+            except RuntimeError:
+                raise RuntimeError("OCR 服务已停止") from None
+
+    def recognize_async(self, image_path: Path, timeout: float = OCR_TIMEOUT_SECONDS) -> Future:
+        """
+        提交识别任务，立即返回 Future，结果为 OcrManager 回调给出的 dict；
+        等待连接和空闲 task_id 都在 ocr-submit 线程进行，timeout 从提交时开始计算。
+        """
+        if not self._started or self._ocr_manager is None:
+            raise RuntimeError("OCR 服务未启动")
+
+        item = self._new_pending(image_path, timeout)
+        self._enqueue([item])
+        return item.future
 
+    def recognize_batch_async(self, image_paths: Iterable[Path], timeout: float = OCR_TIMEOUT_SECONDS) -> list[Future]:
+        """一次提交多张图片，引擎支持时打包进同一个 OcrRequest，返回与 image_paths 顺序一致的 Future 列表。"""
+        if not self._started or self._ocr_manager is None:
+            raise RuntimeError("OCR 服务未启动")
+
+        items = [self._new_pending(path, timeout) for path in image_paths]
+        if items:
+            self._enqueue(items)
+        return [item.future for item in items]
+
+    def recognize_many(
+        self, image_paths: Iterable[Path], timeout: float = OCR_TIMEOUT_SECONDS, window: int = MAX_IN_FLIGHT
+    ) -> Iterator[dict]:
+        """批量识别，按输入顺序逐个产出结果，见 iter_ocr_results。"""
+        return iter_ocr_results(self.recognize_batch_async, image_paths, self.paths_per_task, window, timeout)
+
+    def recognize_tiles_async(
+        self, tiles: list[Tile], tile_paths: list[Path], timeout: float = OCR_TIMEOUT_SECONDS
+    ) -> Future:
+        """
+        tile_paths 为 plan_tiles 各块裁出的图片，一次提交、各占一个 task_id 并行识别，
+        返回结果为合并后 dict 的 Future，坐标为整张图片的坐标。
+        """
+        return gather_tile_results(tiles, self.recognize_batch_async(tile_paths, timeout=timeout))
+
+    @staticmethod
+    def result_to_text(result: dict) -> str:
         lines = []
         for item in result.get("ocrResult", []):
             text = (item.get("text") or "").strip()
             if text:
                 lines.append(text)
         return "\n".join(lines)
+
+    def recognize(self, image_path: Path) -> str:
+        future = self.recognize_async(image_path)
+        try:
+            # 截止时间从提交时开始，看护线程会在 OCR_TIMEOUT_SECONDS 后让请求失败，这里只是兜底
+            result = future.result(timeout=OCR_TIMEOUT_SECONDS + 1)
+        except FutureTimeoutError:
+            future.cancel()
+            raise RuntimeError("OCR 失败: 识别超时") from None
+        if result is None:
+            raise RuntimeError("OCR 失败: 未返回结果")
+        return self.result_to_text(result)
+
+
+def iter_ocr_results(
+    submit_batch: Callable[[list, float], list[Future]],
+    image_paths: Iterable[Path],
+    batch_size: int,
+    window: int,
+    timeout: float,
+) -> Iterator[dict]:
+    """
+    流水线式批量识别：最多保持 window 张图片在途，按输入顺序产出结果 dict。
+    识别失败的图片产出 {"taskId": None, "ocrResult": [], "error": 原因}，不会中断后续图片；
+    提前停止迭代时取消尚未完成的请求。
+    """
+    paths = iter(image_paths)
+    pending: deque[Future] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < window:
+                chunk = list(itertools.islice(paths, batch_size))
+                if not chunk:
+                    exhausted = True
+                    break
+                pending.extend(submit_batch(chunk, timeout))
+            if not pending:
+                return
+            future = pending.popleft()
+            try:
+                result = future.result()
+            except Exception as exc:
+                result = {"taskId": None, "ocrResult": [], "error": str(exc)}
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+@dataclass(frozen=True)
+class Tile:
+    """分块识别中的一块，坐标为在整张图片中的像素位置。"""
+
+    left: int
+    top: int
+    width: int
+    height: int
+
+    @property
+    def bottom(self) -> int:
+        return self.top + self.height
+
+
+def plan_tiles(width: int, height: int, tile_height: int = TILE_HEIGHT, overlap: int = TILE_OVERLAP) -> list[Tile]:
+    """
+    把图片按高度切成互相重叠的横带，各带高度尽量相等；
+    不超过 1.5 倍 tile_height 的图片不切分，切成很矮的两块反而多一次往返。
+    """
+    overlap = max(0, min(overlap, tile_height // 2))
+    if height <= tile_height * 1.5:
+        return [Tile(0, 0, width, height)]
+    count = math.ceil((height - overlap) / (tile_height - overlap))
+    band = math.ceil((height + (count - 1) * overlap) / count)
+    tiles = []
+    for index in range(count):
+        top = min(index * (band - overlap), height - band)
+        tiles.append(Tile(0, top, width, band))
+    return tiles
+
+
+def _shift_point(point: Optional[dict], dx: int, dy: int) -> Optional[dict]:
+    # 与 MessageToJson 一样，值为 0 的坐标在结果里被省略，缺失即为 0
+    if not isinstance(point, dict):
+        return point
+    shifted = dict(point)
+    shifted["x"] = (shifted.get("x") or 0.0) + dx
+    shifted["y"] = (shifted.get("y") or 0.0) + dy
+    return shifted
+
+
+def _shift_line(line: dict, tile: Tile) -> dict:
+    location = dict(line.get("location") or {})
+    if location:
+        for key, offset in (("left", tile.left), ("right", tile.left), ("top", tile.top), ("bottom", tile.top)):
+            location[key] = (location.get(key) or 0.0) + offset
+    pos = line.get("pos")
+    if isinstance(pos, list):
+        pos = [_shift_point(point, tile.left, tile.top) for point in pos]
+    else:
+        pos = _shift_point(pos, tile.left, tile.top)
+    return {**line, "location": location, "pos": pos}
+
+
+def _box(line: dict) -> Optional[tuple[float, float, float, float]]:
+    """没有 location 时返回 None；缺失的单个坐标为 0（proto3 不传输 0）。"""
+    location = line.get("location")
+    if not location:
+        return None
+    return tuple(location.get(key) or 0.0 for key in ("left", "top", "right", "bottom"))
+
+
+def _overlap_ratio(a: tuple, b: tuple) -> float:
+    """两个框的交集占较小框的比例。"""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return width * height / smaller if smaller > 0 else 0.0
+
+
+def merge_tile_results(tiles: list[Tile], results: list[dict]) -> dict:
+    """
+    合并各块的识别结果，坐标换算回整张图片。
+    相邻两块的重叠区以中线为界，文字行按中心点归属其中一块，另一块中的同一行（包括被边缘截断的半行）丢弃；
+    仍与已保留的行大面积重叠且文字相同或互相包含的，视为重复。
+    """
+    merged: list[dict] = []
+    kept_boxes: list[tuple[tuple, str]] = []
+    for index, (tile, result) in enumerate(zip(tiles, results)):
+        core_top = 0 if index == 0 else (tiles[index - 1].bottom + tile.top) / 2
+        core_bottom = math.inf if index == len(tiles) - 1 else (tile.bottom + tiles[index + 1].top) / 2
+        for line in result.get("ocrResult", []):
+            line = _shift_line(line, tile)
+            box = _box(line)
+            if box is not None:
+                center = (box[1] + box[3]) / 2
+                if not core_top <= center < core_bottom:
+                    continue
+                text = (line.get("text") or "").strip()
+                if any(
+                    _overlap_ratio(box, other) > 0.5 and (text in other_text or other_text in text)
+                    for other, other_text in kept_boxes
+                ):
+                    continue
+                kept_boxes.append((box, text))
+            merged.append(line)
+    task_id = results[0].get("taskId") if results else None
+    return {"taskId": task_id, "ocrResult": merged, "tiles": len(tiles)}
+
+
+def gather_tile_results(tiles: list[Tile], futures: list[Future]) -> Future:
+    """所有块识别完成后合并为一个结果；任何一块失败则整体失败，并取消其余块；取消合并结果也会取消各块。"""
+    merged: Future = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(f: Future):
+        if f.cancelled() or f.exception() is not None:
+            error = f.exception() if not f.cancelled() else RuntimeError("OCR 失败: 分块请求已取消")
+            with lock:
+                first = not merged.done()
+                if first:
+                    try:
+                        merged.set_exception(error)
+                    except InvalidStateError:
+                        # 调用方刚好取消了合并结果
+                        first = False
+            if first:
+                for other in futures:
+                    other.cancel()
+            return
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] or merged.done():
+                return
+        try:
+            merged.set_result(merge_tile_results(tiles, [future.result() for future in futures]))
+        except InvalidStateError:
+            pass
+
+    for future in futures:
+        future.add_done_callback(on_done)
+    # 取消合并结果时一并取消各块，释放 task_id
+    merged.add_done_callback(lambda f: [future.cancel() for future in futures] if f.cancelled() else None)
+    return merged
+
+
+class OCRSupervisor:
+    """
+    看护一个 WechatOCRService：定期清理超时请求；发现连接断开或任务连续超时时，
+    用 StopMMMojoEnv 关掉旧环境，按指数退避重新拉起，并把在途请求重新提交。
+    """
+
+    def __init__(
+        self,
+        service: WechatOCRService,
+        restart: bool = True,
+        interval: float = 0.5,
+        stuck_after: int = 2,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ):
+        self.service = service
+        self.restart = restart
+        self.interval = interval
+        self.stuck_after = stuck_after
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.restarts = 0
+        self.failed_launches = 0
+        self.downtime_total = 0.0
+        self.last_downtime = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ocr-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "restarts": self.restarts,
+            "failed_launches": self.failed_launches,
+            "downtime_total": self.downtime_total,
+            "last_downtime": self.last_downtime,
+        }
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.service._reap_expired()
+            if not self.restart:
+                continue
+            reason = self.service._health_problem(self.stuck_after)
+            if reason:
+                self._restart(reason)
+
+    def _restart(self, reason: str):
+        started = time.monotonic()
+        print(f"[OCR] 引擎异常（{reason}），正在重启")
+        in_flight = self.service._begin_restart()
+        attempt = 0
+        while not self._stop_event.is_set():
+            try:
+                if self.service._launch():
+                    break
+                error = "连接超时"
+            except Exception as exc:
+                error = str(exc)
+            self.failed_launches += 1
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            attempt += 1
+            print(f"[OCR] 重启失败（{error}），{delay:.0f}s 后重试")
+            if self._stop_event.wait(delay):
+                return
+
+        self.restarts += 1
+        self.last_downtime = time.monotonic() - started
+        self.downtime_total += self.last_downtime
+        print(f"[OCR] 引擎已重启（第 {self.restarts} 次），停机 {self.last_downtime * 1000:.0f} ms，重新提交 {len(in_flight)} 个请求")
+        self.service._finish_restart(in_flight)
+
+
+def default_pool_size() -> int:
+    # 每个 WeChatOCR.exe 内部已是多线程推理，按每 4 个核心一个引擎估算，最多 4 个
+    return max(1, min(4, (os.cpu_count() or 1) // 4))
+
+
+class WechatOCRPool:
+    """同时启动多个 WeChatOCR.exe 环境，每个请求派发给在途任务最少的引擎。"""
+
+    def __init__(self, plugin_dir: Path, wechat_ocr_dir: str = "", wechat_dir: str = "", size: int = 1, **engine_options):
+        if size <= 0:
+            size = default_pool_size()
+        self.engines = [
+            WechatOCRService(plugin_dir=plugin_dir, wechat_ocr_dir=wechat_ocr_dir, wechat_dir=wechat_dir, **engine_options)
+            for _ in range(size)
+        ]
+        self._lock = threading.Lock()
+        self._next = 0
+
+    result_to_text = staticmethod(WechatOCRService.result_to_text)
+
+    def start(self):
+        for engine in self.engines:
+            engine.start()
+        print(f"[OCR] 已启动 {len(self.engines)} 个 WeChatOCR 引擎")
+
+    def ready(self) -> bool:
+        return any(engine.ready() for engine in self.engines)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """等待所有引擎就绪。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for engine in self.engines:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not engine.wait_ready(remaining):
+                return False
+        return True
+
+    def stop(self):
+        for engine in self.engines:
+            engine.stop()
+
+    def in_flight(self) -> int:
+        return sum(engine.in_flight() for engine in self.engines)
+
+    def stats(self) -> list[dict]:
+        return [engine.stats() for engine in self.engines]
+
+    def _pick(self) -> WechatOCRService:
+        with self._lock:
+            count = len(self.engines)
+            # 负载相同时从上次之后的引擎开始轮转
+            order = [self.engines[(self._next + i) % count] for i in range(count)]
+            # 优先派发给已就绪的引擎，都未就绪时按负载挑选
+            ready = [e for e in order if e.ready()] or order
+            engine = min(ready, key=lambda e: e.in_flight())
+            self._next = (self.engines.index(engine) + 1) % count
+            return engine
+
+    def recognize_async(self, image_path: Path, timeout: float = OCR_TIMEOUT_SECONDS) -> Future:
+        return self._pick().recognize_async(image_path, timeout=timeout)
+
+    def recognize_batch_async(self, image_paths: Iterable[Path], timeout: float = OCR_TIMEOUT_SECONDS) -> list[Future]:
+        return self._pick().recognize_batch_async(image_paths, timeout=timeout)
+
+    def recognize_tiles_async(
+        self, tiles: list[Tile], tile_paths: list[Path], timeout: float = OCR_TIMEOUT_SECONDS
+    ) -> Future:
+        """各块分别派发给负载最低的引擎，多个引擎同时识别同一张大图的不同部分。"""
+        futures = []
+        try:
+            for path in tile_paths:
+                futures.append(self.recognize_async(path, timeout=timeout))
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+        return gather_tile_results(tiles, futures)
+
+    def recognize_many(self, image_paths: Iterable[Path], timeout: float = OCR_TIMEOUT_SECONDS) -> Iterator[dict]:
+        """批量识别，按输入顺序产出结果，每个批次派发给当前负载最低的引擎。"""
+        batch_size = self.engines[0].paths_per_task
+        window = MAX_IN_FLIGHT * len(self.engines)
+        return iter_ocr_results(self.recognize_batch_async, image_paths, batch_size, window, timeout)
+
+    def recognize(self, image_path: Path) -> str:
+        return self._pick().recognize(image_path)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+import sys
+import threading
+from pathlib import Path
+
+
+def sample_lines(ocr_codec):
+    OcrLine = ocr_codec.OcrLine
+    return [
+        OcrLine("第一行 hello", 0.97, 12.5, 3.25, 640.75, 19.5, ((12.5, 3.25), (640.75, 3.25), (640.75, 19.5), (12.5, 19.5))),
+        # 贴着左上角的行: 0 坐标不会写入 wire 数据
+        OcrLine("左上角", 0.5, None, None, 80.0, 14.0, ((None, None), (80.0, None), (80.0, 14.0), (None, 14.0))),
+        OcrLine("单点", 0.1, 1.0, 2.0, 3.0, 4.0, ((1.1, 2.2),)),
+        OcrLine("", None, None, None, None, None, ()),
+    ]
+
+
+def decode_with_timeout(ocr_codec, payload: bytes, timeout: float = 2.0):
+    box = {}
+
+    def run():
+        try:
+            box["result"] = ocr_codec.decode_ocr_response(payload)
+        except Exception as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"解码超过 {timeout} 秒仍未结束")
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
+
+
+def same_float(a, b) -> bool:
+    if a is None or b is None:
+        return a is b
+    if math.isnan(a):
+        return math.isnan(b)
+    return a == b
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent
+    plugin_dir = (base_dir / "../WechatOCR_umi_plugin_full").resolve()
+    sys.path.insert(0, str(plugin_dir / "third_party_libs"))
+    from wechat_ocr import ocr_codec
+
+    failed = []
+
+    # NaN / ±Inf: 解码必须结束, 且数值原样保留
+    for name, value in (("NaN", math.nan), ("Inf", math.inf), ("-Inf", -math.inf)):
+        line = ocr_codec.OcrLine("x", value, value, 1.0, value, 2.0, ((value, value),))
+        try:
+            _, lines = decode_with_timeout(ocr_codec, ocr_codec.encode_ocr_response(1, [line]))
+            got = lines[0]
+            ok = all(same_float(a, b) for a, b in zip(
+                (got.rate, got.left, got.right, got.pos[0][0], got.pos[0][1]),
+                (value,) * 5,
+            ))
+        except Exception as e:
+            print(f"[CODEC] {name}: {type(e).__name__}: {e}")
+            ok = False
+        print(f"[CODEC] {name}: {'通过' if ok else '失败'}")
+        if not ok:
+            failed.append(name)
+
+    # 截断的数据: 任意位置截断都只能抛 ValueError
+    payload = ocr_codec.encode_ocr_response(7, sample_lines(ocr_codec), type=1)
+    bad_cut = []
+    for cut in range(1, len(payload)):
+        try:
+            decode_with_timeout(ocr_codec, payload[:cut])
+        except ValueError:
+            pass
+        except Exception as e:
+            bad_cut.append(f"{cut}:{type(e).__name__}")
+    print(f"[CODEC] 截断: 检查 {len(payload) - 1} 个位置, 异常类型错误 {len(bad_cut)} 个")
+    if bad_cut:
+        failed.append("截断 " + ", ".join(bad_cut[:5]))
+
+    # 与原来 protobuf -> MessageToJson 的流程逐字段一致(含 0 坐标)
+    try:
+        legacy = ocr_codec.decode_ocr_response_legacy(payload)
+    except ImportError as e:
+        print(f"[CODEC] 跳过与 legacy 的对比, 缺少依赖: {e}")
+    else:
+        task_id, lines = ocr_codec.decode_ocr_response(payload)
+        direct = ocr_codec.lines_to_results(task_id, lines)
+        same = direct == legacy
+        print(f"[CODEC] 与 legacy 一致: {same}")
+        if not same:
+            failed.append("legacy")
+
+    if failed:
+        raise SystemExit(f"[CODEC] 检查失败: {'; '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
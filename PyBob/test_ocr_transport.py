@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def path_responder(ocr_codec):
+    """识别结果就是图片文件名，用来确认结果交给了对应的请求。"""
+
+    def respond(task_id: int, pic_path: str):
+        line = ocr_codec.OcrLine(Path(pic_path).name, 0.99, 1.0, 1.0, 100.0, 18.0, ())
+        return ocr_codec.encode_ocr_response(task_id, [line])
+
+    return respond
+
+
+def make_images(tmp_dir: Path, count: int) -> list[Path]:
+    paths = []
+    for i in range(count):
+        path = tmp_dir / f"img{i}.png"
+        path.write_bytes(b"")
+        paths.append(path)
+    return paths
+
+
+def check_out_of_order(plugin_dir: Path, tmp_dir: Path, failed: list):
+    from wechat_ocr import ocr_codec
+    from wechat_ocr.fake_mmmojo import FakeMmmojoDll
+    from services.ocr_engine import WechatOCRService
+
+    images = make_images(tmp_dir, 8)
+    done_order = []
+    # task_id 越小回复越晚，结果按提交的倒序到达
+    transport = FakeMmmojoDll(path_responder(ocr_codec), delay=lambda task_id: 0.05 * (10 - task_id))
+    service = WechatOCRService(
+        plugin_dir,
+        wechat_ocr_dir=str(tmp_dir / "WeChatOCR.exe"),
+        wechat_dir=str(tmp_dir),
+        warmup=False,
+        transport_factory=lambda: transport,
+    )
+    service.start()
+    try:
+        if not service.wait_ready(5.0):
+            failed.append("乱序: 模拟引擎未能连接")
+            return
+        futures = []
+        for path in images:
+            future = service.recognize_async(path, timeout=5.0)
+            future.add_done_callback(lambda _, name=path.name: done_order.append(name))
+            futures.append(future)
+        texts = [service.result_to_text(future.result(timeout=5.0)) for future in futures]
+    finally:
+        service.stop()
+
+    expected = [path.name for path in images]
+    print(f"[TRANSPORT] 乱序: 完成顺序 {done_order}")
+    if texts != expected:
+        failed.append(f"乱序: 结果与图片不对应 {texts}")
+    if done_order == expected:
+        failed.append("乱序: 结果没有乱序到达，用例无效")
+
+
+def check_quarantine(tmp_dir: Path, failed: list):
+    from wechat_ocr import ocr_codec
+    from wechat_ocr.fake_mmmojo import FakeMmmojoDll
+    from wechat_ocr.ocr_manager import OcrManager
+    from wechat_ocr.task_id_allocator import TaskIdAllocator
+
+    first, second = make_images(tmp_dir, 2)
+    results = []
+    done = threading.Event()
+
+    def on_result(img_path: str, result: dict):
+        results.append((Path(img_path).name, [item["text"] for item in result["ocrResult"]]))
+        done.set()
+
+    # 只有一个 task_id，租约 0.2 秒：第一张图 0.3 秒才回复，此时 id 已回收并处于隔离期；第二张图正常回复
+    delays = iter([0.3, 0.05])
+    transport = FakeMmmojoDll(path_responder(ocr_codec), delay=lambda task_id: next(delays))
+    manager = OcrManager(str(tmp_dir), transport=transport)
+    manager.SetExePath(str(tmp_dir / "WeChatOCR.exe"))
+    manager.SetUsrLibDir(str(tmp_dir))
+    manager.m_task_id = TaskIdAllocator(1, lease_timeout=0.2, on_reclaim=manager.OnTaskIdsReclaimed)
+    manager.SetOcrResultCallback(on_result)
+    manager.StartWeChatOCR()
+    try:
+        if not manager.WaitConnected(5.0):
+            failed.append("隔离: 模拟引擎未能连接")
+            return
+        first_id = manager.DoOCRTask(str(first))
+        # 隔离期满(0.4 秒)后才能再借出同一个 id
+        second_id = manager.DoOCRTask(str(second))
+        done.wait(2.0)
+        time.sleep(0.1)
+    finally:
+        manager.KillWeChatOCR()
+
+    print(f"[TRANSPORT] 隔离: task_id {first_id} -> {second_id}，收到 {results}")
+    if first_id != second_id:
+        failed.append("隔离: 两个任务没有复用同一个 task_id，用例无效")
+    if results != [(second.name, [second.name])]:
+        failed.append(f"隔离: 迟到的结果没有被丢弃 {results}")
+
+
+def check_crash(plugin_dir: Path, tmp_dir: Path, failed: list):
+    from wechat_ocr.fake_mmmojo import FakeMmmojoDll
+    from services.ocr_engine import WechatOCRService
+
+    images = make_images(tmp_dir, 20)
+    transports = []
+
+    def make_transport():
+        transports.append(FakeMmmojoDll(delay=0.2))
+        return transports[-1]
+
+    service = WechatOCRService(
+        plugin_dir,
+        wechat_ocr_dir=str(tmp_dir / "WeChatOCR.exe"),
+        wechat_dir=str(tmp_dir),
+        warmup=False,
+        transport_factory=make_transport,
+    )
+    service.start()
+    try:
+        if not service.wait_ready(5.0):
+            failed.append("崩溃: 模拟引擎未能连接")
+            return
+        futures = [service.recognize_async(path, timeout=10.0) for path in images]
+        time.sleep(0.05)
+        transports[-1].crash()
+        errors = 0
+        for future in futures:
+            try:
+                future.result(timeout=10.0)
+            except Exception:
+                errors += 1
+        stats = service.stats()
+    finally:
+        service.stop()
+
+    restarts = stats["supervisor"]["restarts"]
+    print(f"[TRANSPORT] 崩溃: 重启 {restarts} 次，传输层 {len(transports)} 个，失败 {errors}/{len(futures)}")
+    if restarts < 1 or len(transports) < 2:
+        failed.append("崩溃: 引擎没有重启")
+    if errors:
+        failed.append(f"崩溃: {errors} 个请求失败")
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent
+    plugin_dir = (base_dir / "../WechatOCR_umi_plugin_full").resolve()
+    sys.path.insert(0, str(plugin_dir / "third_party_libs"))
+    sys.path.insert(0, str(base_dir))
+
+    failed = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        # SetExePath 会检查 WeChatOCR.exe 是否存在, 放一个空文件即可
+        (tmp_dir / "WeChatOCR.exe").touch()
+        check_out_of_order(plugin_dir, tmp_dir, failed)
+        check_quarantine(tmp_dir, failed)
+        check_crash(plugin_dir, tmp_dir, failed)
+    if failed:
+        raise SystemExit("[TRANSPORT] 检查失败: " + "; ".join(failed))
+
+
+if __name__ == "__main__":
+    main()
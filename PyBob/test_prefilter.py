@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+
+def short_word(size: int = 1000) -> np.ndarray:
+    """大片白色空白中间一个 14 px 高的两字母单词（"hi"）。"""
+    gray = np.full((size, size), 255, dtype=np.uint8)
+    top, left = size // 2, size // 2
+    gray[top : top + 14, left : left + 2] = 0
+    gray[top + 7, left : left + 8] = 0
+    gray[top + 7 : top + 14, left + 6 : left + 8] = 0
+    gray[top + 4 : top + 14, left + 12 : left + 14] = 0
+    gray[top + 1 : top + 3, left + 12 : left + 14] = 0
+    return gray
+
+
+def horizontal_rule(width: int = 1000, height: int = 600) -> np.ndarray:
+    """白底上一条横贯选区的 1 px 分隔线，只有水平方向的边缘。"""
+    gray = np.full((height, width), 255, dtype=np.uint8)
+    gray[height // 2, 40 : width - 40] = 60
+    return gray
+
+
+def paragraph(width: int = 600, height: int = 400) -> np.ndarray:
+    gray = np.full((height, width), 250, dtype=np.uint8)
+    for row in range(12, height - 20, 24):
+        for col in range(10, width - 10, 9):
+            gray[row : row + 14, col : col + 2] = 20
+            gray[row + 6, col : col + 6] = 20
+    return gray
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent
+    sys.path.insert(0, str(base_dir))
+    from core.preprocess import TextPrefilter
+
+    prefilter = TextPrefilter()
+    cases = [
+        ("空白", np.full((1000, 1000), 255, dtype=np.uint8), False),
+        ("水平渐变", np.tile(np.linspace(0, 255, 1000).astype(np.uint8), (600, 1)), False),
+        ("水平分隔线", horizontal_rule(), False),
+        ("大选区中的短单词", short_word(), True),
+        ("段落", paragraph(), True),
+    ]
+    failed = []
+    for name, gray, expected in cases:
+        presence = prefilter.check(gray)
+        print(
+            f"[PREFILTER] {name}: has_text={presence.has_text} 对比度 {presence.contrast} "
+            f"边缘密度 {presence.edge_density:.4f} 用时 {presence.seconds * 1000:.2f} ms"
+        )
+        if presence.has_text != expected:
+            failed.append(name)
+    if failed:
+        raise SystemExit(f"[PREFILTER] 判断错误: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
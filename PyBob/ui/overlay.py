@@ -1,15 +1,17 @@
 from __future__ import annotations
 
-from PySide6.QtCore import QPoint, QRect, Qt, Signal
-from PySide6.QtGui import QColor, QGuiApplication, QPainter, QPen, QPixmap
+from PySide6.QtCore import QPoint, QRect, QRectF, Qt, QTimer, Signal
+from PySide6.QtGui import QColor, QGuiApplication, QPainter, QPen, QPixmap, QScreen
 from PySide6.QtWidgets import QWidget
 
 
 class CaptureOverlay(QWidget):
     selectionFinished = Signal(QRect, QPoint)
+    # 拖动中鼠标停顿 stable_ms 毫秒时发出当前选区，可提前开始识别；同一选区只发一次
+    selectionStable = Signal(QRect)
     canceled = Signal()
 
-    def __init__(self):
+    def __init__(self, stable_ms: int = 250):
         super().__init__()
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint
@@ -24,23 +26,56 @@ class CaptureOverlay(QWidget):
         self._dragging = False
         self._start = QPoint()
         self._end = QPoint()
+        self._stable_rect = QRect()
+        self._stable_timer = QTimer(self)
+        self._stable_timer.setSingleShot(True)
+        self._stable_timer.timeout.connect(self._emit_stable)
+        self.set_stable_delay(stable_ms)
 
-    def start(self, background: QPixmap):
+    def set_stable_delay(self, stable_ms: int):
+        """stable_ms 为 0 时不发出 selectionStable。"""
+        self._stable_ms = max(0, stable_ms)
+        self._stable_timer.setInterval(self._stable_ms)
+
+    def _selection(self) -> QRect:
+        return QRect(self._start, self._end).normalized()
+
+    def _emit_stable(self):
+        rect = self._selection()
+        if not self._dragging or rect.width() < 8 or rect.height() < 8 or rect == self._stable_rect:
+            return
+        self._stable_rect = rect
+        self.selectionStable.emit(rect)
+
+    def start(self, background: QPixmap, screen: QScreen | None = None):
+        """在 screen（默认为主屏）上显示遮罩，background 为该屏幕的截图。"""
         self._background = background
         self._dragging = False
         self._start = QPoint()
         self._end = QPoint()
-        screen = QGuiApplication.primaryScreen()
+        self._stable_rect = QRect()
+        screen = screen or QGuiApplication.primaryScreen()
         if screen is not None:
+            self.setScreen(screen)
             self.setGeometry(screen.geometry())
-        self._preview = self._background.scaled(
-            self.size(),
-            Qt.AspectRatioMode.IgnoreAspectRatio,
-            Qt.TransformationMode.SmoothTransformation,
-        )
+        if self._background.deviceIndependentSize().toSize() == self.size():
+            # 截图已带有该屏幕的 devicePixelRatio，直接按逻辑尺寸绘制，无需缩放
+            self._preview = self._background
+        else:
+            self._preview = self._background.scaled(
+                self.size() * self._background.devicePixelRatio(),
+                Qt.AspectRatioMode.IgnoreAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+            self._preview.setDevicePixelRatio(self._background.devicePixelRatio())
         self.showFullScreen()
         self.raise_()
 
+    def hideEvent(self, event):
+        self._stable_timer.stop()
+        self._dragging = False
+        super().hideEvent(event)
+
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Escape:
             self.hide()
@@ -53,6 +88,7 @@ class CaptureOverlay(QWidget):
             self._dragging = True
             self._start = event.pos()
             self._end = event.pos()
+            self._stable_rect = QRect()
             self.update()
             return
         if event.button() == Qt.MouseButton.RightButton:
@@ -64,14 +100,17 @@ class CaptureOverlay(QWidget):
     def mouseMoveEvent(self, event):
         if self._dragging:
             self._end = event.pos()
+            if self._stable_ms:
+                self._stable_timer.start()
             self.update()
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event):
         if self._dragging and event.button() == Qt.MouseButton.LeftButton:
             self._dragging = False
+            self._stable_timer.stop()
             self._end = event.pos()
-            rect = QRect(self._start, self._end).normalized()
+            rect = self._selection()
             self.hide()
             if rect.width() >= 8 and rect.height() >= 8:
                 self.selectionFinished.emit(rect, event.globalPosition().toPoint())
@@ -89,7 +128,10 @@ class CaptureOverlay(QWidget):
 
         rect = QRect(self._start, self._end).normalized()
         if rect.width() > 0 and rect.height() > 0:
-            painter.drawPixmap(rect, self._preview, rect)
+            # 源矩形按像素计算，需要乘以截图的 devicePixelRatio
+            ratio = self._preview.devicePixelRatio()
+            source = QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+            painter.drawPixmap(QRectF(rect), self._preview, source)
             painter.setPen(QPen(QColor(0, 180, 255), 2))
             painter.drawRect(rect)
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 
-from PySide6.QtCore import QPoint, Qt
+from PySide6.QtCore import QPoint, Qt, Signal
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtWidgets import (
     QFrame,
@@ -24,8 +25,12 @@ class SectionWidgets:
 
 
 class ResultWindow(QWidget):
+    # 用户关闭窗口（关闭按钮、Esc、弹出模式下失去焦点）时发出
+    closed = Signal()
+
     def __init__(self):
         super().__init__()
+        self._pinned = False
         self.setWindowFlags(Qt.WindowType.Popup | Qt.WindowType.FramelessWindowHint)
         self.setMinimumWidth(560)
         self.setMaximumWidth(560)
@@ -102,7 +107,7 @@ class ResultWindow(QWidget):
         self.close_btn = QPushButton("×", self)
         self.close_btn.setObjectName("closeBtn")
         self.close_btn.setFixedSize(24, 24)
-        self.close_btn.clicked.connect(self.hide)
+        self.close_btn.clicked.connect(self._dismiss)
         header.addWidget(self.close_btn)
         root.addLayout(header)
 
@@ -123,17 +128,68 @@ class ResultWindow(QWidget):
         self._current_request_id = ""
         self._anchor = QPoint(40, 40)
         self._sections: dict[str, SectionWidgets] = {}
+        # 本次请求的耗时统计：用户操作（松开鼠标）和按下快捷键的时刻、首次绘制的时刻、尚未完成的翻译
+        self._started_at: float | None = None
+        self._hotkey_at: float | None = None
+        self._first_paint_at: float | None = None
+        self._ocr_done = True
+        self._pending_providers: set[str] = set()
+        # 精修模式：主译文当前来自哪个服务、其优先级，以及第一次显示的时间
+        self._refine = False
+        self._primary_provider = ""
+        self._primary_priority = 0
+        self._primary_at = 0.0
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._started_at is not None and self._first_paint_at is None:
+            self._first_paint_at = time.perf_counter()
+            print(f"[Result] 首次绘制 {self._elapsed(self._first_paint_at)}")
+
+    def _elapsed(self, at: float) -> str:
+        """从松开鼠标到 at 的耗时；按下快捷键的时间不同时，同时给出从快捷键开始的耗时。"""
+        text = f"{(at - self._started_at) * 1000:.0f} ms"
+        if self._hotkey_at is not None and self._hotkey_at < self._started_at:
+            text += f"（自快捷键 {(at - self._hotkey_at) * 1000:.0f} ms）"
+        return text
+
+    def _check_complete(self):
+        if self._started_at is None or not self._ocr_done or self._pending_providers:
+            return
+        first_paint = self._elapsed(self._first_paint_at) if self._first_paint_at is not None else "未绘制"
+        print(f"[Result] 首次绘制 {first_paint}，全部完成 {self._elapsed(time.perf_counter())}")
+        self._started_at = None
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Escape:
-            self.hide()
+            self._dismiss()
             return
         super().keyPressEvent(event)
 
     def focusOutEvent(self, event):
-        self.hide()
+        if not self._pinned:
+            self._dismiss()
         super().focusOutEvent(event)
 
+    def _dismiss(self):
+        self.hide()
+        self.closed.emit()
+
+    def set_pinned(self, pinned: bool):
+        """
+        固定模式（监视区域时使用）：置顶、显示时不抢焦点、失去焦点也不关闭，内容原地更新；
+        默认的弹出模式失去焦点即关闭。
+        """
+        if pinned == self._pinned:
+            return
+        self._pinned = pinned
+        if pinned:
+            flags = Qt.WindowType.Tool | Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowStaysOnTopHint
+        else:
+            flags = Qt.WindowType.Popup | Qt.WindowType.FramelessWindowHint
+        self.setWindowFlags(flags)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating, pinned)
+
     def _clear_sections(self):
         for sec in self._sections.values():
             sec.container.deleteLater()
@@ -183,7 +239,8 @@ class ResultWindow(QWidget):
 
     def _reposition(self):
         self.resize(560, 460)
-        screen = QGuiApplication.primaryScreen().availableGeometry()
+        # 放在选区所在的屏幕上
+        screen = (QGuiApplication.screenAt(self._anchor) or QGuiApplication.primaryScreen()).availableGeometry()
         x = self._anchor.x() + 12
         y = self._anchor.y() + 12
 
@@ -200,22 +257,71 @@ class ResultWindow(QWidget):
     def start_request(self, payload: dict):
         self._current_request_id = payload.get("request_id", "")
         self._anchor = payload.get("anchor", QPoint(40, 40))
+        self.set_pinned(bool(payload.get("pinned", False)))
         self._clear_sections()
 
         ocr_text = payload.get("ocr_text", "")
-        ocr_sec = self._make_section("ocr", "OCR")
-        ocr_sec.body.setPlainText(ocr_text or "未识别到文本")
+        self._ocr_done = not payload.get("ocr_pending", False)
+        if self._ocr_done:
+            ocr_sec = self._make_section("ocr", "OCR")
+            ocr_sec.body.setPlainText(ocr_text or "未识别到文本")
+        else:
+            ocr_sec = self._make_section("ocr", "OCR（识别中）")
+            ocr_sec.body.setPlainText("识别中…")
         ocr_sec.body.moveCursor(ocr_sec.body.textCursor().MoveOperation.Start)
 
         providers = payload.get("providers", [])
+        self._refine = bool(payload.get("refine")) and len(providers) > 1
+        self._primary_provider = ""
+        self._primary_priority = 0
+        if self._refine:
+            primary = self._make_section("primary", "译文（等待最快的结果）")
+            primary.body.setPlainText("...")
         for provider in providers:
-            sec = self._make_section(provider, f"{provider}（进行中）")
+            sec = self._make_section(provider, f"{provider}（{'进行中' if self._ocr_done else '等待识别'}）")
             sec.body.setPlainText("...")
+            # 精修模式下各服务的原始结果默认折叠，主译文在最上方
+            if self._refine:
+                sec.toggle.setChecked(False)
+
+        self._started_at = payload.get("started_at")
+        self._hotkey_at = payload.get("hotkey_at")
+        self._first_paint_at = None
+        self._pending_providers = set(providers)
 
         self._reposition()
         self.show()
         self.raise_()
 
+    def update_ocr(self, payload: dict):
+        """
+        原地替换 OCR 文本，不重建各翻译区域。skip_translation 为 True 时（识别失败或没有文本）
+        不会再有翻译结果，各翻译区域标记为未翻译。
+        """
+        if payload.get("request_id", "") != self._current_request_id or "ocr" not in self._sections:
+            return
+        ocr_sec = self._sections["ocr"]
+        ocr_sec.body.setPlainText(payload.get("ocr_text", "") or "未识别到文本")
+        ocr_sec.body.moveCursor(ocr_sec.body.textCursor().MoveOperation.Start)
+        ocr_sec.toggle.setText("OCR（失败）" if payload.get("error") else "OCR")
+        self._ocr_done = True
+
+        for provider, sec in self._sections.items():
+            if provider == "ocr" or provider not in self._pending_providers:
+                continue
+            if payload.get("skip_translation"):
+                sec.body.setPlainText("")
+                sec.toggle.setText(f"{provider}（未翻译）")
+                sec.toggle.setChecked(False)
+            else:
+                sec.toggle.setText(f"{provider}（进行中）")
+        if payload.get("skip_translation"):
+            self._pending_providers.clear()
+            if self._refine:
+                self._sections["primary"].body.setPlainText("")
+                self._sections["primary"].toggle.setText("译文（未翻译）")
+        self._check_complete()
+
     def update_translation(self, payload: dict):
         request_id = payload.get("request_id", "")
         if request_id != self._current_request_id:
@@ -247,3 +353,33 @@ class ResultWindow(QWidget):
 
         if payload.get("error"):
             sec.toggle.setChecked(False)
+
+        if self._refine and payload.get("done") and not payload.get("error") and sec.body.toPlainText().strip():
+            self._refine_primary(provider, int(payload.get("priority", 0)), sec.body.toPlainText())
+
+        if payload.get("done") or payload.get("error"):
+            self._pending_providers.discard(provider)
+            if self._refine and not self._pending_providers and not self._primary_provider:
+                self._sections["primary"].body.setPlainText("")
+                self._sections["primary"].toggle.setText("译文（全部失败）")
+            self._check_complete()
+
+    def _refine_primary(self, provider: str, priority: int, text: str):
+        """
+        主译文先显示最先完成的结果，之后只被优先级更高的结果替换，标题注明已优化及被替换的服务；
+        优先级相同时保留先到的结果，避免内容来回跳动。
+        """
+        primary = self._sections["primary"]
+        previous = self._primary_provider
+        if previous and priority <= self._primary_priority:
+            return
+        self._primary_provider = provider
+        self._primary_priority = priority
+        primary.body.setPlainText(text)
+        primary.body.moveCursor(primary.body.textCursor().MoveOperation.Start)
+        if not previous:
+            self._primary_at = time.perf_counter()
+            primary.toggle.setText(f"译文 · {provider}（最快）")
+            return
+        primary.toggle.setText(f"译文 · {provider}（✓ 已优化，替换 {previous}）")
+        print(f"[Result] 主译文由 {previous} 替换为 {provider}，距首个译文 {(time.perf_counter() - self._primary_at) * 1000:.0f} ms")
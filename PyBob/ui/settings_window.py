@@ -17,6 +17,12 @@ from PySide6.QtWidgets import (
 )
 
 
+def _provider_name(item) -> str:
+    if isinstance(item, dict):
+        return str(item.get("name") or "").strip().lower()
+    return str(item or "").strip().lower()
+
+
 class SettingsDialog(QDialog):
     def __init__(self, config: dict, on_save):
         super().__init__()
@@ -40,9 +46,11 @@ class SettingsDialog(QDialog):
         self.chk_google = QCheckBox("Google")
         self.chk_microsoft = QCheckBox("Microsoft")
         self.chk_openai = QCheckBox("OpenAI")
-        self.chk_google.setChecked("google" in [p.lower() for p in providers])
-        self.chk_microsoft.setChecked("microsoft" in [p.lower() for p in providers])
-        self.chk_openai.setChecked("openai" in [p.lower() for p in providers])
+        # 带优先级的项为 {name, priority}，保存时原样保留
+        self._provider_entries = {_provider_name(p): p for p in providers}
+        self.chk_google.setChecked("google" in self._provider_entries)
+        self.chk_microsoft.setChecked("microsoft" in self._provider_entries)
+        self.chk_openai.setChecked("openai" in self._provider_entries)
         providers_row.addWidget(self.chk_google)
         providers_row.addWidget(self.chk_microsoft)
         providers_row.addWidget(self.chk_openai)
@@ -126,7 +134,7 @@ class SettingsDialog(QDialog):
         if not selected:
             selected = ["google"]
 
-        trans["providers"] = selected
+        trans["providers"] = [self._provider_entries.get(name, name) for name in selected]
         trans["provider"] = selected[0]
         trans["source_lang"] = self.source_lang.text().strip() or "auto"
         trans["target_lang"] = self.target_lang.text().strip() or "zh-CN"
@@ -1,12 +1,12 @@
 import base64
 import sys
 import os
-import time
+import threading
 
 sys.path.append(os.path.join(os.path.dirname(__file__), 'third_party_libs'))
 import wechat_ocr
 
-from wechat_ocr.ocr_manager import OcrManager, OCR_MAX_TASK_ID
+from wechat_ocr.ocr_manager import OcrManager
 
 # 默认内置路径
 CurrentDir = os.path.dirname(os.path.abspath(__file__))
@@ -24,7 +24,9 @@ class Api:
         self.wechat_dir = (globalArgd.get("wechat_dir", "") or DEFAULT_WECHAT_DIR).replace("\\", "/")
 
         self.ocr_manager = None
-        self._last_results = None
+        # 图片绝对路径 -> [完成事件, 结果], 每次调用只等待自己那张图片的结果
+        self._pending = {}
+        self._pending_lock = threading.Lock()
         print(f"OCR 接口初始化完成，WeChatOCR路径: {self.wechat_ocr_dir}, WeChat目录: {self.wechat_dir}")
 
     def start(self, argd):
@@ -89,25 +91,27 @@ class Api:
         """
         通用 OCR 处理逻辑
         """
-        self._last_results = None  # 重置结果状态
+        # 回调中的路径是 OcrManager 转换后的绝对路径
+        key = os.path.abspath(imgPath)
+        pending = [threading.Event(), None]
+        with self._pending_lock:
+            self._pending[key] = pending
 
-        # 启动 OCR 任务
-        start_time = time.time()
-        self.ocr_manager.DoOCRTask(imgPath)
+        try:
+            # 启动 OCR 任务
+            self.ocr_manager.DoOCRTask(imgPath)
 
-        # 等待任务完成，带超时机制
-        timeout = 10
-        while self.ocr_manager.m_task_id.qsize() != OCR_MAX_TASK_ID:
-            if time.time() - start_time > timeout:
+            # 等待本任务的结果，带超时机制
+            timeout = 10
+            if not pending[0].wait(timeout):
                 raise TimeoutError("OCR 任务超时")
-            time.sleep(0.1)
-
-        # 清空任务队列
-        while not self.ocr_manager.m_task_id.empty():
-            self.ocr_manager.m_task_id.get()
+        finally:
+            with self._pending_lock:
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
 
-        if self._last_results is not None:
-            return self._last_results
+        if pending[1] is not None:
+            return pending[1]
         else:
             return {"code": 102, "data": "[Error] 未能获取 OCR 结果"}
 
@@ -115,6 +119,11 @@ class Api:
         """
         OCR 结果回调函数，将结果转换为统一格式
         """
+        with self._pending_lock:
+            pending = self._pending.get(img_path)
+        if pending is None:
+            # 已经超时放弃等待的任务
+            return
         try:
             if "ocrResult" in results:
                 ocr_data = [
@@ -130,11 +139,13 @@ class Api:
                     }
                     for item in results["ocrResult"]
                 ]
-                self._last_results = {"code": 100, "data": ocr_data}
+                pending[1] = {"code": 100, "data": ocr_data}
             else:
-                self._last_results = {"code": 101, "data": ""}
+                pending[1] = {"code": 101, "data": ""}
         except Exception as e:
-            self._last_results = {"code": 102, "data": f"[Error] 结果处理失败：{str(e)}"}
+            pending[1] = {"code": 102, "data": f"[Error] 结果处理失败：{str(e)}"}
+        finally:
+            pending[0].set()
 
     @staticmethod
     def _save_temp_file(imageBytes, file_name):
@@ -0,0 +1,236 @@
+'''
+纯Python实现的 mmmojo 传输层, 用于在没有微信/WeChatOCR的环境(例如Linux)上压测 OcrManager
+
+FakeMmmojoDll 实现了 MmmojoDll 的函数表, 可以作为 transport 传给 XPluginManager/OcrManager:
+
+    manager = OcrManager(wechat_dir, transport=FakeMmmojoDll(delay=0.05))
+
+收到 OcrRequest 后, 在模拟的IPC线程上经过 delay 秒回调 kMMReadPush, 内容由 responder 生成;
+连接/断开回调同样在IPC线程上触发, 与真实的 mmmojo 行为一致
+'''
+import heapq
+import itertools
+import threading
+import time
+from .winapi import *
+# 放在 winapi 之后, 避免 typing.Union 被 ctypes.Union 覆盖
+from typing import Callable, Dict, Optional, Union
+from .mmmojo_dll import MMMojoEnvironmentCallbackType
+from . import ocr_codec
+
+
+def default_responder(task_id:int, pic_path:str):
+    '''默认返回一行固定文本'''
+    line = ocr_codec.OcrLine("模拟识别结果 fake ocr", 0.99, 1.0, 1.0, 100.0, 18.0,
+                             ((1.0, 1.0), (100.0, 1.0), (100.0, 18.0), (1.0, 18.0)))
+    return ocr_codec.encode_ocr_response(task_id, [line])
+
+
+def _value(arg):
+    '''把 c_void_p/c_int 等ctypes参数还原为Python值'''
+    return getattr(arg, "value", arg)
+
+
+class FakeMmmojoDll(object):
+    '''
+    responder(task_id, pic_path) 返回序列化后的 OcrResponse(bytes, 或带 SerializeToString 的消息对象), 返回 None 表示不回复(模拟结果丢失);
+    一个请求打包了多张图片时按路径顺序逐张回复;
+    delay 可以是秒数, 也可以是 callable(task_id) 返回秒数; connect_delay 为 Start 到连接成功的秒数
+    '''
+    def __init__(self, responder:Callable = None, delay:Union[float, Callable] = 0.05, connect_delay:float = 0.0) -> None:
+        self.responder = responder or default_responder
+        self.delay = delay
+        self.connect_delay = connect_delay
+        self._lock = threading.Condition()
+        self._handles = itertools.count(1)
+        self._envs: Dict[int, dict] = {}
+        self._write_infos: Dict[int, dict] = {}
+        self._read_infos: Dict[int, Array] = {}
+        self._actions = []
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self.responses = 0
+        self._funcs_dict = {name: getattr(self, name) for name in (
+            "InitializeMMMojo", "ShutdownMMMojo", "CreateMMMojoEnvironment", "SetMMMojoEnvironmentCallbacks",
+            "SetMMMojoEnvironmentInitParams", "AppendMMSubProcessSwitchNative", "StartMMMojoEnvironment",
+            "StopMMMojoEnvironment", "RemoveMMMojoEnvironment", "GetMMMojoReadInfoRequest", "GetMMMojoReadInfoAttach",
+            "RemoveMMMojoReadInfo", "GetMMMojoReadInfoMethod", "GetMMMojoReadInfoSync", "CreateMMMojoWriteInfo",
+            "GetMMMojoWriteInfoRequest", "RemoveMMMojoWriteInfo", "GetMMMojoWriteInfoAttach",
+            "SetMMMojoWriteInfoMessagePipe", "SetMMMojoWriteInfoResponseSync", "SendMMMojoWriteInfo",
+            "SwapMMMojoWriteInfoCallback", "SwapMMMojoWriteInfoMessage")}
+
+    def func_def(self, name, *args):
+        return self._funcs_dict[name]
+
+    def __getitem__(self, key):
+        return self._funcs_dict[key]
+
+    # ---------- 模拟的IPC线程 ----------
+    def _schedule(self, delay:float, func:Callable, *args):
+        with self._lock:
+            heapq.heappush(self._actions, (time.monotonic() + delay, next(self._seq), func, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="fake-mmmojo", daemon=True)
+                self._thread.start()
+            self._lock.notify()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if self._actions and self._actions[0][0] <= now:
+                        _, _, func, args = heapq.heappop(self._actions)
+                        break
+                    self._lock.wait(self._actions[0][0] - now if self._actions else None)
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"[FakeMmmojo] 回调出错: {e}")
+
+    def _callback(self, env:dict, name:str, *args):
+        callback = env["callbacks"].get(MMMojoEnvironmentCallbackType[name].value)
+        if callback and env["running"]:
+            callback(*args, env["user_data_ptr"])
+
+    def _connect(self, handle:int):
+        env = self._envs.get(handle)
+        if env:
+            self._callback(env, "kMMRemoteConnect", True)
+
+    def _push(self, handle:int, request_id:int, data:bytes):
+        env = self._envs.get(handle)
+        if not env or not env["running"]:
+            return
+        buffer = create_string_buffer(data, len(data))
+        with self._lock:
+            read_info = next(self._handles)
+            self._read_infos[read_info] = buffer
+        self.responses += 1
+        self._callback(env, "kMMReadPush", request_id, read_info)
+
+    def crash(self):
+        '''模拟WeChatOCR进程退出: 对所有运行中的环境触发 kMMRemoteDisconnect, 之后不再回复'''
+        for env in list(self._envs.values()):
+            if env["running"]:
+                self._callback(env, "kMMRemoteDisconnect")
+                env["running"] = False
+
+    # ---------- MmmojoDll 函数表 ----------
+    def InitializeMMMojo(self, argc, argv):
+        pass
+
+    def ShutdownMMMojo(self):
+        pass
+
+    def CreateMMMojoEnvironment(self):
+        with self._lock:
+            handle = next(self._handles)
+            self._envs[handle] = {"callbacks": {}, "user_data": None, "user_data_ptr": None, "params": {},
+                                  "switches": {}, "running": False}
+        return handle
+
+    def SetMMMojoEnvironmentCallbacks(self, env, type, callback):
+        env = self._envs[_value(env)]
+        type = _value(type)
+        if type == MMMojoEnvironmentCallbackType.kMMUserData.value:
+            # 与真实dll一样只保存指针, 这里同时持有对象本身防止被回收
+            env["user_data"] = callback
+            env["user_data_ptr"] = id(callback.value)
+        else:
+            env["callbacks"][type] = callback
+
+    def SetMMMojoEnvironmentInitParams(self, env, type, value):
+        self._envs[_value(env)]["params"][_value(type)] = _value(value)
+
+    def AppendMMSubProcessSwitchNative(self, env, switch_string, value):
+        self._envs[_value(env)]["switches"][_value(switch_string)] = _value(value)
+
+    def StartMMMojoEnvironment(self, env):
+        handle = _value(env)
+        self._envs[handle]["running"] = True
+        self._schedule(self.connect_delay, self._connect, handle)
+
+    def StopMMMojoEnvironment(self, env):
+        env = self._envs.get(_value(env))
+        if env:
+            env["running"] = False
+
+    def RemoveMMMojoEnvironment(self, env):
+        with self._lock:
+            self._envs.pop(_value(env), None)
+
+    def GetMMMojoReadInfoRequest(self, read_info, request_data_size):
+        buffer = self._read_infos.get(_value(read_info))
+        size = getattr(request_data_size, "_obj", request_data_size)
+        if buffer is None:
+            size.value = 0
+            return None
+        size.value = sizeof(buffer)
+        return addressof(buffer)
+
+    def GetMMMojoReadInfoAttach(self, read_info, attach_data_size):
+        getattr(attach_data_size, "_obj", attach_data_size).value = 0
+        return None
+
+    def RemoveMMMojoReadInfo(self, read_info):
+        with self._lock:
+            self._read_infos.pop(_value(read_info), None)
+
+    def GetMMMojoReadInfoMethod(self, read_info):
+        return 1
+
+    def GetMMMojoReadInfoSync(self, read_info):
+        return False
+
+    def CreateMMMojoWriteInfo(self, method, sync, request_id):
+        with self._lock:
+            handle = next(self._handles)
+            self._write_infos[handle] = {"method": _value(method), "sync": _value(sync),
+                                         "request_id": _value(request_id), "buffer": None}
+        return handle
+
+    def GetMMMojoWriteInfoRequest(self, write_info, request_data_size):
+        buffer = create_string_buffer(_value(request_data_size))
+        self._write_infos[_value(write_info)]["buffer"] = buffer
+        return addressof(buffer)
+
+    def RemoveMMMojoWriteInfo(self, write_info):
+        with self._lock:
+            self._write_infos.pop(_value(write_info), None)
+
+    def GetMMMojoWriteInfoAttach(self, write_info, attach_data_size):
+        return None
+
+    def SetMMMojoWriteInfoMessagePipe(self, write_info, num_of_message_pipe):
+        pass
+
+    def SetMMMojoWriteInfoResponseSync(self, write_info, read_info):
+        pass
+
+    def SendMMMojoWriteInfo(self, env, write_info):
+        handle = _value(env)
+        with self._lock:
+            info = self._write_infos.pop(_value(write_info), None)
+        if info is None or handle not in self._envs or not self._envs[handle]["running"]:
+            return False
+        task_id, pic_paths = ocr_codec.decode_ocr_request(info["buffer"].raw)
+        self.requests += 1
+        delay = 0.0
+        for pic_path in pic_paths:
+            response = self.responder(task_id, pic_path)
+            # 逐张识别, 后面的图片在前一张的基础上累加耗时
+            delay += self.delay(task_id) if callable(self.delay) else self.delay
+            if response is None:
+                continue
+            if not isinstance(response, (bytes, bytearray)):
+                response = response.SerializeToString()
+            self._schedule(delay, self._push, handle, info["request_id"], bytes(response))
+        return True
+
+    def SwapMMMojoWriteInfoCallback(self, write_info, read_info):
+        return False
+
+    def SwapMMMojoWriteInfoMessage(self, write_info, read_info):
+        return False
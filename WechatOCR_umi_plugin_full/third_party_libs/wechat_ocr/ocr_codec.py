@@ -0,0 +1,377 @@
+'''
+OcrRequest/OcrResponse 直接编解码, 不依赖 google.protobuf
+
+OcrRequest 的结构(见 ocr_protobuf_pb2):
+    OcrRequest {1: unknow, 2: task_id, 3: pic_path}
+    PicPaths {1: repeated pic_path}
+
+OcrResponse 的结构:
+    OcrResponse {1: type, 2: task_id, 3: err_code, 4: ocr_result}
+    OcrResult {1: repeated single_result, 2: unknown_1, 3: unknown_2}
+    SingleResult {1: single_pos, 2: single_str_utf8, 3: single_rate, 4: repeated one_result,
+                  5: left, 6: top, 7: right, 8: bottom, 9: unknown_0, 10: unknown_pos}
+    ResultPos {1: repeated pos}
+    PosXY {1: x, 2: y}
+
+原来的解码流程是 ParseFromString -> MessageToJson -> json.loads -> base64 解码,
+这里直接从 wire 数据(bytes 或 memoryview)读取需要的字段, 结果与原流程一致。
+只有显式调用 decode_ocr_response_legacy 时才会导入 google.protobuf。
+'''
+import json
+import math
+import base64
+from functools import lru_cache
+from struct import Struct
+from typing import List, NamedTuple, Optional, Tuple
+
+
+_FLOAT = Struct("<f")
+_POS_XY = Struct("<xfxf")
+
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH_DELIMITED = 2
+WIRE_FIXED32 = 5
+
+
+class OcrLine(NamedTuple):
+    '''单行识别结果, 未出现在 wire 数据中(或为0)的数值字段为 None, 与 MessageToJson 的省略规则一致'''
+    text: str
+    rate: Optional[float]
+    left: Optional[float]
+    top: Optional[float]
+    right: Optional[float]
+    bottom: Optional[float]
+    pos: Tuple[Tuple[Optional[float], Optional[float]], ...]
+
+
+@lru_cache(maxsize=4096)
+def _shortest_float(value: float) -> float:
+    # 与 google.protobuf.internal.type_checkers.ToShortestFloat 相同, 保证和 MessageToJson 输出的数值一致;
+    # 同一张图里坐标值大量重复, 缓存可以省掉大部分格式化;
+    # NaN 与自身不相等, 下面的循环永远不会结束, 与 json_format 一样先排除 NaN 和 ±Inf
+    if value != value or math.isinf(value):
+        return value
+    precision = 6
+    rounded = float(f"{value:.{precision}g}")
+    while _FLOAT.unpack(_FLOAT.pack(rounded))[0] != value:
+        precision += 1
+        rounded = float(f"{value:.{precision}g}")
+    return rounded
+
+
+def _read_varint(buf, pos: int) -> Tuple[int, int]:
+    b = buf[pos]
+    if b < 0x80:
+        return b, pos + 1
+    result = b & 0x7F
+    shift = 7
+    pos += 1
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+        if shift >= 64:
+            raise ValueError("varint 过长")
+
+
+def _write_varint(out: bytearray, value: int):
+    value &= (1 << 64) - 1
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_key(out: bytearray, field_number: int, wire_type: int):
+    _write_varint(out, (field_number << 3) | wire_type)
+
+
+def _write_bytes(out: bytearray, field_number: int, value: bytes):
+    _write_key(out, field_number, WIRE_LENGTH_DELIMITED)
+    _write_varint(out, len(value))
+    out += value
+
+
+def _write_int(out: bytearray, field_number: int, value: int):
+    # proto3: 默认值不写入
+    if value:
+        _write_key(out, field_number, WIRE_VARINT)
+        _write_varint(out, value)
+
+
+def _write_float(out: bytearray, field_number: int, value: Optional[float]):
+    if value:
+        _write_key(out, field_number, WIRE_FIXED32)
+        out += _FLOAT.pack(value)
+
+
+def _read_float(buf, pos: int) -> Optional[float]:
+    value = _FLOAT.unpack_from(buf, pos)[0]
+    if not value:
+        return None
+    return _shortest_float(value)
+
+
+def _skip_field(buf, pos: int, wire_type: int) -> int:
+    if wire_type == WIRE_VARINT:
+        return _read_varint(buf, pos)[1]
+    if wire_type == WIRE_FIXED64:
+        return pos + 8
+    if wire_type == WIRE_LENGTH_DELIMITED:
+        size, pos = _read_varint(buf, pos)
+        return pos + size
+    if wire_type == WIRE_FIXED32:
+        return pos + 4
+    raise ValueError(f"不支持的 wire type: {wire_type}")
+
+
+def _next_field(buf, pos: int, end: int) -> Tuple[int, int, int, int]:
+    '''读取一个字段头, 返回 (field_number, wire_type, value_pos, next_pos)'''
+    try:
+        key, pos = _read_varint(buf, pos)
+        wire_type = key & 0x7
+        if wire_type == WIRE_LENGTH_DELIMITED:
+            size, pos = _read_varint(buf, pos)
+            next_pos = pos + size
+        elif wire_type == WIRE_FIXED32:
+            next_pos = pos + 4
+        else:
+            next_pos = _skip_field(buf, pos, wire_type)
+    except IndexError:
+        # varint 读到了缓冲区末尾之外
+        raise ValueError("OcrResponse 数据被截断") from None
+    if next_pos > end:
+        raise ValueError("OcrResponse 数据被截断")
+    return key >> 3, wire_type, pos, next_pos
+
+
+def _decode_pos_xy(buf, pos: int, end: int):
+    x = y = None
+    while pos < end:
+        field_number, wire_type, value_pos, pos = _next_field(buf, pos, end)
+        if wire_type != WIRE_FIXED32:
+            continue
+        if field_number == 1:
+            x = _read_float(buf, value_pos)
+        elif field_number == 2:
+            y = _read_float(buf, value_pos)
+    return x, y
+
+
+def _decode_result_pos(buf, pos: int, end: int):
+    points = []
+    while pos < end:
+        field_number, wire_type, value_pos, pos = _next_field(buf, pos, end)
+        if field_number != 1 or wire_type != WIRE_LENGTH_DELIMITED:
+            continue
+        if pos - value_pos == 10 and buf[value_pos] == 0x0D and buf[value_pos + 5] == 0x15:
+            # 常见情况: x、y 都存在, 按固定布局一次读出
+            x, y = _POS_XY.unpack_from(buf, value_pos)
+            points.append((_shortest_float(x) if x else None, _shortest_float(y) if y else None))
+        else:
+            points.append(_decode_pos_xy(buf, value_pos, pos))
+    return tuple(points)
+
+
+def _decode_single_result(buf, pos: int, end: int) -> OcrLine:
+    text = ""
+    rate = left = top = right = bottom = None
+    points = ()
+    while pos < end:
+        field_number, wire_type, value_pos, pos = _next_field(buf, pos, end)
+        if wire_type == WIRE_FIXED32:
+            if field_number == 3:
+                rate = _read_float(buf, value_pos)
+            elif field_number == 5:
+                left = _read_float(buf, value_pos)
+            elif field_number == 6:
+                top = _read_float(buf, value_pos)
+            elif field_number == 7:
+                right = _read_float(buf, value_pos)
+            elif field_number == 8:
+                bottom = _read_float(buf, value_pos)
+        elif wire_type == WIRE_LENGTH_DELIMITED:
+            if field_number == 2:
+                text = str(buf[value_pos:pos], "utf-8")
+            elif field_number == 1:
+                points = _decode_result_pos(buf, value_pos, pos)
+    return OcrLine(text, rate, left, top, right, bottom, points)
+
+
+def decode_ocr_response(data) -> Tuple[int, List[OcrLine]]:
+    '''
+    直接解码 OcrResponse, data 可以是 bytes/bytearray/memoryview(如 c_ubyte 数组上的 memoryview),
+    返回 (task_id, lines)
+    '''
+    buf = memoryview(data)
+    if buf.format != "B":
+        buf = buf.cast("B")
+    end = len(buf)
+    pos = 0
+    task_id = 0
+    lines: List[OcrLine] = []
+    while pos < end:
+        field_number, wire_type, value_pos, pos = _next_field(buf, pos, end)
+        if field_number == 2 and wire_type == WIRE_VARINT:
+            task_id = _read_varint(buf, value_pos)[0]
+            if task_id >= 1 << 63:
+                task_id -= 1 << 64
+        elif field_number == 4 and wire_type == WIRE_LENGTH_DELIMITED:
+            sub_end = pos
+            sub_pos = value_pos
+            while sub_pos < sub_end:
+                sub_number, sub_type, item_pos, sub_pos = _next_field(buf, sub_pos, sub_end)
+                if sub_number == 1 and sub_type == WIRE_LENGTH_DELIMITED:
+                    lines.append(_decode_single_result(buf, item_pos, sub_pos))
+    return task_id, lines
+
+
+def encode_ocr_request(task_id: int, pic_paths: List[str], unknow: int = 0) -> bytes:
+    '''序列化 OcrRequest, 与 ocr_protobuf_pb2.OcrRequest.SerializeToString() 的结果相同'''
+    paths = bytearray()
+    for pic_path in pic_paths:
+        _write_bytes(paths, 1, pic_path.encode("utf-8"))
+    out = bytearray()
+    _write_int(out, 1, unknow)
+    _write_int(out, 2, task_id)
+    _write_bytes(out, 3, bytes(paths))
+    return bytes(out)
+
+
+def decode_ocr_request(data) -> Tuple[int, List[str]]:
+    '''解码 OcrRequest, 返回 (task_id, pic_paths)'''
+    buf = memoryview(data)
+    if buf.format != "B":
+        buf = buf.cast("B")
+    end = len(buf)
+    pos = 0
+    task_id = 0
+    pic_paths: List[str] = []
+    while pos < end:
+        field_number, wire_type, value_pos, pos = _next_field(buf, pos, end)
+        if field_number == 2 and wire_type == WIRE_VARINT:
+            task_id = _read_varint(buf, value_pos)[0]
+            if task_id >= 1 << 63:
+                task_id -= 1 << 64
+        elif field_number == 3 and wire_type == WIRE_LENGTH_DELIMITED:
+            sub_end = pos
+            sub_pos = value_pos
+            while sub_pos < sub_end:
+                sub_number, sub_type, item_pos, sub_pos = _next_field(buf, sub_pos, sub_end)
+                if sub_number == 1 and sub_type == WIRE_LENGTH_DELIMITED:
+                    pic_paths.append(str(buf[item_pos:sub_pos], "utf-8"))
+    return task_id, pic_paths
+
+
+def encode_ocr_response(task_id: int, lines: List[OcrLine], type: int = 0, err_code: int = 0) -> bytes:
+    '''序列化 OcrResponse, 用于模拟传输层和测试, 与 ocr_protobuf_pb2 的序列化结果相同'''
+    results = bytearray()
+    for line in lines:
+        item = bytearray()
+        if line.pos:
+            points = bytearray()
+            for x, y in line.pos:
+                point = bytearray()
+                _write_float(point, 1, x)
+                _write_float(point, 2, y)
+                _write_bytes(points, 1, bytes(point))
+            _write_bytes(item, 1, bytes(points))
+        if line.text:
+            _write_bytes(item, 2, line.text.encode("utf-8"))
+        _write_float(item, 3, line.rate)
+        _write_float(item, 5, line.left)
+        _write_float(item, 6, line.top)
+        _write_float(item, 7, line.right)
+        _write_float(item, 8, line.bottom)
+        _write_bytes(results, 1, bytes(item))
+    out = bytearray()
+    _write_int(out, 1, type)
+    _write_int(out, 2, task_id)
+    _write_int(out, 3, err_code)
+    if results:
+        _write_bytes(out, 4, bytes(results))
+    return bytes(out)
+
+
+def _point_to_dict(point):
+    x, y = point
+    r = {}
+    if x is not None:
+        r["x"] = x
+    if y is not None:
+        r["y"] = y
+    return r
+
+
+def _coord(value: Optional[float]) -> float:
+    # proto3 不传输值为0的字段, 坐标缺失就是0(文字贴着图片左边或上边), 不能当成未知
+    return 0.0 if value is None else value
+
+
+def lines_to_results(task_id: int, lines: List[OcrLine]) -> dict:
+    '''把 OcrLine 列表转换为 parse_json_response 返回的结构, 保持向后兼容; location 中缺失的坐标补为 0.0'''
+    results = {
+        "taskId": task_id,
+        "ocrResult": []
+    }
+    for line in lines:
+        if not line.pos:
+            pos = None
+        elif len(line.pos) == 1:
+            pos = _point_to_dict(line.pos[0])
+        else:
+            pos = [_point_to_dict(p) for p in line.pos]
+        results["ocrResult"].append({
+            "text": line.text,
+            "location": {
+                "left": _coord(line.left),
+                "top": _coord(line.top),
+                "right": _coord(line.right),
+                "bottom": _coord(line.bottom)
+            },
+            "pos": pos
+        })
+    return results
+
+
+def parse_json_response(json_response_str:str):
+    json_response = json.loads(json_response_str)
+    results = {
+        "taskId": json_response["taskId"],
+        "ocrResult": []
+    }
+    singleResult = json_response.get("ocrResult", {}).get("singleResult")
+    if not singleResult:
+        return results
+
+    for i in singleResult:
+        pos = i.get('singlePos', {}).get('pos')
+        if isinstance(pos, list) and len(pos) == 1:
+            pos = pos[0]
+        text = base64.b64decode(i.get("singleStrUtf8", '')).decode('utf-8')
+        r = {
+            "text": text,
+            "location": {
+                "left": _coord(i.get('left')),
+                "top": _coord(i.get("top")),
+                "right": _coord(i.get('right')),
+                "bottom": _coord(i.get('bottom'))
+            },
+            "pos": pos
+        }
+        results["ocrResult"].append(r)
+    return results
+
+
+def decode_ocr_response_legacy(data: bytes) -> dict:
+    '''原来的解码流程: protobuf 解析 -> MessageToJson -> parse_json_response, 仅用于对比和兜底'''
+    from google.protobuf.json_format import MessageToJson
+    from . import ocr_protobuf_pb2
+
+    ocr_response = ocr_protobuf_pb2.OcrResponse()
+    ocr_response.ParseFromString(bytes(data))
+    return parse_json_response(MessageToJson(ocr_response))
@@ -1,19 +1,26 @@
 import os
-import json
 import time
-import base64
+import threading
+from collections import deque
 from enum import Enum
-from typing import Dict, Callable
-from multiprocessing import Queue, Value
-from google.protobuf.json_format import MessageToJson
+from typing import Deque, Dict, Callable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
-from . import ocr_protobuf_pb2
+# 请求/结果都由 ocr_codec 直接编解码, 不在导入时加载 google.protobuf
+from . import ocr_codec
+from .task_id_allocator import TaskIdAllocator
 from .winapi import *
 from .mmmojo_dll import MMMojoInfoMethod
 from .xplugin_manager import XPluginManager
 
 
 OCR_MAX_TASK_ID = 32
+# 等待空闲task_id的默认秒数
+OCR_TASK_ID_WAIT = 5.0
+# task_id租约的默认秒数, 超时未返回结果的id会被回收
+OCR_TASK_LEASE_TIMEOUT = 30.0
+# 等待WeChatOCR连接成功的默认秒数
+OCR_CONNECT_WAIT = 15.0
 
 class RequestIdOCR(Enum):
     OCRPush = 1
@@ -31,29 +38,40 @@ def OCRRemoteOnDisConnect(user_data:py_object):
         manager_obj.SetConnectState(False)
 
 def OCRReadOnPush(request_id:c_uint32, request_info:c_void_p, user_data:py_object):
-    print(f"OCRReadOnPush 回调函数被调用 参数, request_id: {request_id}, request_info: {request_info}")
+    # 运行在mmmojo的IPC线程上: 只拷贝一次数据并立即释放native缓冲区, 解析和用户回调交给解码线程
     if user_data:
         manager_obj:OcrManager = cast(user_data, py_object).value
         pb_size = c_uint32()
         pb_data = manager_obj.GetPbSerializedData(request_info, pb_size)
-        if pb_size.value > 10:
-            print(f"正在解析pb数据，pb数据大小: {pb_size.value}")
-            manager_obj.CallUsrCallback(request_id, pb_data, pb_size.value)
-            manager_obj.RemoveReadInfo(request_info)
+        data = string_at(pb_data, pb_size.value) if pb_data and pb_size.value > 10 else None
+        manager_obj.RemoveReadInfo(request_info)
+        if data:
+            manager_obj.DispatchResponse(request_id, data)
 
 
 class OcrManager(XPluginManager):
-    m_task_id = Queue(OCR_MAX_TASK_ID)
-    m_id_path:Dict[int, str] = {}
-    m_usr_lib_dir: str = None
-    m_wechatocr_running: bool = False
-    m_connect_state:Value = Value('b', False)
-    m_usr_callback: Callable = None
-
-    def __init__(self, wechat_path) -> None:
-        super().__init__(wechat_path)
-        for i in range(1, 33):
-            self.m_task_id.put(i)
+    def __init__(self, wechat_path, transport=None) -> None:
+        # 状态都放在实例上, 同一进程内可以同时存在多个OCR环境
+        self.m_task_id = TaskIdAllocator(OCR_MAX_TASK_ID, OCR_TASK_LEASE_TIMEOUT, on_reclaim=self.OnTaskIdsReclaimed)
+        self.m_task_id_wait: float = OCR_TASK_ID_WAIT
+        self.m_id_path:Dict[int, str] = {}
+        # 一个task里打包了多张图片时, 除 m_id_path 中正在等待的那张之外其余的路径
+        self.m_id_more_paths:Dict[int, Deque[str]] = {}
+        # 每个OcrRequest最多携带的图片数, 1表示不打包(默认)
+        self.m_max_paths_per_task: int = 1
+        self.m_usr_lib_dir: str = None
+        self.m_wechatocr_running: bool = False
+        # 连接成功时由 OCRRemoteOnConnect 置位并唤醒等待者, 代替原来的轮询; KillWeChatOCR 也会唤醒等待者
+        self.m_connect_cond = threading.Condition()
+        self.m_connected: bool = False
+        self.m_connect_wait: float = OCR_CONNECT_WAIT
+        self.m_start_time: float = 0.0
+        self.m_connect_elapsed: float = None
+        self.m_connect_state_callback: Callable = None
+        # 解码线程, 保证结果按到达顺序处理
+        self.m_decode_executor: ThreadPoolExecutor = None
+        self.m_usr_callback: Callable = None
+        super().__init__(wechat_path, transport)
     
     def __del__(self):
         if self.m_wechatocr_running:
@@ -65,95 +83,186 @@ class OcrManager(XPluginManager):
 
     def SetOcrResultCallback(self, func:Callable):
         self.m_usr_callback = func
+
+    def SetTaskIdWait(self, seconds:float):
+        '''没有空闲task_id时最多等待的秒数, None 表示一直等待'''
+        self.m_task_id_wait = seconds
+
+    def SetTaskLeaseTimeout(self, seconds:float):
+        '''task_id租约时长, 超过该时长仍未返回结果的id会被自动回收'''
+        self.m_task_id.lease_timeout = seconds
     
+    def SetMaxPathsPerTask(self, count:int):
+        '''
+        每个OcrRequest的pic_path字段最多打包的图片数, 默认为1;
+        大于1时假定WeChatOCR对同一个task_id按路径顺序逐张返回OcrResponse, 只在确认引擎支持时开启
+        '''
+        self.m_max_paths_per_task = max(1, int(count))
+
     def StartWeChatOCR(self):
+        self.m_start_time = time.monotonic()
+        self.m_connect_elapsed = None
+        if self.m_decode_executor is None:
+            self.m_decode_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wechat-ocr-decode")
         self.SetCallbackUsrData(self)
         self.InitMMMojoEnv()
         self.m_wechatocr_running = True
     
     def KillWeChatOCR(self):
-        self.m_connect_state.value = False
-        self.m_wechatocr_running = False
+        with self.m_connect_cond:
+            self.m_connected = False
+            self.m_wechatocr_running = False
+            # 正在 WaitConnected 的线程立即返回 False, 不必等到超时
+            self.m_connect_cond.notify_all()
         self.StopMMMojoEnv()
+        if self.m_decode_executor is not None:
+            self.m_decode_executor.shutdown(wait=False)
+            self.m_decode_executor = None
     
-    def DoOCRTask(self, pic_path:str):
+    def DoOCRTask(self, pic_path:str, on_task_id:Callable = None):
+        '''
+        发送一个OCR任务, 返回分配到的task_id;
+        on_task_id 会在发送请求之前以 task_id 调用, 方便调用方在结果回来之前登记该任务
+        '''
+        pic_path = self.CheckPicPaths([pic_path])[0]
+        _id = self.GetIdleTaskIdOrRaise()
+        if on_task_id:
+            on_task_id(_id)
+        self.SendOCRTask(_id, pic_path)
+        return _id
+
+    def DoOCRBatch(self, pic_paths:List[str], on_task_id:Callable = None, task_id_wait:float = None) -> List[Tuple[int, List[str]]]:
+        '''
+        发送一批OCR任务, 按 m_max_paths_per_task 把多张图片打包进同一个OcrRequest,
+        不支持打包时每张图片占用一个task_id, 依次取空闲id流水线发送(id用完时等待结果归还);
+        on_task_id 以 (task_id, 该task的路径列表) 调用, 返回 [(task_id, 路径列表), ...];
+        task_id_wait 为本批每次等待空闲id的最长秒数, 默认使用 SetTaskIdWait 的设置
+        '''
+        pic_paths = self.CheckPicPaths(pic_paths)
+        step = self.m_max_paths_per_task
+        sent = []
+        for i in range(0, len(pic_paths), step):
+            chunk = pic_paths[i:i + step]
+            _id = self.GetIdleTaskIdOrRaise(task_id_wait)
+            if on_task_id:
+                on_task_id(_id, chunk)
+            self.SendOCRTask(_id, chunk)
+            sent.append((_id, chunk))
+        return sent
+
+    def CheckPicPaths(self, pic_paths:List[str]) -> List[str]:
         if not self.m_wechatocr_running:
             raise Exception("请先调用StartWeChatOCR启动")
-        if not os.path.exists(pic_path):
-            raise Exception(f"给定图片路径pic_path不存在: {pic_path}")
-        pic_path = os.path.abspath(pic_path)
-        while not self.m_connect_state.value:
-            print("等待Ocr服务连接成功!")
-            time.sleep(1)
-        _id = self.GetIdleTaskId()
+        for pic_path in pic_paths:
+            if not os.path.exists(pic_path):
+                raise Exception(f"给定图片路径pic_path不存在: {pic_path}")
+        if not self.WaitConnected(self.m_connect_wait):
+            if not self.m_wechatocr_running:
+                raise Exception("WeChatOCR已关闭")
+            raise Exception(f"等待Ocr服务连接超时({self.m_connect_wait}秒)")
+        return [os.path.abspath(pic_path) for pic_path in pic_paths]
+
+    def GetIdleTaskIdOrRaise(self, wait:float = None) -> int:
+        wait = self.m_task_id_wait if wait is None else wait
+        _id = self.GetIdleTaskId(wait)
         if not _id:
-            print("当前队列已满，请等待后重试")
-            return
-        self.SendOCRTask(_id, pic_path)
+            raise Exception(f"当前队列已满, 等待{wait:.1f}秒后仍没有空闲的task_id")
+        return _id
     
     def SetConnectState(self, connect:bool):
-        self.m_connect_state.value = connect
+        if connect:
+            if self.m_connect_elapsed is None:
+                self.m_connect_elapsed = time.monotonic() - self.m_start_time
+        with self.m_connect_cond:
+            self.m_connected = connect
+            self.m_connect_cond.notify_all()
+        if self.m_connect_state_callback:
+            self.m_connect_state_callback(connect)
+
+    def SetConnectStateCallback(self, func:Callable):
+        '''连接状态变化(WeChatOCR连接成功或断开)时以 bool 参数调用 func'''
+        self.m_connect_state_callback = func
+
+    def IsConnected(self) -> bool:
+        return self.m_connected
+
+    def WaitConnected(self, timeout:float = None) -> bool:
+        '''等待连接成功, 超时或 KillWeChatOCR 之后返回 False'''
+        with self.m_connect_cond:
+            self.m_connect_cond.wait_for(lambda: self.m_connected or not self.m_wechatocr_running, timeout)
+            return self.m_connected
+
+    def SetConnectWait(self, seconds:float):
+        '''DoOCRTask 等待连接成功的最长秒数'''
+        self.m_connect_wait = seconds
+
+    def GetConnectElapsed(self) -> float:
+        '''从 StartWeChatOCR 到连接成功所用的秒数, 尚未连接时为 None'''
+        return self.m_connect_elapsed
     
-    def SendOCRTask(self, task_id:int, pic_path:str):
-        self.m_id_path[task_id] = pic_path
-        ocr_request = ocr_protobuf_pb2.OcrRequest()
-        ocr_request.unknow = 0
-        ocr_request.task_id = task_id
-
-        pic_paths = ocr_request.pic_path
-        pic_paths.pic_path.extend([pic_path])
-        serialized_data = ocr_request.SerializeToString()
+    def SendOCRTask(self, task_id:int, pic_path):
+        '''pic_path 可以是单个路径, 也可以是要打包进同一个请求的路径列表'''
+        pic_path_list = [pic_path] if isinstance(pic_path, str) else list(pic_path)
+        self.m_id_path[task_id] = pic_path_list[0]
+        if len(pic_path_list) > 1:
+            self.m_id_more_paths[task_id] = deque(pic_path_list[1:])
+        else:
+            self.m_id_more_paths.pop(task_id, None)
+        serialized_data = ocr_codec.encode_ocr_request(task_id, pic_path_list)
         self.SendPbSerializedData(serialized_data, len(serialized_data), MMMojoInfoMethod.kMMPush.value, 0, RequestIdOCR.OCRPush.value)
     
-    def CallUsrCallback(self, request_id:c_uint32, serialized_data: c_void_p, data_size: int):
-        ocr_response_ubyte = (c_ubyte * data_size).from_address(serialized_data)
-        ocr_response_array = bytes(ocr_response_ubyte)
-        ocr_response = ocr_protobuf_pb2.OcrResponse()
-        ocr_response.ParseFromString(ocr_response_array)
-        json_response_str = MessageToJson(ocr_response)
-        task_id = ocr_response.task_id
-        if not self.m_id_path.get(task_id):
+    def DispatchResponse(self, request_id:int, data:bytes):
+        '''把已拷贝出来的OcrResponse交给解码线程处理'''
+        executor = self.m_decode_executor
+        if executor is None:
             return
-        #print(f"收到识别结果, task_id: {task_id}, result: {json_response}")
-        pic_path = self.m_id_path[task_id]
-        if self.m_usr_callback:
-            self.m_usr_callback(pic_path, self.parse_json_response(json_response_str))
-        self.SetTaskIdIdle(task_id)
+        try:
+            executor.submit(self.CallUsrCallback, request_id, data)
+        except RuntimeError:
+            # KillWeChatOCR 之后到达的结果直接丢弃
+            pass
+
+    def CallUsrCallback(self, request_id:int, data:bytes):
+        try:
+            task_id, lines = ocr_codec.decode_ocr_response(data)
+        except Exception as e:
+            print(f"解析OcrResponse失败: {e}")
+            return
+        pic_path = self.m_id_path.get(task_id)
+        if not pic_path or not self.m_task_id.is_leased(task_id):
+            # 租约已被回收的迟到结果(回收时已清除 m_id_path, 隔离期内该id不会再借出)
+            return
+        more_paths = self.m_id_more_paths.get(task_id)
+        try:
+            if self.m_usr_callback:
+                self.m_usr_callback(pic_path, ocr_codec.lines_to_results(task_id, lines))
+        except Exception as e:
+            print(f"OCR结果回调出错: {e}")
+        finally:
+            if more_paths:
+                # 打包的task还有图片没返回, 继续占用该task_id
+                self.m_id_path[task_id] = more_paths.popleft()
+            else:
+                self.m_id_more_paths.pop(task_id, None)
+                self.SetTaskIdIdle(task_id)
     
     def parse_json_response(self, json_response_str:str):
-        json_response = json.loads(json_response_str)
-        results = {
-            "taskId": json_response["taskId"],
-            "ocrResult": []
-        }
-        singleResult = json_response.get("ocrResult", {}).get("singleResult")
-        if not singleResult:
-            return results
-            
-        for i in singleResult:
-            pos = i.get('singlePos', {}).get('pos')
-            if isinstance(pos, list) and len(pos) == 1:
-                pos = pos[0]
-            text = base64.b64decode(i.get("singleStrUtf8", '')).decode('utf-8')
-            r = {
-                "text": text,
-                "location": {
-                    "left": i.get('left'),
-                    "top": i.get("top"),
-                    "right": i.get('right'),
-                    "bottom": i.get('bottom')
-                },
-                "pos": pos
-            }
-            results["ocrResult"].append(r)
-        return results
+        return ocr_codec.parse_json_response(json_response_str)
     
-    def GetIdleTaskId(self):
-        task_id = self.m_task_id.get(timeout=1)
-        return task_id
+    def GetIdleTaskId(self, wait:float = None):
+        return self.m_task_id.acquire(timeout=self.m_task_id_wait if wait is None else wait)
 
     def SetTaskIdIdle(self, _id):
-        self.m_task_id.put(_id)
+        self.m_task_id.release(_id)
+
+    def OnTaskIdsReclaimed(self, task_ids:List[int]):
+        '''租约被回收的task_id不再对应任何图片, 隔离期间迟到的结果在 CallUsrCallback 中直接丢弃'''
+        for task_id in task_ids:
+            self.m_id_path.pop(task_id, None)
+            self.m_id_more_paths.pop(task_id, None)
+
+    def GetTaskIdStats(self) -> dict:
+        return self.m_task_id.stats()
 
     def SetDefaultCallbaks(self):
         super().SetOneCallback("kMMRemoteConnect", OCRRemoteOnConnect)
@@ -0,0 +1,127 @@
+import time
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+class TaskIdAllocator(object):
+    '''
+    进程内的task_id分配器, 代替原来的 multiprocessing.Queue
+
+    每个被取出的id都是一个租约(lease), 超过 lease_timeout 仍未归还(例如WeChatOCR一直没有返回结果)
+    会被自动回收, 防止id池慢慢泄漏为空; id用完时 acquire 会阻塞等待, 直到有id归还或超时
+
+    回收的id对应的结果可能还在路上, OcrResponse 里只有task_id, 无法区分新旧任务;
+    因此回收的id先隔离 quarantine_timeout 秒(默认与 lease_timeout 相同)再放回空闲队列, 隔离期间迟到的结果按未租出丢弃;
+    on_reclaim 以回收的id列表调用(持有内部锁时调用, 只应做清理登记之类的轻量操作)
+    '''
+    def __init__(self, max_id:int, lease_timeout:float = 30.0, quarantine_timeout:Optional[float] = None,
+                 on_reclaim:Optional[Callable[[List[int]], None]] = None) -> None:
+        self.max_id = max_id
+        self.lease_timeout = lease_timeout
+        self.quarantine_timeout = quarantine_timeout
+        self.on_reclaim = on_reclaim
+        self._cond = threading.Condition()
+        self._free = deque(range(1, max_id + 1))
+        self._leases: Dict[int, float] = {}
+        # 回收后隔离中的id -> 解除隔离的时间
+        self._quarantine: Dict[int, float] = {}
+        self._acquired = 0
+        self._released = 0
+        self._reclaimed = 0
+        self._wait_timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def in_use(self) -> int:
+        with self._cond:
+            self._reclaim_locked(time.monotonic())
+            return len(self._leases)
+
+    def is_leased(self, task_id:int) -> bool:
+        with self._cond:
+            self._reclaim_locked(time.monotonic())
+            return task_id in self._leases
+
+    def _reclaim_expired_locked(self, now:float) -> List[int]:
+        '''回收到期的租约放入隔离区, 并把隔离期满的id放回空闲队列; 返回本次回收的id'''
+        released = [task_id for task_id, until in self._quarantine.items() if until <= now]
+        for task_id in released:
+            del self._quarantine[task_id]
+            self._free.append(task_id)
+        expired = [task_id for task_id, deadline in self._leases.items() if deadline <= now]
+        if expired:
+            quarantine = self.lease_timeout if self.quarantine_timeout is None else self.quarantine_timeout
+            for task_id in expired:
+                del self._leases[task_id]
+                self._quarantine[task_id] = now + quarantine
+            self._reclaimed += len(expired)
+            if self.on_reclaim:
+                self.on_reclaim(expired)
+        return expired
+
+    def _reclaim_locked(self, now:float) -> List[int]:
+        '''同 _reclaim_expired_locked, 并唤醒等待放回空闲队列的id的 acquire'''
+        free_before = len(self._free)
+        expired = self._reclaim_expired_locked(now)
+        if len(self._free) > free_before:
+            self._cond.notify(len(self._free) - free_before)
+        return expired
+
+    def reclaim_expired(self) -> List[int]:
+        with self._cond:
+            return self._reclaim_locked(time.monotonic())
+
+    def acquire(self, timeout:Optional[float] = None, lease_timeout:Optional[float] = None) -> Optional[int]:
+        '''取一个空闲id, 超过 timeout 秒仍没有空闲id时返回 None; timeout 为 None 表示一直等待'''
+        start = time.monotonic()
+        wait_deadline = None if timeout is None else start + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                # 每次都先回收, 到期的租约不会因为空闲队列非空而一直占着id
+                self._reclaim_locked(now)
+                if self._free:
+                    task_id = self._free.popleft()
+                    self._leases[task_id] = now + (self.lease_timeout if lease_timeout is None else lease_timeout)
+                    self._acquired += 1
+                    waited = now - start
+                    self._wait_total += waited
+                    self._wait_max = max(self._wait_max, waited)
+                    return task_id
+                # 最早到期的租约和最早期满的隔离也会唤醒等待, 以便及时回收
+                wake_at = min(itertools.chain(self._leases.values(), self._quarantine.values()), default=None)
+                if wait_deadline is not None:
+                    if now >= wait_deadline:
+                        self._wait_timeouts += 1
+                        self._wait_total += now - start
+                        return None
+                    wake_at = wait_deadline if wake_at is None else min(wake_at, wait_deadline)
+                self._cond.wait(None if wake_at is None else max(0.0, wake_at - now))
+
+    def release(self, task_id:int) -> bool:
+        '''归还id, 对已经被回收(或从未借出)的id返回 False'''
+        with self._cond:
+            if self._leases.pop(task_id, None) is None:
+                return False
+            self._free.append(task_id)
+            self._released += 1
+            self._cond.notify()
+            return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._reclaim_locked(time.monotonic())
+            return {
+                "in_use": len(self._leases),
+                "free": len(self._free),
+                "quarantined": len(self._quarantine),
+                "acquired": self._acquired,
+                "released": self._released,
+                "reclaimed": self._reclaimed,
+                "wait_timeouts": self._wait_timeouts,
+                "wait_total": self._wait_total,
+                "wait_max": self._wait_max,
+            }
@@ -1,8 +1,15 @@
+import sys
 from ctypes import *
 from ctypes.wintypes import *
 
-user32 = WinDLL('user32', use_last_error=True)
-kernel32 = WinDLL('kernel32', use_last_error=True)
+IS_WINDOWS = sys.platform == "win32"
+
+if IS_WINDOWS:
+    user32 = WinDLL('user32', use_last_error=True)
+    kernel32 = WinDLL('kernel32', use_last_error=True)
+else:
+    # 非Windows平台(例如在Linux上配合模拟传输层做测试)没有这些系统库, 下面的Win32函数也不会定义
+    user32 = kernel32 = None
 
 class _SECURITY_ATTRIBUTES(Structure):
     _fields_ = [('nLength', DWORD),
@@ -34,7 +41,7 @@ LPTHREAD_START_ROUTINE = LPVOID
 FARPROC = SIZE_T = c_ulong
 HCURSOR = c_void_p
 LRESULT = c_int64
-WNDPROC = WINFUNCTYPE(LRESULT, HWND, UINT, WPARAM, LPARAM)
+WNDPROC = (WINFUNCTYPE if IS_WINDOWS else CFUNCTYPE)(LRESULT, HWND, UINT, WPARAM, LPARAM)
 
 class COPYDATASTRUCT(Structure):
     _fields_ = [
@@ -83,7 +90,9 @@ class WNDCLASS(Structure):
                 ('lpszMenuName', LPCWSTR),
                 ('lpszClassName', LPCWSTR)]
 
-def func_def(name, restype, *argtypes, dll=kernel32):
+def func_def(name, restype, *argtypes, dll=None):
+    if dll is None:
+        dll = kernel32
     def errcheck(result, func, args):
         if not result:
             raise WinError(get_last_error())
@@ -94,37 +103,38 @@ def func_def(name, restype, *argtypes, dll=kernel32):
     #cfunc.errcheck = errcheck
     return cfunc
 
-OpenProcess = func_def("OpenProcess", HANDLE, *(DWORD, BOOL, DWORD))
-VirtualAllocEx = func_def("VirtualAllocEx", LPVOID, *(HANDLE, LPVOID, SIZE_T, DWORD, DWORD))
-VirtualFreeEx = func_def("VirtualFreeEx", BOOL, *(HANDLE, LPVOID, SIZE_T, DWORD))
-WriteProcessMemory = func_def("WriteProcessMemory", BOOL, *(HANDLE, LPVOID, LPCVOID, SIZE_T, POINTER(SIZE_T)))
-GetModuleHandleA = func_def("GetModuleHandleA", HMODULE, *(LPCSTR,))
-GetModuleHandleW = func_def("GetModuleHandleW", HMODULE, *(LPCWSTR, ))
-GetProcAddress = func_def("GetProcAddress", c_void_p, *(HMODULE, LPCSTR))
-CreateRemoteThread = func_def("CreateRemoteThread", HANDLE, *(HANDLE, LPSECURITY_ATTRIBUTES, DWORD, LPTHREAD_START_ROUTINE, LPVOID, DWORD, LPDWORD))
-CloseHandle = func_def("CloseHandle", BOOL, *(HANDLE,))
-CreateToolhelp32Snapshot = func_def("CreateToolhelp32Snapshot", HANDLE, *(DWORD, DWORD))
-Module32First = func_def("Module32First", BOOL, *(HANDLE, POINTER(MODULEENTRY32)))
-Module32Next = func_def("Module32Next", BOOL, *(HANDLE, POINTER(MODULEENTRY32)))
-Process32First = func_def("Process32First", BOOL, *(HANDLE, POINTER(PROCESSENTRY32)))
-Process32Next = func_def("Process32Next", BOOL, *(HANDLE, POINTER(PROCESSENTRY32)))
-ReadProcessMemory = func_def("ReadProcessMemory", BOOL, *(HANDLE, LPCVOID, LPVOID, c_size_t, POINTER(c_size_t)))
-FindWindowW = func_def("FindWindowW", HWND, *(LPCWSTR, LPCWSTR), dll=user32)
-GetWindowThreadProcessId = func_def("GetWindowThreadProcessId", DWORD, *(HWND, LPDWORD), dll=user32)
-LoadLibraryW = func_def("LoadLibraryW", HMODULE, *(LPCWSTR,))
-FreeLibrary = func_def("FreeLibrary", BOOL, *(HMODULE, ))
-VirtualProtect = func_def("VirtualProtect", BOOL, *(LPVOID, SIZE_T, DWORD, PDWORD))
-VirtualProtectEx = func_def("VirtualProtectEx", BOOL, *(HANDLE, LPVOID, SIZE_T, DWORD, PDWORD))
-DefWindowProcW = func_def("DefWindowProcW", LRESULT, *(HWND, UINT, WPARAM, LPARAM), dll=user32)
-RegisterClassW = func_def("RegisterClassW", ATOM, *(POINTER(WNDCLASS), ), dll=user32)
-CreateWindowExW = func_def("CreateWindowExW", HWND, *(DWORD, LPCWSTR, LPCWSTR, DWORD, c_int, c_int, c_int, c_int, HWND, HMENU, HINSTANCE, LPVOID), dll=user32)
-ShowWindow = func_def('ShowWindow', BOOL, *(HWND, c_int), dll=user32)
-UpdateWindow = func_def("UpdateWindow", BOOL, *(HWND, ), dll=user32)
-GetMessageW = func_def("GetMessageW", BOOL, *(POINTER(MSG), HWND, UINT, UINT), dll=user32)
-TranslateMessage = func_def('TranslateMessage', BOOL, *(POINTER(MSG), ), dll=user32)
-DispatchMessageW = func_def('DispatchMessageW', LRESULT, *(POINTER(MSG),), dll=user32)
-WaitForSingleObject = func_def('WaitForSingleObject', DWORD, *(HANDLE, DWORD))
-GetExitCodeThread = func_def('GetExitCodeThread', BOOL, *(HANDLE, LPDWORD))
+if IS_WINDOWS:
+    OpenProcess = func_def("OpenProcess", HANDLE, *(DWORD, BOOL, DWORD))
+    VirtualAllocEx = func_def("VirtualAllocEx", LPVOID, *(HANDLE, LPVOID, SIZE_T, DWORD, DWORD))
+    VirtualFreeEx = func_def("VirtualFreeEx", BOOL, *(HANDLE, LPVOID, SIZE_T, DWORD))
+    WriteProcessMemory = func_def("WriteProcessMemory", BOOL, *(HANDLE, LPVOID, LPCVOID, SIZE_T, POINTER(SIZE_T)))
+    GetModuleHandleA = func_def("GetModuleHandleA", HMODULE, *(LPCSTR,))
+    GetModuleHandleW = func_def("GetModuleHandleW", HMODULE, *(LPCWSTR, ))
+    GetProcAddress = func_def("GetProcAddress", c_void_p, *(HMODULE, LPCSTR))
+    CreateRemoteThread = func_def("CreateRemoteThread", HANDLE, *(HANDLE, LPSECURITY_ATTRIBUTES, DWORD, LPTHREAD_START_ROUTINE, LPVOID, DWORD, LPDWORD))
+    CloseHandle = func_def("CloseHandle", BOOL, *(HANDLE,))
+    CreateToolhelp32Snapshot = func_def("CreateToolhelp32Snapshot", HANDLE, *(DWORD, DWORD))
+    Module32First = func_def("Module32First", BOOL, *(HANDLE, POINTER(MODULEENTRY32)))
+    Module32Next = func_def("Module32Next", BOOL, *(HANDLE, POINTER(MODULEENTRY32)))
+    Process32First = func_def("Process32First", BOOL, *(HANDLE, POINTER(PROCESSENTRY32)))
+    Process32Next = func_def("Process32Next", BOOL, *(HANDLE, POINTER(PROCESSENTRY32)))
+    ReadProcessMemory = func_def("ReadProcessMemory", BOOL, *(HANDLE, LPCVOID, LPVOID, c_size_t, POINTER(c_size_t)))
+    FindWindowW = func_def("FindWindowW", HWND, *(LPCWSTR, LPCWSTR), dll=user32)
+    GetWindowThreadProcessId = func_def("GetWindowThreadProcessId", DWORD, *(HWND, LPDWORD), dll=user32)
+    LoadLibraryW = func_def("LoadLibraryW", HMODULE, *(LPCWSTR,))
+    FreeLibrary = func_def("FreeLibrary", BOOL, *(HMODULE, ))
+    VirtualProtect = func_def("VirtualProtect", BOOL, *(LPVOID, SIZE_T, DWORD, PDWORD))
+    VirtualProtectEx = func_def("VirtualProtectEx", BOOL, *(HANDLE, LPVOID, SIZE_T, DWORD, PDWORD))
+    DefWindowProcW = func_def("DefWindowProcW", LRESULT, *(HWND, UINT, WPARAM, LPARAM), dll=user32)
+    RegisterClassW = func_def("RegisterClassW", ATOM, *(POINTER(WNDCLASS), ), dll=user32)
+    CreateWindowExW = func_def("CreateWindowExW", HWND, *(DWORD, LPCWSTR, LPCWSTR, DWORD, c_int, c_int, c_int, c_int, HWND, HMENU, HINSTANCE, LPVOID), dll=user32)
+    ShowWindow = func_def('ShowWindow', BOOL, *(HWND, c_int), dll=user32)
+    UpdateWindow = func_def("UpdateWindow", BOOL, *(HWND, ), dll=user32)
+    GetMessageW = func_def("GetMessageW", BOOL, *(POINTER(MSG), HWND, UINT, UINT), dll=user32)
+    TranslateMessage = func_def('TranslateMessage', BOOL, *(POINTER(MSG), ), dll=user32)
+    DispatchMessageW = func_def('DispatchMessageW', LRESULT, *(POINTER(MSG),), dll=user32)
+    WaitForSingleObject = func_def('WaitForSingleObject', DWORD, *(HANDLE, DWORD))
+    GetExitCodeThread = func_def('GetExitCodeThread', BOOL, *(HANDLE, LPDWORD))
 
 def CloseSomeHandle(*args):
     '''关闭多个句柄'''
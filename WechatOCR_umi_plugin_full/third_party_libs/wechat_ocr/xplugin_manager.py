@@ -1,6 +1,7 @@
 import os
 import time
 import platform
+import threading
 from typing import Callable, Dict, List
 from enum import Enum
 from .winapi import *
@@ -8,6 +9,10 @@ from . import default_callback
 from .mmmojo_dll import MmmojoDll, MMMojoEnvironmentCallbackType, MMMojoEnvironmentInitParamType
 
 
+_mmmojo_init_lock = threading.Lock()
+_mmmojo_initialized = False
+
+
 class RequestIdUtility(Enum):
     '''
     enum RequestIdUtility
@@ -78,22 +83,31 @@ class RequestIdPlayer(Enum):
 class XPluginManager(object):
     m_cb_usrdata:py_object
     m_exe_path:c_wchar_p
-    m_switch_native: Dict[str, str] = {}
-    m_cmdline: List[str] = []
-    m_mmmojo_env_ptr: c_void_p = c_void_p(None)
-    m_init_mmmojo_env = False
-    m_callbacks: Dict[str, Callable] = {}
-
-    def __init__(self, wechat_path) -> None:
-        python_bit = platform.architecture()[0]
-        if python_bit == "64bit":
-            dll_name = "mmmojo_64.dll"
+
+    def __init__(self, wechat_path, transport=None) -> None:
+        '''
+        transport: 可选, 代替 mmmojo.dll 的函数表(与 MmmojoDll 接口相同, 例如 fake_mmmojo.FakeMmmojoDll),
+        指定后不再加载微信目录下的 mmmojo.dll
+        '''
+        # 以下状态都是实例级别的, 每个实例对应一个独立的mmmojo环境
+        self.m_exe_path = None
+        self.m_switch_native: Dict[str, str] = {}
+        self.m_cmdline: List[str] = []
+        self.m_mmmojo_env_ptr: c_void_p = c_void_p(None)
+        self.m_init_mmmojo_env = False
+        self.m_callbacks: Dict[str, Callable] = {}
+        if transport is not None:
+            self._dll = transport
         else:
-            dll_name = "mmmojo.dll"
-        mmmojo_dllpath = os.path.join(wechat_path, dll_name)
-        if not os.path.exists(mmmojo_dllpath):
-            raise Exception("给定的微信路径不存在mmmojo.dll")
-        self._dll = MmmojoDll(mmmojo_dllpath)
+            python_bit = platform.architecture()[0]
+            if python_bit == "64bit":
+                dll_name = "mmmojo_64.dll"
+            else:
+                dll_name = "mmmojo.dll"
+            mmmojo_dllpath = os.path.join(wechat_path, dll_name)
+            if not os.path.exists(mmmojo_dllpath):
+                raise Exception("给定的微信路径不存在mmmojo.dll")
+            self._dll = MmmojoDll(mmmojo_dllpath)
         self.m_cb_usrdata = self
         # 增加callback的引用计数，防止被垃圾回收机制处理
         self._callbacks_refer = {}
@@ -130,8 +144,12 @@ class XPluginManager(object):
             raise Exception(f"给定的WeChatOcr.exe路径错误(m_exe_path): {self.m_exe_path}")
         if self.m_init_mmmojo_env and self.m_mmmojo_env_ptr:
             return 
-        # 初始化环境
-        self._dll.InitializeMMMojo(0, None)
+        # 初始化环境, InitializeMMMojo 是进程级别的, 多个实例只调用一次
+        global _mmmojo_initialized
+        with _mmmojo_init_lock:
+            if not _mmmojo_initialized:
+                self._dll.InitializeMMMojo(0, None)
+                _mmmojo_initialized = True
         self.m_mmmojo_env_ptr = c_void_p(self._dll.CreateMMMojoEnvironment())
         if not self.m_mmmojo_env_ptr:
             raise Exception("CreateMMMojoEnvironment失败!")